@@ -0,0 +1,280 @@
+"""
+AnswerMatcher - Pencocokan jawaban dengan key yang dihitung sekali per kasus
+Jawaban dinormalisasi (Unicode NFKC, aksen dan tanda baca dilipat, bilangan
+Indonesia "dua puluh tujuh" <-> "27", sinonim per soal) lalu dicocokkan ke
+himpunan key jawaban benar. short_answer boleh salah ketik beberapa huruf
+(Levenshtein berpita dengan early exit)
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from core.case_model import Case, Question
+
+
+# ========== Normalisasi ==========
+
+_DIGITS = {
+    'nol': 0, 'satu': 1, 'dua': 2, 'tiga': 3, 'empat': 4, 'lima': 5,
+    'enam': 6, 'tujuh': 7, 'delapan': 8, 'sembilan': 9
+}
+# Kata dengan awalan se- (= satu x)
+_SE_WORDS = {'sepuluh': 10, 'sebelas': 11, 'seratus': 100}
+_SE_SCALES = {'seribu': 1000, 'sejuta': 1000000}
+_SCALES = {'ribu': 1000, 'juta': 1000000, 'miliar': 1000000000}
+_NUMBER_WORDS = frozenset(_DIGITS) | frozenset(_SE_WORDS) | frozenset(_SE_SCALES) | frozenset(_SCALES) | {
+    'belas', 'puluh', 'ratus'
+}
+
+# Pemisah ribuan "1.000.000" dan desimal "2,5" (format Indonesia)
+_THOUSANDS = re.compile(r'(?<=\d)\.(?=\d{3}(?!\d))')
+_DECIMAL = re.compile(r'(?<=\d),(?=\d)')
+# Minus di antara angka ("3-2", "3 - 2") adalah operator; ditandai dengan U+2212 agar
+# tidak tertukar dengan tanda negatif di depan angka ("-5")
+_OPERATOR_MINUS = re.compile(r'(?<=\d)\s*-\s*(?=\d)')
+_TOKEN = re.compile(r'(?:(?<![\w.])-)?\d+(?:\.\d+)?|\u2212|[^\W\d_]+')
+
+
+def _fold(text: str) -> str:
+    """NFKC, huruf kecil, buang aksen (é -> e)"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _numbers_to_digits(tokens: List[str]) -> List[str]:
+    """Ganti rangkaian kata bilangan dengan angka: ['dua', 'puluh', 'tujuh'] -> ['27']"""
+    result = []
+    total = 0  # Bagian yang sudah dikali ribu/juta
+    group = 0  # Bagian di bawah seribu
+    unit: Optional[int] = None  # Angka satuan terakhir yang belum dikali
+    active = False
+    
+    def flush() -> None:
+        nonlocal total, group, unit, active
+        if active:
+            result.append(str(total + group + (unit or 0)))
+        total, group, unit, active = 0, 0, None, False
+    
+    for token in tokens:
+        if token not in _NUMBER_WORDS:
+            flush()
+            result.append(token)
+            continue
+        if token in _DIGITS:
+            if unit is not None:
+                flush()  # "dua tiga" = dua bilangan
+            unit = _DIGITS[token]
+        elif token in _SE_WORDS:
+            if unit is not None:
+                flush()
+            group += _SE_WORDS[token]
+        elif token == 'belas' and unit is not None:
+            group += unit + 10
+            unit = None
+        elif token == 'puluh' and unit is not None:
+            group += unit * 10
+            unit = None
+        elif token == 'ratus' and unit is not None:
+            group += unit * 100
+            unit = None
+        elif token in _SE_SCALES:
+            if unit is not None or group:
+                flush()
+            total += _SE_SCALES[token]
+        elif token in _SCALES and (unit is not None or group):
+            total += (group + (unit or 0)) * _SCALES[token]
+            group, unit = 0, None
+        else:
+            # Kata skala tanpa angka di depannya ("puluh" sendirian): bukan bilangan
+            flush()
+            result.append(token)
+            continue
+        active = True
+    flush()
+    return result
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Bentuk kanonik jawaban: huruf kecil tanpa aksen, tanda baca jadi spasi,
+    bilangan dalam angka (tanda negatif dipertahankan), minus di antara angka
+    menjadi token "-", spasi tunggal
+    """
+    text = _fold(text).replace('\u2212', '-')
+    text = _THOUSANDS.sub('', text)
+    text = _DECIMAL.sub('.', text)
+    text = _OPERATOR_MINUS.sub(' \u2212 ', text)
+    tokens = ['-' if token == '\u2212' else token for token in _TOKEN.findall(text)]
+    return ' '.join(_numbers_to_digits(tokens))
+
+
+def _numeric_tokens(normalized: str) -> Tuple[str, ...]:
+    """Angka dan operator minus dalam jawaban ternormalisasi (tidak boleh kena toleransi salah ketik)"""
+    return tuple(token for token in normalized.split(' ') if token == '-' or token.lstrip('-')[:1].isdigit())
+
+
+def within_edits(a: str, b: str, max_edits: int) -> bool:
+    """
+    Levenshtein(a, b) <= max_edits, hanya menghitung pita diagonal selebar
+    2 * max_edits + 1 dan berhenti begitu seluruh baris melewati batas
+    """
+    if a == b:
+        return True
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_edits:
+        return False
+    if max_edits == 0:
+        return False
+    if len_a > len_b:
+        a, b, len_a, len_b = b, a, len_b, len_a
+    
+    limit = max_edits + 1  # Nilai di luar pita dianggap "terlalu jauh"
+    previous = [j if j <= max_edits else limit for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        char_a = a[i - 1]
+        low = max(1, i - max_edits)
+        high = min(len_b, i + max_edits)
+        current = [limit] * (len_b + 1)
+        current[0] = i if i <= max_edits else limit
+        row_min = current[0] if low == 1 else limit
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (char_a != b[j - 1])
+            deletion = previous[j] + 1
+            if deletion < cost:
+                cost = deletion
+            insertion = current[j - 1] + 1
+            if insertion < cost:
+                cost = insertion
+            if cost > limit:
+                cost = limit
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_edits:
+            return False  # Early exit: tidak ada jalur yang bisa kembali di bawah batas
+        previous = current
+    return previous[len_b] <= max_edits
+
+
+# ========== Key per soal ==========
+
+def default_max_edits(key: str) -> int:
+    """Toleransi otomatis short_answer: 0 untuk jawaban pendek, maksimal 2"""
+    return min(2, len(key) // 6)
+
+
+class AnswerKey:
+    """Key jawaban benar satu soal yang sudah dinormalisasi"""
+    
+    __slots__ = ('keys', 'synonyms', 'fuzzy')
+    
+    def __init__(self, question: Question):
+        # (bentuk sinonim, kata kanonik) dengan spasi pembatas, frasa terpanjang diganti dulu
+        synonyms = []
+        for word, alternatives in question.synonyms:
+            canonical = normalize_answer(word)
+            for alternative in alternatives:
+                alternative = normalize_answer(alternative)
+                if alternative and alternative != canonical:
+                    synonyms.append((f" {alternative} ", f" {canonical} "))
+        synonyms.sort(key=lambda pair: -len(pair[0]))
+        self.synonyms: Tuple[Tuple[str, str], ...] = tuple(synonyms)
+        
+        answers = (question.correct_answer,) + question.accepted_answers
+        self.keys: FrozenSet[str] = frozenset(
+            key for key in (self.apply_synonyms(normalize_answer(a)) for a in answers) if key
+        )
+        
+        # (key, toleransi, angka di key) untuk pencocokan fuzzy, hanya short_answer
+        # Salah ketik hanya ditoleransi di kata: angka dan tandanya harus sama persis
+        fuzzy = []
+        if question.type == 'short_answer':
+            for key in sorted(self.keys):
+                max_edits = question.max_edits if question.max_edits is not None else default_max_edits(key)
+                if max_edits:
+                    fuzzy.append((key, max_edits, _numeric_tokens(key)))
+        self.fuzzy: Tuple[Tuple[str, int, Tuple[str, ...]], ...] = tuple(fuzzy)
+    
+    def apply_synonyms(self, normalized: str) -> str:
+        if not self.synonyms or not normalized:
+            return normalized
+        padded = f" {normalized} "
+        for alternative, canonical in self.synonyms:
+            if alternative in padded:
+                padded = padded.replace(alternative, canonical)
+        return padded.strip()
+    
+    def matches(self, answer: str) -> bool:
+        key = self.apply_synonyms(normalize_answer(answer))
+        if key in self.keys:
+            return True
+        if not self.fuzzy:
+            return False
+        numbers = _numeric_tokens(key)
+        for correct, max_edits, correct_numbers in self.fuzzy:
+            if numbers == correct_numbers and within_edits(key, correct, max_edits):
+                return True
+        return False
+
+
+class AnswerMatcher:
+    """
+    Key jawaban semua soal satu kasus atau bank soal (dibangun sekali, dipakai bersama)
+    Hasil untuk (soal, jawaban mentah) di-memo agar regrading massal yang
+    banyak berisi jawaban sama tidak menormalisasi ulang
+    """
+    
+    def __init__(self, questions: Mapping[str, Question], memo_entries: int = 65536):
+        self.keys: Dict[str, AnswerKey] = {q_id: AnswerKey(q) for q_id, q in questions.items()}
+        self.memo_entries = memo_entries
+        self._memo: Dict[Tuple[str, str], bool] = {}
+    
+    def add(self, question: Question) -> None:
+        """Daftarkan key satu soal tambahan (mis. soal yang dibangkitkan per sesi)"""
+        self.keys[question.id] = AnswerKey(question)
+    
+    def is_correct(self, question_id: str, answer: str) -> bool:
+        """Cek jawaban, False jika soal tidak ada"""
+        memo_key = (question_id, answer)
+        result = self._memo.get(memo_key)
+        if result is not None:
+            return result
+        answer_key = self.keys.get(question_id)
+        if answer_key is None:
+            return False
+        result = answer_key.matches(answer)
+        if len(self._memo) >= self.memo_entries:
+            self._memo.clear()
+        self._memo[memo_key] = result
+        return result
+
+
+# Matcher dipakai bersama untuk kasus yang sama (seperti ending network)
+_matchers = OrderedDict()  # id(case) -> (case, matcher)
+_matchers_lock = threading.Lock()
+_MAX_MATCHERS = 32
+
+
+def get_answer_matcher(case: Case) -> AnswerMatcher:
+    """Ambil (atau bangun) answer matcher untuk satu kasus"""
+    key = id(case)
+    with _matchers_lock:
+        entry = _matchers.get(key)
+        if entry is not None and entry[0] is case:
+            _matchers.move_to_end(key)
+            return entry[1]
+    
+    matcher = AnswerMatcher(case.questions)
+    with _matchers_lock:
+        # Case ikut disimpan agar id() tidak dipakai ulang objek lain
+        _matchers[key] = (case, matcher)
+        _matchers.move_to_end(key)
+        while len(_matchers) > _MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher
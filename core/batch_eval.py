@@ -0,0 +1,263 @@
+"""
+BatchEval - Evaluasi ending dan kondisi untuk banyak sesi sekaligus
+State ribuan sesi (GameManager atau snapshot GameState) dikemas menjadi
+matriks NumPy, lalu semua ending / kondisi dievaluasi dengan operasi vektor
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsional, hanya diperlukan untuk batch evaluation
+    np = None
+
+from core.case_model import Case, Ending
+from core.ending_manager import GENERIC_FAILURE_ENDING
+from core.ending_network import get_ending_network
+from core.game_manager import GameState
+from systems.condition_checker import ComplexCondition, Condition
+
+
+# (evidence_mask, extra_evidence, evidence_count, flag_set_mask, flag_true_mask, flag_values)
+SessionRow = Tuple[int, Tuple[str, ...], int, int, int, Dict[str, Any]]
+
+
+def _session_row(session) -> SessionRow:
+    """Ambil state bitmask dari GameManager atau GameState"""
+    if isinstance(session, GameState):
+        return (session.evidence_mask, session.extra_evidence, session.evidence_count,
+                session.flag_set_mask, session.flag_true_mask, session.flag_values)
+    return (session._evidence_mask, tuple(session._extra_evidence), session._evidence_count,
+            session._flag_set_mask, session._flag_true_mask, session._flag_values)
+
+
+def _unpack_masks(masks: List[int], width: int) -> 'np.ndarray':
+    """Ubah list bitmask int menjadi matriks bool (baris, width)"""
+    if width == 0:
+        return np.zeros((len(masks), 0), dtype=bool)
+    nbytes = (width + 7) // 8
+    raw = b''.join(mask.to_bytes(nbytes, 'little') for mask in masks)
+    packed = np.frombuffer(raw, dtype=np.uint8).reshape(len(masks), nbytes)
+    return np.unpackbits(packed, axis=1, bitorder='little')[:, :width].astype(bool)
+
+
+class SessionBatch:
+    """
+    State banyak sesi dari satu kasus dalam bentuk matriks:
+    - evidence: (sesi, bukti) bool, indeks kolom = case.evidence_index
+    - flag_set / flag_true: (sesi, flag) bool, indeks kolom = case.flag_index
+    - evidence_count: (sesi,) jumlah bukti
+    - accuracy: (sesi,) akurasi jawaban (persen) dari QuestionManager tiap sesi, None jika tidak diberikan
+    Flag non-boolean dan bukti di luar kasus (jarang) disimpan per baris
+    """
+
+    def __init__(self, case: Case, sessions: Sequence, question_managers: Optional[Sequence] = None):
+        """
+        question_managers: QuestionManager per sesi (urutan sama dengan sessions), wajib jika
+        ada ending dengan min_accuracy karena snapshot state tidak membawa riwayat jawaban
+        Raise ValueError jika kasus memakai min_accuracy tanpa question_managers
+        """
+        if np is None:
+            raise ImportError("Batch evaluation membutuhkan NumPy (pip install numpy)")
+
+        self.case = case
+        self.network = get_ending_network(case)
+        rows = [_session_row(session) for session in sessions]
+        self.size = len(rows)
+
+        self.accuracy: Optional['np.ndarray'] = None
+        if question_managers is not None:
+            if len(question_managers) != self.size:
+                raise ValueError(f"question_managers berisi {len(question_managers)} item untuk {self.size} sesi")
+            self.accuracy = np.fromiter((qm.get_accuracy() for qm in question_managers),
+                                        dtype=np.float64, count=self.size)
+        elif self.network.uses_accuracy:
+            raise ValueError(f"Kasus {case.id} memakai min_accuracy: berikan question_managers per sesi")
+
+        self.evidence = _unpack_masks([row[0] for row in rows], len(case.evidence_ids))
+        self.evidence_count = np.fromiter((row[2] for row in rows), dtype=np.int64, count=self.size)
+        self.flag_set = _unpack_masks([row[3] for row in rows], len(case.flag_ids))
+        self.flag_true = _unpack_masks([row[4] for row in rows], len(case.flag_ids))
+
+        # Index baris yang punya bukti/flag di luar bitmask: nama -> {baris: nilai}
+        self._extra_evidence: Dict[str, List[int]] = {}
+        self._flag_values: Dict[str, Dict[int, Any]] = {}
+        for row_index, row in enumerate(rows):
+            for evidence_id in row[1]:
+                self._extra_evidence.setdefault(evidence_id, []).append(row_index)
+            for flag_name, value in row[5].items():
+                self._flag_values.setdefault(flag_name, {})[row_index] = value
+
+        self._ending_indices: Optional['np.ndarray'] = None
+
+    # ========== Kolom dasar ==========
+
+    def evidence_column(self, evidence_id: str) -> 'np.ndarray':
+        """has_evidence(evidence_id) untuk semua sesi"""
+        bit = self.case.evidence_index.get(evidence_id)
+        if bit is not None:
+            return self.evidence[:, bit]
+        column = np.zeros(self.size, dtype=bool)
+        column[self._extra_evidence.get(evidence_id, [])] = True
+        return column
+
+    def flag_column(self, flag_name: str, predicate) -> 'np.ndarray':
+        """
+        predicate(get_flag(flag_name)) untuk semua sesi
+        predicate hanya dipanggil untuk kemungkinan nilai (True/False/None) dan flag non-boolean
+        """
+        on_true, on_false, on_missing = predicate(True), predicate(False), predicate(None)
+        bit = self.case.flag_index.get(flag_name)
+        if bit is None:
+            column = np.full(self.size, on_missing, dtype=bool)
+        else:
+            is_set = self.flag_set[:, bit]
+            column = np.where(is_set, np.where(self.flag_true[:, bit], on_true, on_false), on_missing)
+
+        values = self._flag_values.get(flag_name)
+        if values:
+            column = column.copy()
+            for row_index, value in values.items():
+                column[row_index] = bool(predicate(value))
+        return column
+
+    def _missing_column(self, flag_name: str) -> 'np.ndarray':
+        """True untuk sesi yang belum pernah set flag_name"""
+        column = self.flag_column(flag_name, lambda value: value is None)
+        for row_index, value in self._flag_values.get(flag_name, {}).items():
+            column[row_index] = False
+        return column
+
+    # ========== Ending ==========
+
+    def ending_indices(self) -> 'np.ndarray':
+        """Indeks ending (urutan case.endings) per sesi, -1 jika tidak ada yang cocok"""
+        if self._ending_indices is not None:
+            return self._ending_indices
+
+        ending_tests = self.network.ending_tests
+        tests = sorted({test for tests in ending_tests for test in tests}, key=repr)
+        test_index = {test: i for i, test in enumerate(tests)}
+
+        # Matriks hasil tes (sesi, tes) dan kebutuhan ending (tes, ending)
+        results = np.zeros((self.size, len(tests)), dtype=np.int32)
+        for i, test in enumerate(tests):
+            results[:, i] = self._test_column(test)
+        required = np.zeros((len(tests), len(ending_tests)), dtype=np.int32)
+        for ending_index, tests_of_ending in enumerate(ending_tests):
+            for test in tests_of_ending:
+                required[test_index[test], ending_index] = 1
+
+        # Ending cocok jika semua tesnya lolos, first match menang
+        matched = (results @ required) == required.sum(axis=0)
+        if matched.shape[1] == 0:
+            indices = np.full(self.size, -1, dtype=np.int64)
+        else:
+            indices = np.where(matched.any(axis=1), matched.argmax(axis=1), -1)
+        self._ending_indices = indices
+        return indices
+
+    def endings(self) -> List[Ending]:
+        """Ending per sesi, sama dengan EndingManager.evaluate_ending per baris"""
+        endings = self.case.endings
+        return [endings[i] if i >= 0 else GENERIC_FAILURE_ENDING for i in self.ending_indices().tolist()]
+
+    def ending_distribution(self) -> Dict[str, int]:
+        """Jumlah sesi per ending id"""
+        counts = np.bincount(self.ending_indices() + 1, minlength=len(self.case.endings) + 1)
+        distribution = Counter()
+        if counts[0]:
+            distribution[GENERIC_FAILURE_ENDING.id] = int(counts[0])
+        for ending, count in zip(self.case.endings, counts[1:].tolist()):
+            if count:
+                distribution[ending.id] += count
+        return dict(distribution)
+
+    def _test_column(self, test: Tuple) -> 'np.ndarray':
+        """Hasil satu tes ending network untuk semua sesi"""
+        kind = test[0]
+        if kind == 'evidence':
+            bits = [bit for bit in range(test[1].bit_length()) if (test[1] >> bit) & 1]
+            return self.evidence[:, bits].all(axis=1)
+        if kind == 'evidence_id':
+            return self.evidence_column(test[1])
+        if kind == 'flag':
+            expected = self.network.test_value(test)
+            return self.flag_column(test[1], lambda value: value == expected)
+        if kind == 'min_count':
+            return self.evidence_count >= test[1]
+        if kind == 'min_accuracy':
+            return self.accuracy >= test[1]
+        return self.evidence_count <= test[1]
+
+    # ========== Kondisi ==========
+
+    def evaluate_condition(self, spec: Any) -> 'np.ndarray':
+        """
+        Evaluasi kondisi untuk semua sesi (format sama dengan ConditionCompiler:
+        tuple kondisi kasus, dict flag, dict JSON simple/kompleks, Condition, ComplexCondition)
+        """
+        if spec is None:
+            return np.ones(self.size, dtype=bool)
+        if isinstance(spec, Condition):
+            return self._simple(spec.type, spec.target, spec.value)
+        if isinstance(spec, ComplexCondition):
+            columns = [self.evaluate_condition(c) for c in spec.conditions]
+            columns += [self.evaluate_condition(c) for c in spec.sub_conditions]
+            return self._combine(spec.operator, columns)
+        if isinstance(spec, dict):
+            if 'operator' in spec or 'sub_conditions' in spec:
+                columns = [self.evaluate_condition(c) for c in spec.get('conditions', [])]
+                columns += [self.evaluate_condition(c) for c in spec.get('sub_conditions', [])]
+                return self._combine(spec.get('operator', 'AND'), columns)
+            if 'type' in spec and 'target' in spec:
+                return self._simple(spec['type'], spec['target'], spec.get('value'))
+            spec = spec.items()
+        # Kondisi flag ((flag_name, value), ...)
+        columns = [self.flag_column(name, lambda value, expected=expected: value == expected)
+                   for name, expected in spec]
+        return self._combine('AND', columns)
+
+    def count_condition(self, spec: Any) -> int:
+        """Jumlah sesi yang memenuhi kondisi"""
+        return int(np.count_nonzero(self.evaluate_condition(spec)))
+
+    def _simple(self, condition_type: str, target: str, value: Any) -> 'np.ndarray':
+        """Versi vektor dari CONDITION_HANDLERS"""
+        if condition_type == 'flag':
+            return self.flag_column(target, lambda v: v == value)
+        if condition_type in ('flag_true', 'flag_false'):
+            # get_flag(target, False): flag yang belum di-set dianggap False
+            expected = condition_type == 'flag_true'
+            column = self.flag_column(target, lambda v: v is expected)
+            if not expected:
+                column = column | self._missing_column(target)
+            return column
+        if condition_type == 'evidence':
+            return self.evidence_column(target)
+        if condition_type == 'no_evidence':
+            return ~self.evidence_column(target)
+        if condition_type == 'evidence_count_min':
+            return self.evidence_count >= value
+        if condition_type == 'evidence_count_max':
+            return self.evidence_count <= value
+        if condition_type == 'evidence_count_equal':
+            return self.evidence_count == value
+        return np.zeros(self.size, dtype=bool)
+
+    def _combine(self, operator: str, columns: List['np.ndarray']) -> 'np.ndarray':
+        """Operator logika dengan semantik yang sama dengan ComplexCondition"""
+        if operator == 'AND':
+            return np.logical_and.reduce(columns) if columns else np.ones(self.size, dtype=bool)
+        if operator == 'OR':
+            return np.logical_or.reduce(columns) if columns else np.zeros(self.size, dtype=bool)
+        if operator == 'NOT':
+            return ~np.logical_and.reduce(columns) if columns else np.ones(self.size, dtype=bool)
+        return np.zeros(self.size, dtype=bool)
+
+
+def batch_evaluate_endings(case: Case, sessions: Sequence,
+                           question_managers: Optional[Sequence] = None) -> List[Ending]:
+    """Shortcut: ending untuk setiap sesi"""
+    return SessionBatch(case, sessions, question_managers).endings()
@@ -0,0 +1,222 @@
+"""
+BatchGrader - Penilaian massal lembar jawaban satu kelas
+Baris (siswa, question_id, jawaban) dibaca streaming dari CSV / JSONL dan
+dinilai dengan answer key yang sudah dihitung (core/answer_matcher) tanpa
+menyentuh state sesi. Memori sebanding jumlah siswa + soal, bukan jumlah baris
+"""
+
+import csv
+import json
+import os
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from core.answer_matcher import AnswerMatcher, get_answer_matcher
+from core.case_model import Case
+from core.question_bank import QuestionBank, load_question_banks
+
+
+# Nama kolom CSV / key JSONL
+COLUMNS = ('student', 'question_id', 'answer')
+
+# (siswa, question_id, jawaban), None = baris tidak valid
+Submission = Optional[Tuple[str, str, str]]
+
+
+# ========== Input ==========
+
+def read_csv(stream: TextIO) -> Iterator[Submission]:
+    """Baris CSV dengan header berisi kolom COLUMNS (urutan bebas, kolom lain diabaikan)"""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    try:
+        student_col, question_col, answer_col = (header.index(column) for column in COLUMNS)
+    except ValueError:
+        raise ValueError(f"Header CSV harus memuat kolom {', '.join(COLUMNS)}")
+    width = max(student_col, question_col, answer_col)
+    for row in reader:
+        if len(row) > width:
+            yield row[student_col], row[question_col], row[answer_col]
+        elif row:
+            yield None
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Submission]:
+    """Satu objek JSON per baris: {"student": ..., "question_id": ..., "answer": ...}"""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            student, question_id, answer = (data[column] for column in COLUMNS)
+        except (ValueError, TypeError, KeyError):
+            yield None
+            continue
+        if isinstance(answer, (int, float)) and not isinstance(answer, bool):
+            answer = str(answer)
+        if isinstance(student, str) and isinstance(question_id, str) and isinstance(answer, str):
+            yield student, question_id, answer
+        else:
+            yield None
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def submission_format(path: str) -> str:
+    """Tebak format dari ekstensi file (.csv, .jsonl / .ndjson)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Format {path} tidak dikenal, pakai .csv atau .jsonl")
+
+
+def read_submissions(path: str, fmt: Optional[str] = None) -> Iterator[Submission]:
+    """Baca file submission secara streaming, '-' = stdin"""
+    if path == '-':
+        yield from READERS[fmt or 'csv'](sys.stdin)
+        return
+    reader = READERS[fmt or submission_format(path)]
+    with open(path, 'r', encoding='utf-8-sig', newline='') as stream:
+        yield from reader(stream)
+
+
+# ========== Penilaian ==========
+
+class GradeReport:
+    """Agregat hasil penilaian per siswa dan per soal (bisa digabung)"""
+    
+    def __init__(self):
+        self.rows = 0
+        self.graded = 0
+        self.correct = 0
+        self.invalid = 0  # Baris rusak / kolom kurang
+        self.unknown = 0  # question_id tidak ada di kasus maupun bank
+        self.students: Dict[str, List[int]] = {}  # siswa -> [dijawab, benar]
+        self.questions: Dict[str, List[int]] = {}  # question_id -> [dijawab, benar]
+    
+    def merge(self, other: 'GradeReport') -> None:
+        self.rows += other.rows
+        self.graded += other.graded
+        self.correct += other.correct
+        self.invalid += other.invalid
+        self.unknown += other.unknown
+        for own, theirs in ((self.students, other.students), (self.questions, other.questions)):
+            for key, (answered, correct) in theirs.items():
+                counts = own.setdefault(key, [0, 0])
+                counts[0] += answered
+                counts[1] += correct
+    
+    @staticmethod
+    def _entries(counts: Dict[str, List[int]]) -> Dict[str, Dict]:
+        return {
+            key: {'answered': answered, 'correct': correct, 'accuracy': correct / answered * 100}
+            for key, (answered, correct) in sorted(counts.items())
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'graded': self.graded,
+            'correct': self.correct,
+            'invalid': self.invalid,
+            'unknown_question': self.unknown,
+            'accuracy': self.correct / self.graded * 100 if self.graded else 0,
+            'students': self._entries(self.students),
+            'questions': self._entries(self.questions)
+        }
+    
+    def format_text(self) -> str:
+        """Laporan teks: ringkasan, per soal, lalu per siswa"""
+        accuracy = self.correct / self.graded * 100 if self.graded else 0
+        lines = [f"{self.graded} jawaban dinilai dari {self.rows} baris - {accuracy:.1f}% benar",
+                 f"{self.invalid} baris tidak valid, {self.unknown} soal tidak dikenal"]
+        for title, counts in (("PER SOAL:", self.questions), ("PER SISWA:", self.students)):
+            lines += ["", title]
+            for key, (answered, correct) in sorted(counts.items()):
+                lines.append(f"  {key:<28} {correct:>6}/{answered:<6} {correct / answered * 100:5.1f}%")
+        return "\n".join(lines)
+
+
+class BatchGrader:
+    """
+    Penilai massal dengan answer key kasus + bank soal
+    Tidak mencatat riwayat apa pun; hasil (soal, jawaban) yang sering muncul
+    diambil dari memo AnswerMatcher sehingga tidak dinormalisasi ulang
+    """
+    
+    def __init__(self, matchers: Iterable[AnswerMatcher]):
+        """matchers: urutan prioritas, matcher pertama menutupi id soal yang sama di berikutnya"""
+        self._matchers: Dict[str, AnswerMatcher] = {}
+        for matcher in reversed(list(matchers)):
+            for question_id in matcher.keys:
+                self._matchers[question_id] = matcher
+    
+    @classmethod
+    def for_case(cls, case: Case, banks: Optional[List[QuestionBank]] = None) -> 'BatchGrader':
+        """
+        Penilai untuk soal kasus + bank soalnya (default case.question_banks)
+        Raise FileNotFoundError / CaseSchemaError jika bank tidak bisa dimuat
+        """
+        if banks is None:
+            banks = load_question_banks(case.question_banks)
+        return cls([get_answer_matcher(case)] + [bank.matcher for bank in banks])
+    
+    def __contains__(self, question_id: str) -> bool:
+        return question_id in self._matchers
+    
+    def grade(self, question_id: str, answer: str) -> Optional[bool]:
+        """Nilai satu jawaban, None jika soal tidak dikenal"""
+        matcher = self._matchers.get(question_id)
+        return None if matcher is None else matcher.is_correct(question_id, answer)
+    
+    def grade_rows(self, rows: Iterable[Submission], report: Optional[GradeReport] = None,
+                   on_graded: Optional[Callable[[str, str, str, bool], None]] = None) -> GradeReport:
+        """
+        Nilai semua baris dan tambahkan ke report (baru jika None)
+        on_graded(siswa, question_id, jawaban, benar) dipanggil per baris yang dinilai
+        """
+        report = report or GradeReport()
+        matchers = self._matchers
+        students = report.students
+        questions = report.questions
+        rows_seen = graded = correct_total = invalid = unknown = 0
+        
+        for row in rows:
+            rows_seen += 1
+            if row is None:
+                invalid += 1
+                continue
+            student, question_id, answer = row
+            matcher = matchers.get(question_id)
+            if matcher is None:
+                unknown += 1
+                continue
+            correct = matcher.is_correct(question_id, answer)
+            graded += 1
+            correct_total += correct
+            
+            counts = students.get(student)
+            if counts is None:
+                counts = students[student] = [0, 0]
+            counts[0] += 1
+            counts[1] += correct
+            counts = questions.get(question_id)
+            if counts is None:
+                counts = questions[question_id] = [0, 0]
+            counts[0] += 1
+            counts[1] += correct
+            
+            if on_graded is not None:
+                on_graded(student, question_id, answer, correct)
+        
+        report.rows += rows_seen
+        report.graded += graded
+        report.correct += correct_total
+        report.invalid += invalid
+        report.unknown += unknown
+        return report
@@ -0,0 +1,136 @@
+"""
+CaseCache - Cache kasus yang sudah di-compile
+Menyimpan kasus hasil parsing di memori dan sebagai artifact biner di disk
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from core.case_model import Case, build_case
+from core.case_store import BASE_DIR, CaseStore, is_safe_case_id
+
+
+# Naikkan jika format isi artifact berubah, artifact lama otomatis diabaikan
+CACHE_FORMAT_VERSION = 5
+
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
+
+
+class CaseCache:
+    """
+    Cache dua lapis untuk data kasus:
+    - memori: LRU terbatas, dipakai bersama semua sesi dalam satu proses
+    - disk: artifact pickle yang divalidasi dengan hash isi JSON dan versi sumber
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_entries: int = 32):
+        self.cache_dir = cache_dir  # None = tanpa cache disk
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # (store key, case_id) -> (size, version, case)
+        self._lock = threading.Lock()
+    
+    def load(self, store: CaseStore, case_id: str) -> Case:
+        """
+        Ambil kasus dari cache, parse ulang hanya jika sumber berubah
+        Raise FileNotFoundError jika kasus tidak ada, CaseSchemaError jika tidak valid
+        """
+        stat = store.stat(case_id)
+        if stat is None:
+            raise FileNotFoundError(f"Kasus {case_id} tidak ditemukan")
+        size, version = stat
+        key = (store.key, case_id)
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                self._memory.move_to_end(key)
+        if entry and entry[0] == size and entry[1] == version:
+            return entry[2]
+        
+        raw = store.read(case_id)
+        digest = hashlib.sha256(raw).hexdigest()
+        
+        case = self._read_artifact(key, digest, version)
+        if case is None:
+            case = self._compile(raw, case_id)
+            self._write_artifact(key, digest, version, case)
+        
+        with self._lock:
+            self._memory[key] = (size, version, case)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        return case
+    
+    def is_loaded(self, store: CaseStore, case_id: str) -> bool:
+        """Cek apakah kasus sedang ada di cache memori"""
+        with self._lock:
+            return (store.key, case_id) in self._memory
+    
+    def invalidate(self, store: Optional[CaseStore] = None, case_id: Optional[str] = None) -> None:
+        """Hapus entry memori (satu kasus, satu store, atau semua)"""
+        with self._lock:
+            for key in list(self._memory):
+                if store is not None and key[0] != store.key:
+                    continue
+                if case_id is not None and key[1] != case_id:
+                    continue
+                del self._memory[key]
+    
+    def _compile(self, raw: bytes, case_id: str) -> Case:
+        """Parse JSON kasus dan bangun model yang sudah divalidasi"""
+        return build_case(json.loads(raw.decode('utf-8')), case_id)
+    
+    def _artifact_path(self, key: Tuple[str, str]) -> str:
+        """Path artifact di disk untuk satu kasus di satu store"""
+        store_hash = hashlib.sha1(key[0].encode('utf-8')).hexdigest()[:12]
+        name = key[1]
+        if not is_safe_case_id(name):
+            # Id dari store lain (mis. SQLite) boleh berisi pemisah path: jangan keluar dari cache_dir
+            name = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.{store_hash}.casec")
+    
+    def _read_artifact(self, key: Tuple[str, str], digest: str, version: int) -> Optional[Case]:
+        """Baca artifact jika masih cocok dengan sumbernya"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._artifact_path(key), 'rb') as f:
+                header: Tuple = pickle.load(f)
+                if header != (CACHE_FORMAT_VERSION, digest, version):
+                    return None
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            # Artifact hilang/rusak: parse ulang dari sumber
+            return None
+    
+    def _write_artifact(self, key: Tuple[str, str], digest: str, version: int, case: Case) -> None:
+        """Tulis artifact secara atomik (temp file + rename)"""
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((CACHE_FORMAT_VERSION, digest, version), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(case, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._artifact_path(key))
+        except OSError:
+            # Cache disk bersifat opsional, game tetap jalan tanpa artifact
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# Instance bersama agar semua GameManager dalam proses berbagi cache memori
+default_case_cache = CaseCache()
@@ -0,0 +1,698 @@
+"""
+CaseModel - Model objek kasus yang sudah divalidasi
+Dibangun sekali saat load, immutable, dan dipakai bersama semua sesi
+"""
+
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Kondisi flag dalam bentuk ((flag_name, expected_value), ...)
+Conditions = Tuple[Tuple[str, Any], ...]
+
+
+class CaseSchemaError(ValueError):
+    """Error skema kasus, berisi semua masalah yang ditemukan"""
+    
+    def __init__(self, case_id: str, errors: List[str], codes: Optional[List[str]] = None):
+        self.case_id = case_id
+        self.errors = errors
+        # Jenis tiap error: 'schema' (struktur/tipe) atau 'dangling_ref' (id yang tidak ada)
+        self.codes = codes or ['schema'] * len(errors)
+        super().__init__(f"Kasus {case_id} tidak valid ({len(errors)} error): " + "; ".join(errors))
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern id/nama flag agar string yang sama hanya ada satu di memori"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Frozen:
+    """Base class slotted yang tidak bisa diubah setelah dibuat"""
+    
+    __slots__ = ()
+    # Slot yang menjadi argumen constructor (None = semua slot)
+    _fields: Optional[Tuple[str, ...]] = None
+    
+    def _init(self, **fields) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} bersifat immutable")
+    
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} bersifat immutable")
+    
+    def __reduce__(self):
+        # Pickle lewat constructor agar string di-intern ulang saat dimuat
+        fields = self._fields or self.__slots__
+        return (type(self), tuple(getattr(self, name) for name in fields))
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({getattr(self, 'id', '')})"
+
+
+class Outcome(_Frozen):
+    """Hasil jawaban (on_correct / on_incorrect)"""
+    
+    __slots__ = ('message', 'evidence', 'flags', 'dialogue_unlock')
+    
+    def __init__(self, message: str, evidence: Tuple[str, ...], flags: Conditions,
+                 dialogue_unlock: Tuple[str, ...]):
+        self._init(
+            message=message,
+            evidence=tuple(_intern(e) for e in evidence),
+            flags=tuple((_intern(k), v) for k, v in flags),
+            dialogue_unlock=tuple(_intern(d) for d in dialogue_unlock)
+        )
+
+
+EMPTY_OUTCOME = Outcome('', (), (), ())
+
+
+class Location(_Frozen):
+    """Lokasi yang bisa dikunjungi"""
+    
+    __slots__ = ('id', 'name', 'description', 'scenes', 'npcs', 'exits')
+    
+    def __init__(self, location_id: str, name: str, description: str, scenes: Tuple[str, ...],
+                 npcs: Tuple[str, ...], exits: Tuple[Tuple[str, str], ...]):
+        self._init(
+            id=_intern(location_id),
+            name=name,
+            description=description,
+            scenes=tuple(_intern(s) for s in scenes),
+            npcs=tuple(_intern(n) for n in npcs),
+            exits=tuple((_intern(target), label) for target, label in exits)  # (location_id, label)
+        )
+
+
+class Scene(_Frozen):
+    """Scene di dalam lokasi"""
+    
+    __slots__ = ('id', 'title', 'type', 'description', 'conditions')
+    
+    def __init__(self, scene_id: str, title: str, scene_type: str, description: str,
+                 conditions: Conditions):
+        self._init(
+            id=_intern(scene_id),
+            title=title,
+            type=_intern(scene_type),
+            description=description,
+            conditions=tuple((_intern(k), v) for k, v in conditions)
+        )
+
+
+class DialogueChoice(_Frozen):
+    """Pilihan jawaban pemain dalam dialog"""
+    
+    __slots__ = ('text', 'next')
+    
+    def __init__(self, text: str, next_id: Optional[str]):
+        self._init(text=text, next=_intern(next_id))
+
+
+class Dialogue(_Frozen):
+    """Satu node dialog NPC"""
+    
+    __slots__ = ('id', 'text', 'question', 'choices', 'conditions', 'on_correct', 'on_incorrect')
+    
+    def __init__(self, dialogue_id: str, text: str, question: Optional[str],
+                 choices: Tuple[DialogueChoice, ...], conditions: Conditions,
+                 on_correct: Outcome, on_incorrect: Outcome):
+        self._init(
+            id=_intern(dialogue_id),
+            text=text,
+            question=_intern(question),
+            choices=tuple(choices),
+            conditions=tuple((_intern(k), v) for k, v in conditions),
+            on_correct=on_correct,
+            on_incorrect=on_incorrect
+        )
+
+
+class Character(_Frozen):
+    """NPC beserta dialognya"""
+    
+    __slots__ = ('id', 'name', 'role', 'description', 'first_dialogue', 'dialogues', 'conditions')
+    
+    def __init__(self, character_id: str, name: str, role: str, description: str,
+                 first_dialogue: str, dialogues: Dict[str, Dialogue], conditions: Conditions):
+        self._init(
+            id=_intern(character_id),
+            name=name,
+            role=role,
+            description=description,
+            first_dialogue=_intern(first_dialogue),
+            dialogues={_intern(k): v for k, v in dialogues.items()},
+            conditions=tuple((_intern(k), v) for k, v in conditions)
+        )
+
+
+class Question(_Frozen):
+    """Pertanyaan edukatif"""
+    
+    __slots__ = ('id', 'type', 'text', 'options', 'correct_answer', 'hint', 'on_correct', 'on_incorrect',
+                 'accepted_answers', 'synonyms', 'max_edits', 'topic', 'difficulty', 'tags')
+    
+    def __init__(self, question_id: str, question_type: str, text: str, options: Tuple[str, ...],
+                 correct_answer: str, hint: str, on_correct: Outcome, on_incorrect: Outcome,
+                 accepted_answers: Tuple[str, ...] = (), synonyms: Tuple[Tuple[str, Tuple[str, ...]], ...] = (),
+                 max_edits: Optional[int] = None, topic: str = '', difficulty: str = '',
+                 tags: Tuple[str, ...] = ()):
+        self._init(
+            id=_intern(question_id),
+            type=_intern(question_type),
+            text=text,
+            options=tuple(options),
+            correct_answer=correct_answer,
+            hint=hint,
+            on_correct=on_correct,
+            on_incorrect=on_incorrect,
+            accepted_answers=tuple(accepted_answers),  # Jawaban lain yang juga benar
+            synonyms=tuple((word, tuple(alternatives)) for word, alternatives in synonyms),  # (kata, (sinonim, ...))
+            max_edits=max_edits,  # Toleransi salah ketik short_answer, None = otomatis dari panjang jawaban
+            # Metadata bank soal (lihat core/question_bank)
+            topic=_intern(topic),
+            difficulty=_intern(difficulty),
+            tags=tuple(_intern(t) for t in tags)
+        )
+
+
+class Clue(_Frozen):
+    """Bukti yang bisa dikumpulkan beserta syarat unlock-nya"""
+    
+    __slots__ = ('id', 'name', 'description', 'category', 'unlock_question',
+                 'required_correct', 'requires_evidence')
+    
+    def __init__(self, clue_id: str, name: str, description: str, category: str,
+                 unlock_question: Optional[str], required_correct: bool,
+                 requires_evidence: Tuple[str, ...]):
+        self._init(
+            id=_intern(clue_id),
+            name=name,
+            description=description,
+            category=_intern(category),
+            unlock_question=_intern(unlock_question),
+            required_correct=required_correct,
+            requires_evidence=tuple(_intern(e) for e in requires_evidence)
+        )
+
+
+class Ending(_Frozen):
+    """Ending beserta syaratnya"""
+    
+    __slots__ = ('id', 'type', 'title', 'text', 'required_evidence', 'conditions', 'flags',
+                 'min_evidence', 'max_evidence', 'min_accuracy')
+    
+    def __init__(self, ending_id: str, ending_type: str, title: str, text: str,
+                 required_evidence: Tuple[str, ...], conditions: Conditions, flags: Conditions,
+                 min_evidence: int, max_evidence: float, min_accuracy: float):
+        self._init(
+            id=_intern(ending_id),
+            type=_intern(ending_type),
+            title=title,
+            text=text,
+            required_evidence=tuple(_intern(e) for e in required_evidence),
+            conditions=tuple((_intern(k), v) for k, v in conditions),
+            flags=tuple((_intern(k), v) for k, v in flags),
+            min_evidence=min_evidence,
+            max_evidence=max_evidence,
+            min_accuracy=min_accuracy
+        )
+
+
+def evidence_mask(evidence_ids: Tuple[str, ...], evidence_index: Dict[str, int]) -> int:
+    """Gabungkan id bukti menjadi satu bitmask"""
+    mask = 0
+    for evidence_id in evidence_ids:
+        bit = evidence_index.get(evidence_id)
+        # Id yang tidak ada dilaporkan check_references, jangan crash sebelum itu
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+class CaseIndex:
+    """
+    Index referensi silang satu kasus, dibangun sekali bersama Case
+    Semua nilai berupa tuple; id yang tidak punya referensi tidak ada di dict
+    (pakai .get(id, ()))
+    - question_dialogues: soal -> ((npc_id, dialogue_id), ...) yang menanyakannya
+    - question_clues: soal -> clue yang di-unlock oleh soal itu
+    - flag_readers / flag_writers: flag -> path (scene, NPC, dialog, ending, outcome)
+      yang membaca / menulis flag
+    - clue_sources: bukti -> path outcome yang memberikannya
+    - clue_dependents: bukti -> clue yang mensyaratkannya (requires_evidence)
+    - clue_endings: bukti -> ending yang mensyaratkannya
+    - location_neighbors / location_entrances: lokasi -> tujuan exit / asal exit
+    - npc_locations, scene_locations: NPC / scene -> lokasi tempatnya muncul
+    Path memakai format yang sama dengan pesan CaseSchemaError
+    """
+    
+    __slots__ = ('question_dialogues', 'question_clues', 'flag_readers', 'flag_writers',
+                 'clue_sources', 'clue_dependents', 'clue_endings', 'location_neighbors',
+                 'location_entrances', 'npc_locations', 'scene_locations')
+    
+    def __init__(self, case: 'Case'):
+        question_dialogues: Dict[str, list] = {}
+        question_clues: Dict[str, list] = {}
+        flag_readers: Dict[str, list] = {}
+        flag_writers: Dict[str, list] = {}
+        clue_sources: Dict[str, list] = {}
+        clue_dependents: Dict[str, list] = {}
+        clue_endings: Dict[str, list] = {}
+        location_neighbors: Dict[str, list] = {}
+        location_entrances: Dict[str, list] = {}
+        npc_locations: Dict[str, list] = {}
+        scene_locations: Dict[str, list] = {}
+        
+        def add(table: Dict[str, list], key: str, value: Any) -> None:
+            table.setdefault(key, []).append(value)
+        
+        def add_outcome(outcome: Outcome, path: str) -> None:
+            for flag_name, _ in outcome.flags:
+                add(flag_writers, flag_name, path)
+            for evidence_id in outcome.evidence:
+                add(clue_sources, evidence_id, path)
+        
+        for loc in case.locations.values():
+            for target, _ in loc.exits:
+                add(location_neighbors, loc.id, target)
+                add(location_entrances, target, loc.id)
+            for npc_id in loc.npcs:
+                add(npc_locations, npc_id, loc.id)
+            for scene_id in loc.scenes:
+                add(scene_locations, scene_id, loc.id)
+        
+        for scene in case.scenes.values():
+            for flag_name, _ in scene.conditions:
+                add(flag_readers, flag_name, f"scenes.{scene.id}")
+        
+        for npc in case.characters.values():
+            path = f"characters.{npc.id}"
+            for flag_name, _ in npc.conditions:
+                add(flag_readers, flag_name, path)
+            for dlg in npc.dialogues.values():
+                dlg_path = f"{path}.dialogues.{dlg.id}"
+                if dlg.question:
+                    add(question_dialogues, dlg.question, (npc.id, dlg.id))
+                for flag_name, _ in dlg.conditions:
+                    add(flag_readers, flag_name, dlg_path)
+                add_outcome(dlg.on_correct, f"{dlg_path}.on_correct")
+                add_outcome(dlg.on_incorrect, f"{dlg_path}.on_incorrect")
+        
+        for question in case.questions.values():
+            path = f"questions.{question.id}"
+            add_outcome(question.on_correct, f"{path}.on_correct")
+            add_outcome(question.on_incorrect, f"{path}.on_incorrect")
+        
+        for clue in case.clues.values():
+            if clue.unlock_question:
+                add(question_clues, clue.unlock_question, clue.id)
+            for evidence_id in clue.requires_evidence:
+                add(clue_dependents, evidence_id, clue.id)
+        
+        for ending in case.endings:
+            path = f"endings.{ending.id}"
+            for flag_name, _ in ending.conditions + ending.flags:
+                add(flag_readers, flag_name, path)
+            for evidence_id in ending.required_evidence:
+                add(clue_endings, evidence_id, ending.id)
+        
+        for name, table in (
+            ('question_dialogues', question_dialogues), ('question_clues', question_clues),
+            ('flag_readers', flag_readers), ('flag_writers', flag_writers),
+            ('clue_sources', clue_sources), ('clue_dependents', clue_dependents),
+            ('clue_endings', clue_endings), ('location_neighbors', location_neighbors),
+            ('location_entrances', location_entrances), ('npc_locations', npc_locations),
+            ('scene_locations', scene_locations)
+        ):
+            # dict.fromkeys: buang duplikat, urutan kemunculan tetap
+            object.__setattr__(self, name, {key: tuple(dict.fromkeys(values)) for key, values in table.items()})
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CaseIndex bersifat immutable")
+    
+    def flag_names(self) -> Tuple[str, ...]:
+        """Semua flag yang dibaca atau ditulis kasus, urut nama"""
+        return tuple(sorted(set(self.flag_readers) | set(self.flag_writers)))
+
+
+class Case(_Frozen):
+    """Satu kasus lengkap"""
+    
+    __slots__ = ('id', 'title', 'description', 'start_location', 'locations', 'characters',
+                 'questions', 'clues', 'scenes', 'endings', 'question_banks',
+                 # Turunan, dihitung di constructor
+                 'index', 'evidence_ids', 'evidence_index', 'flag_ids', 'flag_index', 'ending_masks')
+    _fields = __slots__[:11]
+    
+    def __init__(self, case_id: str, title: str, description: str, start_location: str,
+                 locations: Dict[str, Location], characters: Dict[str, Character],
+                 questions: Dict[str, Question], clues: Dict[str, Clue],
+                 scenes: Dict[str, Scene], endings: Tuple[Ending, ...],
+                 question_banks: Tuple[str, ...] = ()):
+        self._init(
+            id=_intern(case_id),
+            title=title,
+            description=description,
+            start_location=_intern(start_location),
+            locations={_intern(k): v for k, v in locations.items()},
+            characters={_intern(k): v for k, v in characters.items()},
+            questions={_intern(k): v for k, v in questions.items()},
+            clues={_intern(k): v for k, v in clues.items()},
+            scenes={_intern(k): v for k, v in scenes.items()},
+            endings=tuple(endings),
+            question_banks=tuple(_intern(b) for b in question_banks)  # Id bank soal bersama yang dipakai
+        )
+        self._init(index=CaseIndex(self))
+        self._init_bit_tables()
+    
+    def _init_bit_tables(self) -> None:
+        """Petakan setiap bukti dan flag ke satu indeks bit"""
+        evidence_ids = tuple(self.clues)
+        
+        flag_ids = self.index.flag_names()
+        
+        evidence_index = {evidence_id: bit for bit, evidence_id in enumerate(evidence_ids)}
+        flag_index = {flag_name: bit for bit, flag_name in enumerate(flag_ids)}
+        
+        self._init(
+            evidence_ids=evidence_ids,
+            evidence_index=evidence_index,
+            flag_ids=flag_ids,
+            flag_index=flag_index,
+            # Bitmask required_evidence per ending (tes bukti ending network)
+            ending_masks=tuple(
+                evidence_mask(ending.required_evidence, evidence_index) for ending in self.endings
+            )
+        )
+
+
+class _CaseBuilder:
+    """Bangun Case dari dict JSON sambil mengumpulkan semua error skema"""
+    
+    def __init__(self, data: Any, case_id: str):
+        self.data = data
+        self.case_id = case_id
+        self.errors: List[str] = []
+        self.codes: List[str] = []
+    
+    def error(self, path: str, message: str, code: str = 'schema') -> None:
+        self.errors.append(f"{path}: {message}")
+        self.codes.append(code)
+    
+    def field(self, obj: Dict, key: str, path: str, kind: type, default: Any = None,
+              required: bool = False) -> Any:
+        """Ambil satu field dengan cek tipe"""
+        if key not in obj or obj[key] is None:
+            if required:
+                self.error(path, f"field '{key}' wajib ada")
+            return default
+        value = obj[key]
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            self.error(path, f"field '{key}' harus bertipe {kind.__name__}")
+            return default
+        return value
+    
+    def mapping(self, obj: Dict, key: str, path: str, required: bool = False) -> Dict:
+        return self.field(obj, key, path, dict, {}, required)
+    
+    def id_list(self, obj: Dict, key: str, path: str) -> Tuple[str, ...]:
+        values = self.field(obj, key, path, list, [])
+        result = []
+        for i, value in enumerate(values):
+            if isinstance(value, str):
+                result.append(value)
+            else:
+                self.error(f"{path}.{key}[{i}]", "harus string")
+        return tuple(result)
+    
+    def conditions(self, obj: Dict, key: str, path: str) -> Conditions:
+        return tuple(self.mapping(obj, key, path).items())
+    
+    def outcome(self, obj: Dict, key: str, path: str) -> Outcome:
+        data = self.mapping(obj, key, path)
+        if not data:
+            return EMPTY_OUTCOME
+        path = f"{path}.{key}"
+        return Outcome(
+            self.field(data, 'message', path, str, ''),
+            self.id_list(data, 'evidence', path),
+            self.conditions(data, 'flags', path),
+            self.id_list(data, 'dialogue_unlock', path)
+        )
+    
+    def questions(self, obj: Dict, key: str, path: str) -> Dict[str, Question]:
+        """Bangun semua soal di obj[key] (dipakai kasus dan bank soal)"""
+        questions = {}
+        for q_id, question in self.mapping(obj, key, path).items():
+            q_path = f"{key}.{q_id}"
+            if not isinstance(question, dict):
+                self.error(q_path, "harus object")
+                continue
+            questions[q_id] = self.question(q_id, question, q_path)
+        return questions
+    
+    def question(self, q_id: str, question: Dict, path: str) -> Question:
+        options = self.field(question, 'options', path, list, [])
+        if not all(isinstance(option, str) for option in options):
+            self.error(path, "semua 'options' harus string")
+            options = [str(option) for option in options]
+        synonyms = []
+        for word, alternatives in self.mapping(question, 'synonyms', path).items():
+            if isinstance(alternatives, str):
+                alternatives = [alternatives]
+            if not isinstance(alternatives, list) or not all(isinstance(a, str) for a in alternatives):
+                self.error(f"{path}.synonyms.{word}", "harus string atau list string")
+                continue
+            synonyms.append((word, tuple(alternatives)))
+        max_edits = self.field(question, 'max_edits', path, int)
+        if max_edits is not None and max_edits < 0:
+            self.error(path, "field 'max_edits' tidak boleh negatif")
+            max_edits = None
+        return Question(
+            q_id,
+            self.field(question, 'type', path, str, 'short_answer', required=True),
+            self.field(question, 'text', path, str, '', required=True),
+            tuple(options),
+            self.field(question, 'correct_answer', path, str, '', required=True),
+            self.field(question, 'hint', path, str, ''),
+            self.outcome(question, 'on_correct', path),
+            self.outcome(question, 'on_incorrect', path),
+            self.id_list(question, 'accepted_answers', path),
+            tuple(synonyms),
+            max_edits,
+            self.field(question, 'topic', path, str, ''),
+            self.field(question, 'difficulty', path, str, ''),
+            self.id_list(question, 'tags', path)
+        )
+    
+    def build(self) -> Case:
+        data = self.data
+        if not isinstance(data, dict):
+            raise CaseSchemaError(self.case_id, ["root JSON harus object"])
+        
+        locations = {}
+        for loc_id, loc in self.mapping(data, 'locations', 'case', required=True).items():
+            path = f"locations.{loc_id}"
+            if not isinstance(loc, dict):
+                self.error(path, "harus object")
+                continue
+            exits = self.mapping(loc, 'exits', path)
+            locations[loc_id] = Location(
+                loc_id,
+                self.field(loc, 'name', path, str, loc_id),
+                self.field(loc, 'description', path, str, ''),
+                self.id_list(loc, 'scenes', path),
+                self.id_list(loc, 'npcs', path),
+                tuple((target, str(label)) for target, label in exits.items())
+            )
+        
+        scenes = {}
+        for scene_id, scene in self.mapping(data, 'scenes', 'case').items():
+            path = f"scenes.{scene_id}"
+            if not isinstance(scene, dict):
+                self.error(path, "harus object")
+                continue
+            scenes[scene_id] = Scene(
+                scene_id,
+                self.field(scene, 'title', path, str, scene_id),
+                self.field(scene, 'type', path, str, 'dialogue'),
+                self.field(scene, 'description', path, str, ''),
+                self.conditions(scene, 'conditions', path)
+            )
+        
+        characters = {}
+        for npc_id, npc in self.mapping(data, 'characters', 'case').items():
+            path = f"characters.{npc_id}"
+            if not isinstance(npc, dict):
+                self.error(path, "harus object")
+                continue
+            dialogues = {}
+            for dlg_id, dlg in self.mapping(npc, 'dialogues', path, required=True).items():
+                dlg_path = f"{path}.dialogues.{dlg_id}"
+                if not isinstance(dlg, dict):
+                    self.error(dlg_path, "harus object")
+                    continue
+                choices = []
+                for i, choice in enumerate(self.field(dlg, 'choices', dlg_path, list, [])):
+                    if not isinstance(choice, dict):
+                        self.error(f"{dlg_path}.choices[{i}]", "harus object")
+                        continue
+                    choice_path = f"{dlg_path}.choices[{i}]"
+                    choices.append(DialogueChoice(
+                        self.field(choice, 'text', choice_path, str, ''),
+                        self.field(choice, 'next', choice_path, str)
+                    ))
+                dialogues[dlg_id] = Dialogue(
+                    dlg_id,
+                    self.field(dlg, 'text', dlg_path, str, '', required=True),
+                    self.field(dlg, 'question', dlg_path, str),
+                    tuple(choices),
+                    self.conditions(dlg, 'conditions', dlg_path),
+                    self.outcome(dlg, 'on_correct', dlg_path),
+                    self.outcome(dlg, 'on_incorrect', dlg_path)
+                )
+            characters[npc_id] = Character(
+                npc_id,
+                self.field(npc, 'name', path, str, npc_id, required=True),
+                self.field(npc, 'role', path, str, 'Unknown'),
+                self.field(npc, 'description', path, str, ''),
+                self.field(npc, 'first_dialogue', path, str, '', required=True),
+                dialogues,
+                self.conditions(npc, 'conditions', path)
+            )
+        
+        questions = self.questions(data, 'questions', 'case')
+        
+        clues = {}
+        for clue_id, clue in self.mapping(data, 'clues', 'case').items():
+            path = f"clues.{clue_id}"
+            if not isinstance(clue, dict):
+                self.error(path, "harus object")
+                continue
+            unlock = self.mapping(clue, 'unlock_requirement', path)
+            unlock_path = f"{path}.unlock_requirement"
+            clues[clue_id] = Clue(
+                clue_id,
+                self.field(clue, 'name', path, str, clue_id, required=True),
+                self.field(clue, 'description', path, str, ''),
+                self.field(clue, 'category', path, str, 'general'),
+                self.field(unlock, 'question_id', unlock_path, str),
+                self.field(unlock, 'required_correct', unlock_path, bool, True),
+                self.id_list(unlock, 'requires_evidence', unlock_path)
+            )
+        
+        endings = []
+        for i, ending in enumerate(self.field(data, 'endings', 'case', list, [])):
+            path = f"endings[{i}]"
+            if not isinstance(ending, dict):
+                self.error(path, "harus object")
+                continue
+            endings.append(Ending(
+                self.field(ending, 'id', path, str, f'ending_{i}', required=True),
+                self.field(ending, 'type', path, str, 'unknown'),
+                self.field(ending, 'title', path, str, 'Ending'),
+                self.field(ending, 'text', path, str, ''),
+                self.id_list(ending, 'required_evidence', path),
+                self.conditions(ending, 'conditions', path),
+                self.conditions(ending, 'flags', path),
+                self.field(ending, 'min_evidence', path, int, 0),
+                self.field(ending, 'max_evidence', path, float, float('inf')),
+                self.field(ending, 'min_accuracy', path, float, 0)
+            ))
+        
+        case = Case(
+            self.case_id,
+            self.field(data, 'title', 'case', str, self.case_id, required=True),
+            self.field(data, 'description', 'case', str, ''),
+            self.field(data, 'start_location', 'case', str, '', required=True),
+            locations, characters, questions, clues, scenes, tuple(endings),
+            self.id_list(data, 'question_banks', 'case')
+        )
+        self.check_references(case)
+        
+        if self.errors:
+            raise CaseSchemaError(self.case_id, self.errors, self.codes)
+        return case
+    
+    def check_references(self, case: Case) -> None:
+        """Cek semua id yang saling mereferensikan"""
+        if case.start_location and case.start_location not in case.locations:
+            self.error('case.start_location', f"lokasi '{case.start_location}' tidak ada", 'dangling_ref')
+        
+        for loc in case.locations.values():
+            path = f"locations.{loc.id}"
+            for scene_id in loc.scenes:
+                if scene_id not in case.scenes:
+                    self.error(path, f"scene '{scene_id}' tidak ada", 'dangling_ref')
+            for npc_id in loc.npcs:
+                if npc_id not in case.characters:
+                    self.error(path, f"NPC '{npc_id}' tidak ada", 'dangling_ref')
+            for target, _ in loc.exits:
+                if target not in case.locations:
+                    self.error(path, f"exit ke lokasi '{target}' tidak ada", 'dangling_ref')
+        
+        for npc in case.characters.values():
+            path = f"characters.{npc.id}"
+            if npc.first_dialogue and npc.first_dialogue not in npc.dialogues:
+                self.error(path, f"first_dialogue '{npc.first_dialogue}' tidak ada", 'dangling_ref')
+            for dlg in npc.dialogues.values():
+                dlg_path = f"{path}.dialogues.{dlg.id}"
+                if dlg.question and dlg.question not in case.questions:
+                    self.error(dlg_path, f"pertanyaan '{dlg.question}' tidak ada", 'dangling_ref')
+                for choice in dlg.choices:
+                    if choice.next and choice.next not in npc.dialogues:
+                        self.error(dlg_path, f"dialog lanjutan '{choice.next}' tidak ada", 'dangling_ref')
+                self.check_outcome_evidence(case, dlg.on_correct, f"{dlg_path}.on_correct")
+                self.check_outcome_evidence(case, dlg.on_incorrect, f"{dlg_path}.on_incorrect")
+        
+        for question in case.questions.values():
+            path = f"questions.{question.id}"
+            self.check_outcome_evidence(case, question.on_correct, f"{path}.on_correct")
+            self.check_outcome_evidence(case, question.on_incorrect, f"{path}.on_incorrect")
+        
+        for clue in case.clues.values():
+            path = f"clues.{clue.id}"
+            if clue.unlock_question and clue.unlock_question not in case.questions:
+                self.error(path, f"pertanyaan unlock '{clue.unlock_question}' tidak ada", 'dangling_ref')
+            for evidence_id in clue.requires_evidence:
+                if evidence_id not in case.clues:
+                    self.error(path, f"bukti syarat '{evidence_id}' tidak ada", 'dangling_ref')
+        
+        for i, ending in enumerate(case.endings):
+            for evidence_id in ending.required_evidence:
+                if evidence_id not in case.clues:
+                    self.error(f"endings[{i}]", f"bukti '{evidence_id}' tidak ada", 'dangling_ref')
+    
+    def check_outcome_evidence(self, case: Case, outcome: Outcome, path: str) -> None:
+        for evidence_id in outcome.evidence:
+            if evidence_id not in case.clues:
+                self.error(path, f"bukti '{evidence_id}' tidak ada", 'dangling_ref')
+
+
+def build_questions(data: Any, owner_id: str) -> Dict[str, Question]:
+    """
+    Validasi dan bangun soal dari dict {'questions': {...}} di luar kasus (bank soal)
+    Raise CaseSchemaError berisi semua error jika data tidak valid
+    """
+    builder = _CaseBuilder(data, owner_id)
+    if not isinstance(data, dict):
+        raise CaseSchemaError(owner_id, ["root JSON harus object"])
+    questions = builder.questions(data, 'questions', owner_id)
+    if builder.errors:
+        raise CaseSchemaError(owner_id, builder.errors, builder.codes)
+    return questions
+
+
+def build_case(data: Dict, case_id: str) -> Case:
+    """
+    Validasi dict JSON kasus dan bangun model objeknya
+    Raise CaseSchemaError berisi semua error jika data tidak valid
+    """
+    return _CaseBuilder(data, case_id).build()
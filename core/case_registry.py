@@ -0,0 +1,189 @@
+"""
+CaseRegistry - Katalog kasus yang tersedia
+Menyimpan index metadata kecil dan memuat isi kasus secara lazy
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from core.case_cache import DEFAULT_CACHE_DIR, CaseCache, default_case_cache
+from core.case_model import Case
+from core.case_store import CaseStore, open_case_store
+
+
+# Naikkan jika struktur file index berubah
+INDEX_FORMAT_VERSION = 2
+
+
+class CaseInfo:
+    """Metadata ringkas satu kasus (tanpa isi kasus)"""
+    
+    __slots__ = ('id', 'title', 'description', 'size', 'content_hash', 'version')
+    
+    def __init__(self, case_id: str, title: str, description: str,
+                 size: int, content_hash: str, version: int):
+        self.id = case_id
+        self.title = title
+        self.description = description
+        self.size = size
+        self.content_hash = content_hash
+        self.version = version  # Versi sumber (mtime, CRC, dll. tergantung store)
+    
+    def to_dict(self) -> Dict:
+        """Konversi ke dict untuk disimpan di index"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'size': self.size,
+            'content_hash': self.content_hash,
+            'version': self.version
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CaseInfo':
+        """Buat CaseInfo dari entry index"""
+        return cls(data['id'], data['title'], data['description'],
+                   data['size'], data['content_hash'], data['version'])
+    
+    def __repr__(self) -> str:
+        return f"CaseInfo({self.id}: {self.title})"
+
+
+class CaseRegistry:
+    """
+    Registry kasus di atas satu CaseStore
+    - index metadata disimpan di disk, hanya kasus yang berubah yang dibaca ulang
+    - isi kasus dimuat saat pertama dipakai lewat CaseCache (LRU terbatas)
+    """
+    
+    def __init__(self, store: Optional[CaseStore] = None, case_cache: Optional[CaseCache] = None,
+                 index_path: Optional[str] = None, persist_index: bool = True):
+        self.store = store or open_case_store()
+        self.case_cache = case_cache or default_case_cache
+        if index_path is None and persist_index:
+            # Satu file index per store
+            store_hash = hashlib.sha1(self.store.key.encode('utf-8')).hexdigest()[:12]
+            index_path = os.path.join(DEFAULT_CACHE_DIR, f'case_index.{store_hash}.json')
+        self.index_path = index_path if persist_index else None  # None = index hanya di memori
+        self._index: Dict[str, CaseInfo] = {}
+        self._scanned = False
+        self._lock = threading.Lock()
+    
+    def list_cases(self) -> List[CaseInfo]:
+        """Ambil daftar metadata kasus, urut berdasarkan id"""
+        self._ensure_scanned()
+        return [self._index[case_id] for case_id in sorted(self._index)]
+    
+    def get_info(self, case_id: str) -> Optional[CaseInfo]:
+        """Ambil metadata satu kasus"""
+        self._ensure_scanned()
+        return self._index.get(case_id)
+    
+    def has_case(self, case_id: str) -> bool:
+        """Cek apakah kasus ada di katalog"""
+        return self.get_info(case_id) is not None
+    
+    def load_case(self, case_id: str) -> Case:
+        """
+        Muat isi lengkap kasus (lazy, lewat cache)
+        Raise FileNotFoundError jika kasus tidak ada, CaseSchemaError jika tidak valid
+        """
+        return self.case_cache.load(self.store, case_id)
+    
+    def is_loaded(self, case_id: str) -> bool:
+        """Cek apakah isi kasus sedang ada di memori"""
+        return self.case_cache.is_loaded(self.store, case_id)
+    
+    def refresh(self) -> None:
+        """Scan ulang store dan perbarui index"""
+        with self._lock:
+            self._scan()
+    
+    def _ensure_scanned(self) -> None:
+        if self._scanned:
+            return
+        with self._lock:
+            if not self._scanned:
+                self._scan()
+    
+    def _scan(self) -> None:
+        """Sinkronkan index dengan isi store (hanya stat untuk kasus lama)"""
+        previous = self._index or self._read_index()
+        index = {}
+        changed = False
+        
+        for case_id, size, version in self.store.iter_entries():
+            info = previous.get(case_id)
+            if info is None or info.size != size or info.version != version:
+                info = self._build_info(case_id, size, version)
+                if info is None:
+                    continue
+                changed = True
+            index[case_id] = info
+        
+        if changed or set(index) != set(previous):
+            self._write_index(index)
+        self._index = index
+        self._scanned = True
+    
+    def _build_info(self, case_id: str, size: int, version: int) -> Optional[CaseInfo]:
+        """Ambil metadata satu kasus (isi kasus hanya dibaca jika store tidak menyimpan metadata)"""
+        try:
+            metadata = self.store.read_metadata(case_id)
+        except (OSError, ValueError):
+            # Kasus rusak tidak ditampilkan di katalog
+            return None
+        return CaseInfo(
+            case_id,
+            metadata['title'],
+            metadata['description'],
+            size,
+            metadata['content_hash'],
+            version
+        )
+    
+    def _read_index(self) -> Dict[str, CaseInfo]:
+        """Baca index dari disk"""
+        if not self.index_path:
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_FORMAT_VERSION:
+                return {}
+            return {item['id']: CaseInfo.from_dict(item) for item in data.get('cases', [])}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+    
+    def _write_index(self, index: Dict[str, CaseInfo]) -> None:
+        """Tulis index ke disk secara atomik"""
+        if not self.index_path:
+            return
+        data = {
+            'version': INDEX_FORMAT_VERSION,
+            'cases': [index[case_id].to_dict() for case_id in sorted(index)]
+        }
+        directory = os.path.dirname(self.index_path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# Registry bersama untuk direktori kasus default (data/cases/)
+default_case_registry = CaseRegistry()
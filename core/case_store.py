@@ -0,0 +1,309 @@
+"""
+CaseStore - Sumber data kasus
+Backend: direktori file JSON, content pack zip, dan database SQLite
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Root project (folder yang berisi data/)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CASES_DIR = os.path.join(BASE_DIR, 'data', 'cases')
+
+# (case_id, size, version) - version berubah setiap isi kasus berubah
+CaseEntry = Tuple[str, int, int]
+
+# Member pack zip berisi metadata per kasus (title, description, content_hash, crc)
+ZIP_MANIFEST = '_manifest.json'
+
+
+def is_safe_case_id(case_id: str) -> bool:
+    """Id kasus bisa dipakai sebagai nama file: tanpa pemisah path, drive, '..' atau NUL"""
+    return bool(case_id) and '..' not in case_id and not any(char in case_id for char in '/\\:\0')
+
+
+def content_hash(body: bytes) -> str:
+    """Hash isi kasus (sha256 hex) yang disimpan di index katalog"""
+    return hashlib.sha256(body).hexdigest()
+
+
+def body_metadata(case_id: str, body: bytes) -> Dict:
+    """Metadata katalog (title, description, content_hash) dari isi JSON kasus"""
+    data = json.loads(body.decode('utf-8'))
+    return {
+        'title': data.get('title', case_id),
+        'description': data.get('description', ''),
+        'content_hash': content_hash(body)
+    }
+
+
+class CaseStore(ABC):
+    """Interface backend penyimpanan kasus"""
+    
+    def __init__(self, location: str):
+        self.location = os.path.abspath(location)
+        # Identitas unik store, dipakai sebagai bagian key cache
+        self.key = f"{type(self).__name__}:{self.location}"
+    
+    @abstractmethod
+    def iter_entries(self) -> Iterator[CaseEntry]:
+        """Iterasi (case_id, size, version) tanpa membaca isi kasus"""
+    
+    @abstractmethod
+    def stat(self, case_id: str) -> Optional[Tuple[int, int]]:
+        """Ambil (size, version) satu kasus, None jika tidak ada"""
+    
+    @abstractmethod
+    def read(self, case_id: str) -> bytes:
+        """Baca isi JSON kasus, raise FileNotFoundError jika tidak ada"""
+    
+    def read_metadata(self, case_id: str) -> Dict:
+        """
+        Ambil title, description dan content_hash kasus
+        Default membaca isi kasus; backend yang menyimpan metadata terpisah meng-override
+        """
+        return body_metadata(case_id, self.read(case_id))
+    
+    def list_ids(self) -> List[str]:
+        """Ambil semua id kasus, urut"""
+        return sorted(case_id for case_id, _, _ in self.iter_entries())
+    
+    def close(self) -> None:
+        """Tutup resource yang dipegang store"""
+        pass
+    
+    def __enter__(self) -> 'CaseStore':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DirectoryCaseStore(CaseStore):
+    """Satu file JSON per kasus di dalam direktori (layout data/cases/)"""
+    
+    def __init__(self, location: str = DEFAULT_CASES_DIR):
+        super().__init__(location)
+    
+    def _path(self, case_id: str) -> str:
+        """
+        Path file kasus; id yang tidak lolos is_safe_case_id ditolak (dianggap tidak ada)
+        agar id dari pemain tidak bisa keluar dari direktori store
+        """
+        if not is_safe_case_id(case_id):
+            raise FileNotFoundError(f"Id kasus tidak valid: {case_id!r}")
+        return os.path.join(self.location, f'{case_id}.json')
+    
+    def iter_entries(self) -> Iterator[CaseEntry]:
+        try:
+            entries = list(os.scandir(self.location))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                stat = entry.stat()
+                yield entry.name[:-len('.json')], stat.st_size, stat.st_mtime_ns
+    
+    def stat(self, case_id: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._path(case_id))
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def read(self, case_id: str) -> bytes:
+        with open(self._path(case_id), 'rb') as f:
+            return f.read()
+
+
+class ZipCaseStore(CaseStore):
+    """
+    Content pack zip berisi <case_id>.json, dibaca lewat satu handle terbuka
+    Metadata katalog diambil dari ZIP_MANIFEST jika CRC entry masih cocok
+    Raise ValueError jika dua member (di folder berbeda) punya case_id yang sama
+    """
+    
+    def __init__(self, location: str):
+        super().__init__(location)
+        self._zip = zipfile.ZipFile(self.location, 'r')
+        self._lock = threading.Lock()
+        # Index nama -> ZipInfo, lookup O(1) tanpa scan central directory
+        self._members = {}
+        manifest = None
+        for info in self._zip.infolist():
+            if info.filename == ZIP_MANIFEST:
+                manifest = info
+                continue
+            name = os.path.basename(info.filename)
+            if not name.endswith('.json') or info.is_dir():
+                continue
+            case_id = name[:-len('.json')]
+            other = self._members.get(case_id)
+            if other is not None:
+                self._zip.close()
+                raise ValueError(f"Kasus {case_id} ganda di {self.location}: "
+                                 f"{other.filename} dan {info.filename}")
+            self._members[case_id] = info
+        self._manifest = self._read_manifest(manifest) if manifest else {}
+    
+    def _read_manifest(self, info: zipfile.ZipInfo) -> Dict[str, Dict]:
+        try:
+            data = json.loads(self._zip.read(info).decode('utf-8'))
+            return {case_id: entry for case_id, entry in data['cases'].items()
+                    if isinstance(entry, dict)}
+        except (ValueError, KeyError, TypeError, AttributeError, zipfile.BadZipFile):
+            return {}  # Manifest rusak: metadata dibaca dari isi kasus
+    
+    def _version(self, info: zipfile.ZipInfo) -> int:
+        # CRC isi + ukuran cukup untuk mendeteksi perubahan entry
+        return (info.CRC << 32) | (info.file_size & 0xFFFFFFFF)
+    
+    def iter_entries(self) -> Iterator[CaseEntry]:
+        for case_id, info in self._members.items():
+            yield case_id, info.file_size, self._version(info)
+    
+    def stat(self, case_id: str) -> Optional[Tuple[int, int]]:
+        info = self._members.get(case_id)
+        if info is None:
+            return None
+        return info.file_size, self._version(info)
+    
+    def read(self, case_id: str) -> bytes:
+        info = self._members.get(case_id)
+        if info is None:
+            raise FileNotFoundError(f"{case_id} tidak ada di {self.location}")
+        with self._lock:
+            return self._zip.read(info)
+    
+    def read_metadata(self, case_id: str) -> Dict:
+        # Entry manifest hanya dipercaya jika CRC-nya sama dengan member saat ini
+        entry = self._manifest.get(case_id)
+        info = self._members.get(case_id)
+        if entry is not None and info is not None and entry.get('crc') == info.CRC:
+            try:
+                return {key: entry[key] for key in ('title', 'description', 'content_hash')}
+            except KeyError:
+                pass
+        return super().read_metadata(case_id)
+    
+    def close(self) -> None:
+        self._zip.close()
+
+
+class SqliteCaseStore(CaseStore):
+    """Database SQLite dengan satu baris per kasus"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cases (
+            case_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            content_hash TEXT
+        )
+    """
+    
+    def __init__(self, location: str):
+        super().__init__(location)
+        self._conn = sqlite3.connect(self.location, check_same_thread=False)
+        self._conn.execute(self.SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cases)")}
+        if 'content_hash' not in columns:
+            # Database lama: hash diisi saat put berikutnya, sementara dihitung dari isi
+            self._conn.execute("ALTER TABLE cases ADD COLUMN content_hash TEXT")
+            self._conn.commit()
+        self._lock = threading.Lock()
+    
+    def iter_entries(self) -> Iterator[CaseEntry]:
+        with self._lock:
+            rows = self._conn.execute("SELECT case_id, size, version FROM cases").fetchall()
+        return iter(rows)
+    
+    def stat(self, case_id: str) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, version FROM cases WHERE case_id = ?", (case_id,)
+            ).fetchone()
+        return tuple(row) if row else None
+    
+    def read(self, case_id: str) -> bytes:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM cases WHERE case_id = ?", (case_id,)
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"{case_id} tidak ada di {self.location}")
+        return bytes(row[0])
+    
+    def read_metadata(self, case_id: str) -> Dict:
+        # Metadata punya kolom sendiri, isi kasus tidak perlu dibaca
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, description, content_hash FROM cases WHERE case_id = ?", (case_id,)
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"{case_id} tidak ada di {self.location}")
+        title, description, digest = row
+        if digest is None:
+            digest = content_hash(self.read(case_id))  # Baris dari database lama
+        return {'title': title, 'description': description, 'content_hash': digest}
+    
+    def put(self, case_id: str, body: bytes) -> None:
+        """Tambah atau ganti satu kasus"""
+        metadata = body_metadata(case_id, body)
+        # Version diturunkan dari hash isi agar stabil antar import
+        version = int(metadata['content_hash'][:16], 16) >> 1
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cases (case_id, title, description, body, size, version, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (case_id, metadata['title'], metadata['description'],
+                 body, len(body), version, metadata['content_hash'])
+            )
+    
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_case_store(location: Optional[str] = None) -> CaseStore:
+    """Buka store berdasarkan jenis lokasi (direktori, .zip, atau .db/.sqlite)"""
+    if location is None:
+        return DirectoryCaseStore()
+    if os.path.isdir(location):
+        return DirectoryCaseStore(location)
+    if location.endswith('.zip'):
+        return ZipCaseStore(location)
+    if location.endswith(('.db', '.sqlite', '.sqlite3')):
+        return SqliteCaseStore(location)
+    raise ValueError(f"Jenis case store tidak dikenal: {location}")
+
+
+def export_zip_pack(source: CaseStore, path: str) -> int:
+    """Kemas semua kasus dari store sumber menjadi satu content pack zip (+ manifest metadata)"""
+    manifest = {}
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as pack:
+        for case_id in source.list_ids():
+            body = source.read(case_id)
+            pack.writestr(f'{case_id}.json', body)
+            manifest[case_id] = dict(body_metadata(case_id, body), crc=zipfile.crc32(body))
+        pack.writestr(ZIP_MANIFEST, json.dumps({'cases': manifest}, ensure_ascii=False))
+    return len(manifest)
+
+
+def export_sqlite(source: CaseStore, path: str) -> int:
+    """Salin semua kasus dari store sumber ke database SQLite"""
+    count = 0
+    with SqliteCaseStore(path) as target:
+        for case_id in source.list_ids():
+            target.put(case_id, source.read(case_id))
+            count += 1
+    return count
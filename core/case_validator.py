@@ -0,0 +1,211 @@
+"""
+CaseValidator - Linter isi kasus untuk pipeline authoring
+Selain validasi skema build_case, mengecek hal yang membuat kasus tidak bisa
+diselesaikan menurut aturan SessionEngine: flag yang dibaca tapi tidak pernah
+ditulis, bukti yang tidak bisa didapat, jawaban yang tidak ada di opsi, dan
+lokasi yang tidak bisa dicapai. Banyak kasus divalidasi paralel di process pool
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set
+
+from core.answer_matcher import get_answer_matcher
+from core.case_model import Case, CaseSchemaError, build_case
+from core.case_store import CaseStore, open_case_store
+from core.question_bank import load_question_bank
+from core.session_engine import CHECKPOINT_QUESTIONS, SEARCH_CLUES
+
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+def _issue(code: str, severity: str, path: str, message: str) -> Dict:
+    return {'code': code, 'severity': severity, 'path': path, 'message': message}
+
+
+def _reachable_locations(case: Case) -> List[str]:
+    """Lokasi yang bisa dicapai dari start_location lewat exit (urutan BFS)"""
+    neighbors = case.index.location_neighbors
+    order = [case.start_location]
+    seen = {case.start_location}
+    for location_id in order:
+        for target in neighbors.get(location_id, ()):
+            if target not in seen:
+                seen.add(target)
+                order.append(target)
+    return order
+
+
+def _asked_questions(case: Case, locations: List[str]) -> Set[str]:
+    """
+    Soal yang bisa ditanyakan engine: soal di dialog pertama NPC yang muncul
+    di lokasi terjangkau, ditambah soal checkpoint pilihan ganda
+    """
+    asked = set()
+    for location_id in locations:
+        for npc_id in case.locations[location_id].npcs:
+            npc = case.characters[npc_id]
+            question_id = npc.dialogues[npc.first_dialogue].question
+            if question_id:
+                asked.add(question_id)
+    for question_id in CHECKPOINT_QUESTIONS:
+        question = case.questions.get(question_id)
+        if question and question.type == 'multiple_choice':
+            asked.add(question_id)
+    return asked
+
+
+def lint_case(case: Case) -> List[Dict]:
+    """Cek semantik kasus yang sudah lolos skema, return daftar issue"""
+    issues = []
+    index = case.index
+    matcher = get_answer_matcher(case)
+    
+    # Lokasi yang tidak bisa dicapai
+    locations = _reachable_locations(case)
+    reachable = set(locations)
+    for location_id in case.locations:
+        if location_id not in reachable:
+            issues.append(_issue('unreachable_location', WARNING, f"locations.{location_id}",
+                                 f"tidak ada jalur exit dari '{case.start_location}'"))
+    
+    # Bank soal bersama: harus ada dan valid, id soal kasus sebaiknya tidak menutupi id bank
+    for bank_id in case.question_banks:
+        try:
+            bank = load_question_bank(bank_id)
+        except FileNotFoundError as e:
+            issues.append(_issue('dangling_ref', ERROR, 'question_banks', str(e)))
+            continue
+        except CaseSchemaError as e:
+            issues.append(_issue('schema', ERROR, 'question_banks', f"bank '{bank_id}' tidak valid ({len(e.errors)} error)"))
+            continue
+        for question_id in case.questions:
+            if question_id in bank:
+                issues.append(_issue('question_shadowed', WARNING, f"questions.{question_id}",
+                                     f"menutupi soal dengan id sama di bank '{bank_id}'"))
+    
+    # Soal pilihan ganda yang jawabannya tidak ada di opsi
+    for question in case.questions.values():
+        if question.type != 'multiple_choice':
+            continue
+        answer_key = matcher.keys[question.id]
+        if not any(answer_key.matches(option) for option in question.options):
+            issues.append(_issue('answer_not_in_options', ERROR, f"questions.{question.id}",
+                                 f"correct_answer '{question.correct_answer}' tidak ada di options"))
+    
+    # Yang benar-benar diterapkan engine: outcome soal yang ditanyakan,
+    # bukti dari pencarian, dan flag checkpoint
+    asked = _asked_questions(case, locations)
+    written = set(CHECKPOINT_QUESTIONS.values())
+    obtainable = {clue_id for clue_id, _ in SEARCH_CLUES}
+    for question_id in asked:
+        question = case.questions[question_id]
+        for outcome in (question.on_correct, question.on_incorrect):
+            written.update(name for name, _ in outcome.flags)
+            obtainable.update(outcome.evidence)
+    
+    for question_id in case.questions:
+        if question_id not in asked:
+            issues.append(_issue('question_never_asked', WARNING, f"questions.{question_id}",
+                                 "tidak ada di dialog pertama NPC yang bisa dicapai dan bukan soal checkpoint"))
+    
+    # Flag yang dibaca tapi tidak pernah ditulis
+    for flag_name, readers in index.flag_readers.items():
+        if flag_name in written:
+            continue
+        writers = index.flag_writers.get(flag_name, ())
+        detail = (f"hanya ditulis oleh {', '.join(writers)} (tidak diterapkan engine)"
+                  if writers else "tidak ada outcome yang menulisnya")
+        for path in readers:
+            issues.append(_issue('flag_never_written', ERROR, path, f"flag '{flag_name}' {detail}"))
+    
+    # Bukti yang tidak bisa didapat
+    for clue_id in case.clues:
+        if clue_id in obtainable:
+            continue
+        sources = index.clue_sources.get(clue_id, ())
+        detail = (f"hanya diberikan oleh {', '.join(sources)} (tidak diterapkan engine)"
+                  if sources else "tidak diberikan oleh soal maupun pencarian")
+        issues.append(_issue('clue_unobtainable', ERROR, f"clues.{clue_id}", detail))
+        for ending_id in index.clue_endings.get(clue_id, ()):
+            issues.append(_issue('ending_unreachable', WARNING, f"endings.{ending_id}",
+                                 f"mensyaratkan bukti '{clue_id}' yang tidak bisa didapat"))
+    
+    return issues
+
+
+def validate_case_data(raw: bytes, case_id: str) -> List[Dict]:
+    """Validasi isi JSON satu kasus: parse, skema, referensi, lalu lint"""
+    try:
+        data = json.loads(raw.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        return [_issue('json', ERROR, 'case', str(e))]
+    try:
+        case = build_case(data, case_id)
+    except CaseSchemaError as e:
+        issues = []
+        for code, error in zip(e.codes, e.errors):
+            path, _, message = error.partition(': ')
+            issues.append(_issue(code, ERROR, path, message))
+        return issues
+    return lint_case(case)
+
+
+def validate_case(store: CaseStore, case_id: str) -> Dict:
+    """Validasi satu kasus dari store, hasil berisi issue dan waktu proses"""
+    started = time.perf_counter()
+    try:
+        issues = validate_case_data(store.read(case_id), case_id)
+    except OSError as e:
+        issues = [_issue('read', ERROR, 'case', str(e))]
+    seconds = time.perf_counter() - started
+    errors = sum(1 for issue in issues if issue['severity'] == ERROR)
+    return {
+        'case_id': case_id,
+        'ok': errors == 0,
+        'errors': errors,
+        'warnings': len(issues) - errors,
+        'seconds': seconds,
+        'issues': issues
+    }
+
+
+# ========== Process pool ==========
+
+_worker_store: Optional[CaseStore] = None
+
+
+def _init_worker(store_location: Optional[str]) -> None:
+    global _worker_store
+    _worker_store = open_case_store(store_location)
+
+
+def _validate_chunk(case_ids: List[str]) -> List[Dict]:
+    return [validate_case(_worker_store, case_id) for case_id in case_ids]
+
+
+def validate_store(store_location: Optional[str] = None, case_ids: Optional[List[str]] = None,
+                   workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Validasi kasus di store (default: semua), hasil di-yield per kasus
+    urut id begitu chunk-nya selesai. workers=1 = tanpa pool
+    """
+    with open_case_store(store_location) as store:
+        case_ids = sorted(case_ids) if case_ids is not None else store.list_ids()
+        workers = min(workers or os.cpu_count() or 1, len(case_ids) or 1)
+        if workers == 1:
+            for case_id in case_ids:
+                yield validate_case(store, case_id)
+            return
+    
+    # Chunk kecil agar kasus besar tidak membuat satu worker tertinggal
+    chunk = max(1, min(64, len(case_ids) // (workers * 4)))
+    chunks = [case_ids[start:start + chunk] for start in range(0, len(case_ids), chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(store_location,)) as pool:
+        for results in pool.map(_validate_chunk, chunks):
+            yield from results
@@ -52,8 +52,7 @@ class ChoiceTracker:
         
         # Hapus bukti
         for evidence_id in consequence.get('evidence_change', {}).get('remove', []):
-            if evidence_id in game_manager.player_evidence:
-                game_manager.player_evidence.remove(evidence_id)
+            game_manager.remove_evidence(evidence_id)
     
     def get_critical_choices(self) -> List[Dict]:
         """Ambil pilihan kritis yang mempengaruhi ending"""
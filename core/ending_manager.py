@@ -3,9 +3,13 @@ EndingManager - Pengelola ending dan hasil permainan
 Menentukan ending berdasarkan keputusan dan bukti pemain
 """
 
-from typing import Dict, List, Optional
+import weakref
+from typing import Dict, Optional
 from enum import Enum
 
+from core.case_model import Case, Ending
+from core.ending_network import get_ending_network
+
 
 class EndingType(Enum):
     """Tipe-tipe ending yang mungkin"""
@@ -16,68 +20,98 @@ class EndingType(Enum):
     SPECIAL = "special"  # Ending khusus berdasarkan pilihan
 
 
+GENERIC_FAILURE_ENDING = Ending(
+    'generic_failure', 'failure', 'Penyelidikan Gagal',
+    'Anda tidak berhasil mengumpulkan bukti yang cukup. Pelaku berhasil lolos...',
+    (), (), (), 0, float('inf'), 0
+)
+
+
 class EndingManager:
     """Pengelola sistem ending dan hasil akhir"""
     
-    def __init__(self, case_data: Dict):
-        self.case_data = case_data
-        self.endings_data = case_data.get('endings', [])
+    def __init__(self, case: Case):
+        self.case = case
+        self.endings_data = case.endings
         self.achieved_ending = None
         
-    def evaluate_ending(self, game_manager) -> Optional[Dict]:
+        # Decision network dipakai bersama dengan GameManager.check_ending_condition
+        self.network = get_ending_network(case)
+        
+        # Hasil terakhir, dihitung ulang hanya jika flag/bukti yang disyaratkan ending berubah,
+        # jumlah bukti melewati batas min/max_evidence, atau akurasi berubah.
+        # Network tidak menyimpan hasil per ending, jadi yang dilacak satu hasil match
+        self._tracked = None  # weakref GameManager yang sedang diikuti
+        self._stale = True
+        self._cached_ending: Optional[Ending] = None
+        self._cached_accuracy: Optional[float] = None
+        self._cached_count_bucket = 0
+    
+    def evaluate_ending(self, game_manager, question_manager=None) -> Optional[Ending]:
         """
         Evaluasi ending yang dicapai berdasarkan state pemain
+        question_manager dipakai untuk syarat min_accuracy (tanpa itu syarat diabaikan)
         Return ending data jika ada yang match, None sebaliknya
         """
-        for ending in self.endings_data:
-            if self._check_ending_condition(ending, game_manager):
-                self.achieved_ending = ending
-                return ending
+        if self._tracked is None or self._tracked() is not game_manager:
+            self._track(game_manager)
+        
+        accuracy = None
+        if self.network.uses_accuracy:
+            if question_manager is not None:
+                accuracy = question_manager.get_accuracy()
+            if accuracy != self._cached_accuracy:
+                self._stale = True
+        
+        count_bucket = 0
+        if self.network.uses_count:
+            count_bucket = self.network.count_bucket(game_manager.get_evidence_count())
+            if count_bucket != self._cached_count_bucket:
+                self._stale = True
+        
+        if self._stale:
+            # First match menang, sesuai urutan endings_data
+            self._cached_ending = self.network.match(game_manager, accuracy)
+            self._cached_accuracy = accuracy
+            self._cached_count_bucket = count_bucket
+            self._stale = False
+        
+        if self._cached_ending is not None:
+            self.achieved_ending = self._cached_ending
+            return self._cached_ending
         
         # Jika tidak ada ending match, return generic failure
         return self._get_default_failure_ending()
     
-    def _check_ending_condition(self, ending: Dict, game_manager) -> bool:
-        """Cek apakah kondisi ending terpenuhi"""
-        
-        # Cek bukti yang diperlukan
-        required_evidence = set(ending.get('required_evidence', []))
-        player_evidence = set(game_manager.player_evidence)
-        
-        if not required_evidence.issubset(player_evidence):
-            return False
-        
-        # Cek flag conditions
-        conditions = ending.get('conditions', {})
-        for flag_name, expected_value in conditions.items():
-            if game_manager.get_flag(flag_name) != expected_value:
-                return False
-        
-        # Cek minimum/maximum evidence
-        min_evidence = ending.get('min_evidence', 0)
-        max_evidence = ending.get('max_evidence', float('inf'))
-        
-        evidence_count = game_manager.get_evidence_count()
-        if not (min_evidence <= evidence_count <= max_evidence):
-            return False
-        
-        # Cek question accuracy jika diperlukan
-        min_accuracy = ending.get('min_accuracy', 0)
-        # Accuracy dihitung dari QuestionManager
-        
-        return True
+    def _track(self, game_manager) -> None:
+        """Ikuti perubahan state game manager"""
+        previous = self._tracked() if self._tracked else None
+        if previous is not None:
+            previous.remove_state_listener(self._on_state_change)
+        game_manager.add_state_listener(self._on_state_change)
+        self._tracked = weakref.ref(game_manager)
+        self._stale = True
+    
+    def _on_state_change(self, kind: str, key: Optional[str]) -> None:
+        """Tandai hasil kadaluarsa jika perubahan menyentuh syarat ending"""
+        if kind == 'flag':
+            if self.network.depends_on_flag(key):
+                self._stale = True
+        elif kind == 'evidence':
+            if self.network.depends_on_evidence(key):
+                self._stale = True
+        else:
+            self._stale = True
     
     def get_ending_text(self, ending_id: str) -> Optional[str]:
         """Ambil teks ending"""
-        for ending in self.endings_data:
-            if ending.get('id') == ending_id:
-                return ending.get('text', '')
-        return None
+        ending = self.get_ending_data(ending_id)
+        return ending.text if ending else None
     
-    def get_ending_data(self, ending_id: str) -> Optional[Dict]:
+    def get_ending_data(self, ending_id: str) -> Optional[Ending]:
         """Ambil data lengkap ending"""
         for ending in self.endings_data:
-            if ending.get('id') == ending_id:
+            if ending.id == ending_id:
                 return ending
         return None
     
@@ -86,8 +120,7 @@ class EndingManager:
         if not self.achieved_ending:
             return None
         
-        ending_type = self.achieved_ending.get('type', 'unknown')
-        ending_id = self.achieved_ending.get('id', 'unknown')
+        ending_type = self.achieved_ending.type
         
         ratings = {
             'failure': {'emoji': '❌', 'text': 'Penyelidikan Gagal', 'color': 'red'},
@@ -108,38 +141,30 @@ class EndingManager:
         question_stats = question_manager.get_question_stats()
         
         stats = {
-            'ending_id': self.achieved_ending.get('id') if self.achieved_ending else None,
-            'ending_type': self.achieved_ending.get('type') if self.achieved_ending else None,
+            'ending_id': self.achieved_ending.id if self.achieved_ending else None,
+            'ending_type': self.achieved_ending.type if self.achieved_ending else None,
             'total_evidence': game_manager.get_evidence_count(),
             'critical_choices': len([c for c in game_manager.player_flags.items() if 'choice' in c[0]]),
             'question_stats': question_stats,
-            'flags_set': game_manager.player_flags
+            'flags_set': game_manager.player_flags.copy()
         }
         
         return stats
     
-    def _get_default_failure_ending(self) -> Dict:
+    def _get_default_failure_ending(self) -> Ending:
         """Return generic failure ending"""
-        return {
-            'id': 'generic_failure',
-            'type': 'failure',
-            'title': 'Penyelidikan Gagal',
-            'text': 'Anda tidak berhasil mengumpulkan bukti yang cukup. Pelaku berhasil lolos...',
-            'required_evidence': [],
-            'conditions': {}
-        }
+        return GENERIC_FAILURE_ENDING
     
     def is_good_ending(self) -> bool:
         """Cek apakah ending adalah 'good ending'"""
         if not self.achieved_ending:
             return False
         
-        ending_type = self.achieved_ending.get('type')
-        return ending_type in ['success', 'brilliant', 'special']
+        return self.achieved_ending.type in ['success', 'brilliant', 'special']
     
     def is_brilliant_ending(self) -> bool:
         """Cek apakah ending adalah brilliant ending"""
         if not self.achieved_ending:
             return False
         
-        return self.achieved_ending.get('type') == 'brilliant'
+        return self.achieved_ending.type == 'brilliant'
@@ -0,0 +1,342 @@
+"""
+EndingNetwork - Matcher ending berbasis decision network
+Tabel ending di-compile menjadi jaringan tes bersama (bukti, flag, jumlah bukti),
+sehingga ending pertama yang cocok ditemukan dengan jumlah tes sebanyak
+tes berbeda yang dilalui, bukan jumlah ending x jumlah kondisi
+"""
+
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from core.case_model import Case, Ending
+from systems.condition_checker import compile_simple
+
+
+# Satu tes atomik:
+#   ('evidence', mask)      - semua bukti di bitmask dimiliki (case.ending_masks, satu AND)
+#   ('evidence_id', id)     - bukti di luar tabel bit kasus dimiliki
+#   ('flag', name, value)   - get_flag(name) == value
+#   ('min_count', n)        - jumlah bukti >= n
+#   ('max_count', n)        - jumlah bukti <= n
+#   ('min_accuracy', n)     - akurasi jawaban (persen) >= n
+Test = Tuple
+
+# Kandidat ending di satu node: ((indeks ending, tes yang belum terbukti), ...)
+Candidates = Tuple[Tuple[int, FrozenSet[Test]], ...]
+
+
+def _hashable(value: Any) -> Any:
+    """Nilai flag list/dict dijadikan hashable untuk key tes"""
+    if isinstance(value, list):
+        return ('__list__',) + tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return ('__dict__',) + tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def ending_tests(ending: Ending, case: Case, required_mask: int) -> FrozenSet[Test]:
+    """
+    Semua syarat satu ending sebagai tes atomik
+    required_mask: bitmask required_evidence ending (case.ending_masks)
+    'conditions' dan 'flags' (key lama) sama-sama menjadi syarat flag
+    """
+    tests = set()
+    if required_mask:
+        tests.add(('evidence', required_mask))
+    for evidence_id in ending.required_evidence:
+        if evidence_id not in case.evidence_index:
+            tests.add(('evidence_id', evidence_id))
+    for flag_name, expected_value in ending.conditions + ending.flags:
+        tests.add(('flag', flag_name, _hashable(expected_value)))
+    if ending.min_evidence > 0:
+        tests.add(('min_count', ending.min_evidence))
+    if ending.max_evidence != float('inf'):
+        tests.add(('max_count', ending.max_evidence))
+    if ending.min_accuracy > 0:
+        tests.add(('min_accuracy', ending.min_accuracy))
+    return frozenset(tests)
+
+
+def _implied(test: Test, outcome: bool, other: Test) -> Optional[bool]:
+    """
+    Hasil tes lain yang bisa disimpulkan dari hasil satu tes
+    Return True/False jika sudah pasti, None jika tidak terpengaruh
+    """
+    if other == test:
+        return outcome
+    kind = test[0]
+    other_kind = other[0]
+    
+    if kind == 'evidence':
+        if other_kind != 'evidence':
+            return None
+        # Punya semua bukti mask = punya semua bukti subset-nya;
+        # kurang salah satu bukti mask = juga kurang untuk superset-nya
+        if outcome and other[1] & ~test[1] == 0:
+            return True
+        if not outcome and test[1] & ~other[1] == 0:
+            return False
+        return None
+    
+    if kind == 'flag':
+        if other_kind != 'flag' or other[1] != test[1]:
+            return None
+        if outcome:
+            # Flag sudah diketahui nilainya
+            return other[2] == test[2]
+        return False if other[2] == test[2] else None
+    
+    if kind == 'min_accuracy':
+        if other_kind != 'min_accuracy':
+            return None
+        # Akurasi >= n juga >= ambang yang lebih rendah, < n juga < ambang yang lebih tinggi
+        if outcome and other[1] <= test[1]:
+            return True
+        if not outcome and other[1] >= test[1]:
+            return False
+        return None
+    
+    if kind in ('min_count', 'max_count') and other_kind in ('min_count', 'max_count'):
+        # Ubah hasil tes menjadi interval jumlah bukti [low, high]
+        low, high = 0, float('inf')
+        if kind == 'min_count':
+            if outcome:
+                low = test[1]
+            else:
+                high = test[1] - 1
+        else:
+            if outcome:
+                high = test[1]
+            else:
+                low = test[1] + 1
+        
+        if other_kind == 'min_count':
+            if low >= other[1]:
+                return True
+            if high < other[1]:
+                return False
+        else:
+            if high <= other[1]:
+                return True
+            if low > other[1]:
+                return False
+    
+    return None
+
+
+def _accuracy_check(game_manager) -> bool:
+    # Penanda saja: tes akurasi dijalankan match_index dengan argumen accuracy
+    raise TypeError("Tes min_accuracy tidak bisa dijalankan terhadap GameManager")
+
+
+def _compile_test(test: Test, value: Any) -> Callable[[Any], bool]:
+    """Buat closure yang menjalankan satu tes terhadap GameManager"""
+    kind = test[0]
+    if kind == 'min_accuracy':
+        return _accuracy_check
+    if kind == 'evidence':
+        mask = test[1]
+        return lambda game_manager: game_manager.has_all_evidence(mask)
+    if kind == 'evidence_id':
+        return compile_simple('evidence', test[1], None)
+    if kind == 'flag':
+        return compile_simple('flag', test[1], value)
+    if kind == 'min_count':
+        return compile_simple('evidence_count_min', '', test[1])
+    return compile_simple('evidence_count_max', '', test[1])
+
+
+class _Node:
+    """Node jaringan: terminal (result) atau tes dengan dua cabang"""
+    
+    __slots__ = ('candidates', 'result', 'test', 'check', 'on_true', 'on_false')
+    
+    def __init__(self, candidates: Candidates):
+        self.candidates = candidates
+        self.result: Optional[int] = None
+        self.test: Optional[Test] = None
+        self.check: Optional[Callable[[Any], bool]] = None
+        self.on_true: Optional['_Node'] = None
+        self.on_false: Optional['_Node'] = None
+
+
+class EndingNetwork:
+    """
+    Decision network untuk tabel ending satu kasus
+    Node dibangun lazy saat pertama kali dilalui lalu di-cache (seperti lazy DFA),
+    sehingga tabel ratusan ending tidak perlu dieksplorasi penuh di awal
+    """
+    
+    def __init__(self, case: Case, max_nodes: int = 4096):
+        self.case = case
+        self.max_nodes = max_nodes
+        self.ending_tests = tuple(ending_tests(ending, case, mask)
+                                  for ending, mask in zip(case.endings, case.ending_masks))
+        
+        # Nilai asli flag untuk closure tes (key tes bisa berupa versi hashable)
+        self._test_values: Dict[Test, Any] = {}
+        for ending in case.endings:
+            for flag_name, expected_value in ending.conditions + ending.flags:
+                self._test_values[('flag', flag_name, _hashable(expected_value))] = expected_value
+        self._checks: Dict[Test, Callable[[Any], bool]] = {}
+        
+        # Dependency: perubahan apa saja yang bisa mengubah hasil match
+        all_tests = frozenset(t for tests in self.ending_tests for t in tests)
+        self.flag_names = frozenset(t[1] for t in all_tests if t[0] == 'flag')
+        self.evidence_mask = 0  # Gabungan semua required_evidence
+        for mask in case.ending_masks:
+            self.evidence_mask |= mask
+        self.extra_evidence_ids = frozenset(t[1] for t in all_tests if t[0] == 'evidence_id')
+        # Jumlah bukti tempat hasil tes min_count/max_count berubah (count >= batas)
+        self.count_bounds = tuple(sorted(
+            {t[1] for t in all_tests if t[0] == 'min_count'} |
+            {t[1] + 1 for t in all_tests if t[0] == 'max_count'}
+        ))
+        self.uses_count = bool(self.count_bounds)
+        self.uses_accuracy = any(t[0] == 'min_accuracy' for t in all_tests)
+        
+        self._lock = threading.Lock()
+        self._nodes: Dict[Candidates, _Node] = {}
+        self._root = self._node(tuple(enumerate(self.ending_tests)))
+    
+    def test_value(self, test: Test) -> Any:
+        """Nilai asli yang dibandingkan oleh tes flag"""
+        return self._test_values.get(test)
+    
+    def depends_on_flag(self, flag_name: str) -> bool:
+        """Cek apakah perubahan flag bisa mengubah hasil match"""
+        return flag_name in self.flag_names
+    
+    def depends_on_evidence(self, evidence_id: str) -> bool:
+        """
+        Cek apakah bukti tertentu disyaratkan ending
+        Efek ke jumlah bukti dicek terpisah lewat count_bucket
+        """
+        bit = self.case.evidence_index.get(evidence_id)
+        if bit is None:
+            return evidence_id in self.extra_evidence_ids
+        return bool((self.evidence_mask >> bit) & 1)
+    
+    def count_bucket(self, evidence_count: int) -> int:
+        """Rentang jumlah bukti; semua tes min_count/max_count sama hasilnya dalam satu rentang"""
+        return bisect_right(self.count_bounds, evidence_count)
+    
+    def match_index(self, game_manager, accuracy: Optional[float] = None) -> Optional[int]:
+        """
+        Indeks ending pertama (urutan case.endings) yang cocok, None jika tidak ada
+        accuracy = akurasi jawaban pemain (persen); None = syarat min_accuracy diabaikan
+        """
+        node = self._root
+        while node.check is not None:
+            check = node.check
+            if check is _accuracy_check:
+                passed = accuracy is None or accuracy >= node.test[1]
+            else:
+                passed = check(game_manager)
+            if passed:
+                child = node.on_true or self._expand(node, True)
+            else:
+                child = node.on_false or self._expand(node, False)
+            node = child
+        return node.result
+    
+    def match(self, game_manager, accuracy: Optional[float] = None) -> Optional[Ending]:
+        """Ending pertama yang cocok, None jika tidak ada"""
+        index = self.match_index(game_manager, accuracy)
+        return None if index is None else self.case.endings[index]
+    
+    def node_count(self) -> int:
+        """Jumlah node yang sudah dibangun"""
+        return len(self._nodes)
+    
+    def _expand(self, node: _Node, outcome: bool) -> _Node:
+        """Bangun cabang node yang belum pernah dilalui"""
+        with self._lock:
+            child = node.on_true if outcome else node.on_false
+            if child is not None:
+                return child
+            if len(self._nodes) >= self.max_nodes:
+                # Batas memori: mulai jaringan baru, jalur yang sedang dilalui tetap valid
+                self._nodes.clear()
+                self._root = self._node(self._root.candidates)
+            child = self._node(self._branch(node.candidates, node.test, outcome))
+            if outcome:
+                node.on_true = child
+            else:
+                node.on_false = child
+            return child
+    
+    def _branch(self, candidates: Candidates, test: Test, outcome: bool) -> Candidates:
+        """Kandidat yang tersisa setelah hasil satu tes diketahui"""
+        remaining = []
+        for index, tests in candidates:
+            pending = []
+            failed = False
+            for other in tests:
+                implied = _implied(test, outcome, other)
+                if implied is None:
+                    pending.append(other)
+                elif not implied:
+                    failed = True
+                    break
+            if not failed:
+                remaining.append((index, frozenset(pending)))
+        return tuple(remaining)
+    
+    def _node(self, candidates: Candidates) -> _Node:
+        """Ambil node untuk himpunan kandidat, buat jika belum ada"""
+        node = self._nodes.get(candidates)
+        if node is not None:
+            return node
+        
+        node = _Node(candidates)
+        if candidates:
+            first_index, first_tests = candidates[0]
+            if not first_tests:
+                # Kandidat pertama sudah terbukti: first match menang
+                node.result = first_index
+            else:
+                # Tes kandidat pertama yang paling banyak dipakai bersama
+                shared = {}
+                for _, tests in candidates:
+                    for test in tests:
+                        if test in first_tests:
+                            shared[test] = shared.get(test, 0) + 1
+                node.test = max(sorted(first_tests, key=repr), key=lambda t: shared[t])
+                node.check = self._check(node.test)
+        self._nodes[candidates] = node
+        return node
+    
+    def _check(self, test: Test) -> Callable[[Any], bool]:
+        check = self._checks.get(test)
+        if check is None:
+            check = _compile_test(test, self.test_value(test))
+            self._checks[test] = check
+        return check
+
+
+# Network dipakai bersama semua manager untuk kasus yang sama
+_networks = OrderedDict()  # id(case) -> (case, network)
+_networks_lock = threading.Lock()
+_MAX_NETWORKS = 32
+
+
+def get_ending_network(case: Case) -> EndingNetwork:
+    """Ambil (atau compile) ending network untuk satu kasus"""
+    key = id(case)
+    with _networks_lock:
+        entry = _networks.get(key)
+        if entry is not None and entry[0] is case:
+            _networks.move_to_end(key)
+            return entry[1]
+    
+    network = EndingNetwork(case)
+    with _networks_lock:
+        # Case ikut disimpan agar id() tidak dipakai ulang objek lain
+        _networks[key] = (case, network)
+        _networks.move_to_end(key)
+        while len(_networks) > _MAX_NETWORKS:
+            _networks.popitem(last=False)
+    return network
@@ -3,102 +3,265 @@ GameManager - Pengelola utama game
 Mengontrol flow game, state pemain, dan integrasi semua sistem
 """
 
-import json
-from typing import Dict, List, Any, Optional
+import weakref
+from typing import Callable, Dict, List, Any, Optional
+
+from core.case_model import Case, CaseSchemaError, Location
+from core.case_registry import CaseRegistry, default_case_registry
+from core.ending_network import get_ending_network
+from core.player_state import EvidenceView, FlagView
+
+
+_MISSING = object()
 
 
 class GameManager:
     """Pengelola utama state dan flow game"""
     
-    def __init__(self):
+    def __init__(self, case_registry: Optional[CaseRegistry] = None):
+        self.case_registry = case_registry or default_case_registry
         self.current_case = None
         self.current_location = None
-        self.player_flags = {}  # Tracking pilihan pemain
-        self.player_evidence = []  # Bukti yang dikumpulkan
-        self.case_data = {}
+        self.case: Optional[Case] = None
         self.game_state = "menu"  # menu, playing, ending
         self.ending_achieved = None
         
+        # Tabel bit dari kasus (id -> indeks bit)
+        self._evidence_ids = ()
+        self._evidence_index = {}
+        self._flag_ids = ()
+        self._flag_index = {}
+        
+        # Bukti: bitmask untuk bukti yang dikenal kasus, list untuk sisanya
+        self._evidence_mask = 0
+        self._extra_evidence = []
+        self._evidence_count = 0
+        
+        # Flag boolean: bit di set_mask = flag ada, bit di true_mask = nilainya True
+        self._flag_set_mask = 0
+        self._flag_true_mask = 0
+        self._flag_values = {}  # Flag non-boolean / tidak dikenal kasus
+        
+        # Listener perubahan state: callback(kind, key), kind = 'flag' | 'evidence' | 'reset'
+        self._state_listeners = []
+        
+        # Naik setiap flag, bukti, atau lokasi berubah (tidak pernah turun),
+        # dipakai sebagai kunci cache turunan state seperti tampilan lokasi
+        self.state_version = 0
+    
+    @property
+    def player_flags(self) -> FlagView:
+        """Tracking pilihan pemain (view dict di atas bitmask)"""
+        return FlagView(self)
+    
+    @player_flags.setter
+    def player_flags(self, flags: Dict[str, Any]) -> None:
+        self._flag_set_mask = 0
+        self._flag_true_mask = 0
+        self._flag_values = {}
+        for flag_name, value in dict(flags).items():
+            self.set_flag(flag_name, value)
+        self._notify_state_change('reset', None)
+    
+    @property
+    def player_evidence(self) -> EvidenceView:
+        """Bukti yang dikumpulkan (view list di atas bitmask)"""
+        return EvidenceView(self)
+    
+    @player_evidence.setter
+    def player_evidence(self, evidence: List[str]) -> None:
+        self._evidence_mask = 0
+        self._extra_evidence = []
+        self._evidence_count = 0
+        for evidence_id in list(evidence):
+            self.add_evidence(evidence_id)
+        self._notify_state_change('reset', None)
+    
+    @property
+    def evidence_mask(self) -> int:
+        """Bitmask bukti yang dimiliki (indeks dari case.evidence_index)"""
+        return self._evidence_mask
+    
+    def add_state_listener(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        """
+        Daftarkan callback yang dipanggil setiap flag/bukti berubah
+        Bound method disimpan sebagai weak reference agar manager lain bisa di-GC
+        """
+        if hasattr(callback, '__self__'):
+            self._state_listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._state_listeners.append(lambda: callback)
+    
+    def remove_state_listener(self, callback: Callable[[str, Optional[str]], None]) -> None:
+        """Hapus callback yang sudah didaftarkan"""
+        self._state_listeners = [ref for ref in self._state_listeners if ref() not in (None, callback)]
+    
+    def _notify_state_change(self, kind: str, key: Optional[str]) -> None:
+        """Kirim notifikasi perubahan state ke semua listener"""
+        self.state_version += 1
+        dead = False
+        for ref in self._state_listeners:
+            callback = ref()
+            if callback is None:
+                dead = True
+            else:
+                callback(kind, key)
+        if dead:
+            self._state_listeners = [ref for ref in self._state_listeners if ref() is not None]
+    
+    def open_case(self, case_id: str) -> Case:
+        """
+        Load kasus dan reset state pemain tanpa output ke terminal
+        Raise FileNotFoundError / CaseSchemaError jika gagal
+        """
+        # Data kasus dibagi bersama lewat cache, jangan dimodifikasi
+        case = self.case_registry.load_case(case_id)
+        self.case = case
+        self.current_case = case_id
+        self.current_location = case.start_location
+        self._set_bit_tables(case)
+        self.player_flags = {}
+        self.player_evidence = []
+        return case
+    
     def load_case(self, case_id: str) -> bool:
         """Load kasus dari data"""
         try:
-            with open(f'data/cases/{case_id}.json', 'r', encoding='utf-8') as f:
-                self.case_data = json.load(f)
-                self.current_case = case_id
-                self.current_location = self.case_data.get('start_location')
-                self.player_flags = {}
-                self.player_evidence = []
-                return True
+            self.open_case(case_id)
+            return True
         except FileNotFoundError:
             print(f"❌ Kasus {case_id} tidak ditemukan")
             return False
+        except CaseSchemaError as e:
+            print(f"❌ Kasus {case_id} tidak valid:")
+            for error in e.errors:
+                print(f"   - {error}")
+            return False
+    
+    def _set_bit_tables(self, case: Optional[Case]) -> None:
+        """Pakai tabel bit dari kasus yang sedang dimainkan"""
+        if case is None:
+            self._evidence_ids, self._evidence_index = (), {}
+            self._flag_ids, self._flag_index = (), {}
+        else:
+            self._evidence_ids, self._evidence_index = case.evidence_ids, case.evidence_index
+            self._flag_ids, self._flag_index = case.flag_ids, case.flag_index
     
     def set_flag(self, flag_name: str, value: Any) -> None:
         """Set flag pemain untuk tracking pilihan"""
-        self.player_flags[flag_name] = value
-        
+        bit = self._flag_index.get(flag_name)
+        if bit is not None and type(value) is bool:
+            self._flag_set_mask |= 1 << bit
+            if value:
+                self._flag_true_mask |= 1 << bit
+            else:
+                self._flag_true_mask &= ~(1 << bit)
+            self._flag_values.pop(flag_name, None)
+        else:
+            if bit is not None:
+                self._flag_set_mask &= ~(1 << bit)
+                self._flag_true_mask &= ~(1 << bit)
+            self._flag_values[flag_name] = value
+        self._notify_state_change('flag', flag_name)
+    
     def get_flag(self, flag_name: str, default: Any = None) -> Any:
         """Ambil nilai flag"""
-        return self.player_flags.get(flag_name, default)
+        bit = self._flag_index.get(flag_name)
+        if bit is not None and (self._flag_set_mask >> bit) & 1:
+            return bool((self._flag_true_mask >> bit) & 1)
+        return self._flag_values.get(flag_name, default)
+    
+    def clear_flag(self, flag_name: str) -> bool:
+        """Hapus flag, return False jika flag belum pernah di-set"""
+        bit = self._flag_index.get(flag_name)
+        if bit is not None and (self._flag_set_mask >> bit) & 1:
+            self._flag_set_mask &= ~(1 << bit)
+            self._flag_true_mask &= ~(1 << bit)
+        elif self._flag_values.pop(flag_name, _MISSING) is _MISSING:
+            return False
+        self._notify_state_change('flag', flag_name)
+        return True
     
     def add_evidence(self, evidence_id: str) -> bool:
         """Tambah bukti ke inventory"""
-        if evidence_id not in self.player_evidence:
-            self.player_evidence.append(evidence_id)
-            return True
-        return False
+        bit = self._evidence_index.get(evidence_id)
+        if bit is not None:
+            if (self._evidence_mask >> bit) & 1:
+                return False
+            self._evidence_mask |= 1 << bit
+        else:
+            if evidence_id in self._extra_evidence:
+                return False
+            self._extra_evidence.append(evidence_id)
+        self._evidence_count += 1
+        self._notify_state_change('evidence', evidence_id)
+        return True
+    
+    def remove_evidence(self, evidence_id: str) -> bool:
+        """Hapus bukti dari inventory"""
+        bit = self._evidence_index.get(evidence_id)
+        if bit is not None:
+            if not (self._evidence_mask >> bit) & 1:
+                return False
+            self._evidence_mask &= ~(1 << bit)
+        else:
+            if evidence_id not in self._extra_evidence:
+                return False
+            self._extra_evidence.remove(evidence_id)
+        self._evidence_count -= 1
+        self._notify_state_change('evidence', evidence_id)
+        return True
     
     def has_evidence(self, evidence_id: str) -> bool:
         """Cek apakah pemain punya bukti tertentu"""
-        return evidence_id in self.player_evidence
+        bit = self._evidence_index.get(evidence_id)
+        if bit is not None:
+            return bool((self._evidence_mask >> bit) & 1)
+        return evidence_id in self._extra_evidence
+    
+    def has_all_evidence(self, mask: int) -> bool:
+        """Cek apakah semua bukti dalam mask (lihat case.ending_masks) sudah dimiliki"""
+        return (self._evidence_mask & mask) == mask
     
     def get_evidence_count(self) -> int:
         """Hitung total bukti"""
-        return len(self.player_evidence)
+        return self._evidence_count
     
-    def get_location_data(self, location_id: str) -> Optional[Dict]:
+    def get_location_data(self, location_id: str) -> Optional[Location]:
         """Ambil data lokasi dari kasus"""
-        locations = self.case_data.get('locations', {})
-        return locations.get(location_id)
+        return self.case.locations.get(location_id)
     
     def move_to_location(self, location_id: str) -> bool:
         """Pindah ke lokasi baru"""
-        if location_id in self.case_data.get('locations', {}):
-            self.current_location = location_id
+        if location_id in self.case.locations:
+            if location_id != self.current_location:
+                self.current_location = location_id
+                self.state_version += 1
             return True
         return False
     
-    def check_ending_condition(self) -> Optional[str]:
-        """Cek apakah kondisi ending terpenuhi"""
-        endings = self.case_data.get('endings', [])
-        
-        for ending in endings:
-            required_evidence = set(ending.get('required_evidence', []))
-            player_evidence = set(self.player_evidence)
-            
-            # Cek bukti
-            if not required_evidence.issubset(player_evidence):
-                continue
-            
-            # Cek flag conditions
-            conditions_met = True
-            for flag_name, expected_value in ending.get('flags', {}).items():
-                if self.get_flag(flag_name) != expected_value:
-                    conditions_met = False
-                    break
-            
-            if conditions_met:
-                return ending.get('id')
-        
-        return None
+    def check_ending_condition(self, question_manager=None) -> Optional[str]:
+        """
+        Cek apakah kondisi ending terpenuhi (engine yang sama dengan EndingManager)
+        question_manager wajib jika ada ending dengan min_accuracy (raise ValueError jika tidak ada)
+        """
+        network = get_ending_network(self.case)
+        accuracy = None
+        if network.uses_accuracy:
+            if question_manager is None:
+                raise ValueError(f"Kasus {self.case.id} memakai min_accuracy: berikan question_manager")
+            accuracy = question_manager.get_accuracy()
+        ending = network.match(self, accuracy)
+        return ending.id if ending else None
     
     def reset_game(self) -> None:
         """Reset game state"""
         self.current_case = None
         self.current_location = None
+        self.case = None
+        self._set_bit_tables(None)
         self.player_flags = {}
         self.player_evidence = []
-        self.case_data = {}
         self.game_state = "menu"
         self.ending_achieved = None
 
@@ -108,11 +271,35 @@ class GameState:
     
     def __init__(self, game_manager: GameManager):
         self.location = game_manager.current_location
-        self.flags = game_manager.player_flags.copy()
-        self.evidence = game_manager.player_evidence.copy()
-    
+        # Bitmask cukup disalin sebagai int, hanya sisa non-bitmask yang dicopy
+        self.evidence_mask = game_manager._evidence_mask
+        self.extra_evidence = tuple(game_manager._extra_evidence)
+        self.evidence_count = game_manager._evidence_count
+        self.flag_set_mask = game_manager._flag_set_mask
+        self.flag_true_mask = game_manager._flag_true_mask
+        self.flag_values = game_manager._flag_values.copy()
+
+    @classmethod
+    def from_values(cls, location: Optional[str], evidence_mask: int, extra_evidence: tuple,
+                    flag_set_mask: int, flag_true_mask: int, flag_values: Dict[str, Any]) -> 'GameState':
+        """Buat snapshot dari nilai mentah (misalnya hasil decode save)"""
+        state = cls.__new__(cls)
+        state.location = location
+        state.evidence_mask = evidence_mask
+        state.extra_evidence = tuple(extra_evidence)
+        state.evidence_count = bin(evidence_mask).count('1') + len(state.extra_evidence)
+        state.flag_set_mask = flag_set_mask
+        state.flag_true_mask = flag_true_mask
+        state.flag_values = flag_values
+        return state
+
     def restore(self, game_manager: GameManager) -> None:
         """Restore state ke game manager"""
         game_manager.current_location = self.location
-        game_manager.player_flags = self.flags.copy()
-        game_manager.player_evidence = self.evidence.copy()
+        game_manager._evidence_mask = self.evidence_mask
+        game_manager._extra_evidence = list(self.extra_evidence)
+        game_manager._evidence_count = self.evidence_count
+        game_manager._flag_set_mask = self.flag_set_mask
+        game_manager._flag_true_mask = self.flag_true_mask
+        game_manager._flag_values = self.flag_values.copy()
+        game_manager._notify_state_change('reset', None)
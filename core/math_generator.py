@@ -0,0 +1,257 @@
+"""
+MathGenerator - Soal aritmetika prosedural (penjumlahan, pengurangan, pembagian)
+Soal dibangkitkan dalam batch besar dengan operasi vektor NumPy ke pool bersama
+per (operasi, tingkat kesulitan); pool diisi ulang di thread latar sebelum
+habis. Setiap sesi mengambil beberapa baris sekaligus ke antrian sendiri,
+jadi menyajikan soal baru hanya pop + format string tanpa generate per giliran
+"""
+
+import itertools
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy opsional, tanpa NumPy checkpoint memakai soal tetap kasus
+    np = None
+
+from core.case_model import EMPTY_OUTCOME, Outcome, Question
+
+
+OPERATIONS = ('penjumlahan', 'pengurangan', 'pembagian')
+DEFAULT_DIFFICULTY = 'easy'
+
+# Rentang operand (min, max) inklusif per tingkat kesulitan:
+# penjumlahan: (kiri, kanan), pengurangan: (kiri, kanan < kiri), pembagian: (hasil bagi, pembagi)
+DIFFICULTIES = {
+    'easy': {
+        'penjumlahan': ((1, 10), (1, 10)),
+        'pengurangan': ((10, 30), (1, 9)),
+        'pembagian': ((2, 10), (2, 5))
+    },
+    'medium': {
+        'penjumlahan': ((10, 99), (10, 99)),
+        'pengurangan': ((30, 99), (10, 29)),
+        'pembagian': ((2, 12), (2, 9))
+    },
+    'hard': {
+        'penjumlahan': ((100, 999), (100, 999)),
+        'pengurangan': ((200, 999), (50, 199)),
+        'pembagian': ((10, 50), (3, 12))
+    }
+}
+
+_SYMBOLS = {'penjumlahan': '+', 'pengurangan': '-', 'pembagian': '÷'}
+
+# (teks soal, satuan jawaban), {a} = operand kiri, {b} = operand kanan
+TEMPLATES = {
+    'penjumlahan': (
+        ("Kepala perpustakaan memiliki {a} buku sejarah di koleksi pribadi dan membeli {b} buku lagi. "
+         "Berapa total buku yang dimilikinya sekarang?", "buku"),
+        ("Rak timur berisi {a} buku dan rak barat berisi {b} buku. Berapa jumlah buku di kedua rak?", "buku"),
+        ("Pagi ini ada {a} pengunjung dan siang harinya datang {b} pengunjung lagi. "
+         "Berapa jumlah pengunjung hari ini?", "orang")
+    ),
+    'pengurangan': (
+        ("Perpustakaan memiliki {a} buku kuno. {b} buku dikatalogkan oleh mahasiswa untuk penelitian. "
+         "Berapa buku yang belum dikatalogkan?", "buku"),
+        ("Sebuah buku memiliki {a} halaman. Penjaga malam sudah membaca {b} halaman. "
+         "Berapa halaman yang belum dibaca?", "halaman"),
+        ("Ada {a} kartu anggota di laci. {b} kartu diambil petugas. Berapa kartu yang tersisa?", "kartu")
+    ),
+    'pembagian': (
+        ("Penjaga malam menemukan {a} halaman buku yang tersebar di lantai. Dia membaginya menjadi "
+         "{b} tumpukan sama besar. Berapa halaman di setiap tumpukan?", "halaman"),
+        ("{a} buku baru dibagi rata ke {b} rak. Berapa buku di setiap rak?", "buku")
+    )
+}
+
+# Selisih pengecoh dari jawaban benar: salah hitung satuan dan salah simpan/pinjam puluhan
+_OFFSETS = (-10, -2, -1, 1, 2, 10)
+_DISTRACTORS = 3
+
+DEFAULT_BATCH_SIZE = 4096
+QUEUE_SIZE = 4  # Baris yang diambil sesi dari pool per kunci lock
+
+# (operand kiri, operand kanan, jawaban, opsi terurut, indeks template)
+MathRow = Tuple[int, int, int, Tuple[int, ...], int]
+
+
+def available() -> bool:
+    """True jika NumPy terpasang (generator bisa dipakai)"""
+    return np is not None
+
+
+def generate_batch(operation: str, difficulty: str, size: int, rng) -> List[MathRow]:
+    """
+    Bangkitkan size soal sekaligus dengan operasi vektor
+    rng: numpy.random.Generator. Raise KeyError untuk operasi/tingkat tidak dikenal
+    """
+    (left_min, left_max), (right_min, right_max) = DIFFICULTIES[difficulty][operation]
+    left = rng.integers(left_min, left_max + 1, size)
+    if operation == 'pengurangan':
+        # Operand kanan selalu lebih kecil dari kiri agar hasil positif
+        right_max = np.minimum(right_max, left - 1)
+        right = right_min + (rng.random(size) * (right_max - right_min + 1)).astype(np.int64)
+    else:
+        right = rng.integers(right_min, right_max + 1, size)
+    
+    if operation == 'penjumlahan':
+        answer = left + right
+        mistake = np.abs(left - right)  # Salah operasi
+    elif operation == 'pengurangan':
+        answer = left - right
+        mistake = left + right
+    else:
+        # left = hasil bagi; soal ditulis (hasil bagi x pembagi) ÷ pembagi
+        answer = left
+        left = left * right
+        mistake = left - right
+    
+    # Kandidat pengecoh: jawaban + selisih, ditambah jawaban dari operasi yang salah
+    candidates = np.concatenate((answer[:, None] + np.array(_OFFSETS), mistake[:, None]), axis=1)
+    invalid = (candidates <= 0) | (candidates == answer[:, None])
+    for column in range(1, candidates.shape[1]):
+        duplicate = (candidates[:, :column] == candidates[:, column:column + 1]).any(axis=1)
+        invalid[:, column] |= duplicate
+    
+    # Pengecoh dipilih acak dari kandidat valid (+1, +2, +10 selalu valid);
+    # salah operasi diberi bobot lebih karena kesalahan yang sering terjadi
+    keys = rng.random(candidates.shape)
+    keys[:, -1] *= 0.5
+    keys[invalid] = 2.0
+    picked = np.take_along_axis(candidates, np.argsort(keys, axis=1)[:, :_DISTRACTORS], axis=1)
+    options = np.sort(np.concatenate((answer[:, None], picked), axis=1), axis=1)
+    templates = rng.integers(0, len(TEMPLATES[operation]), size)
+    
+    return list(zip(left.tolist(), right.tolist(), answer.tolist(),
+                    map(tuple, options.tolist()), templates.tolist()))
+
+
+class MathPool:
+    """
+    Pool soal bersama untuk satu (operasi, tingkat kesulitan), aman dipakai banyak thread
+    Batch berikutnya sudah dibangkitkan di thread latar saat batch aktif tinggal
+    separuh, jadi take() hampir selalu hanya memotong list
+    """
+    
+    def __init__(self, operation: str, difficulty: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 seed: Optional[int] = None):
+        if np is None:
+            raise ImportError("Generator soal matematika membutuhkan NumPy (pip install numpy)")
+        self.operation = operation
+        self.difficulty = difficulty
+        self.batch_size = batch_size
+        self._rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()  # Generator NumPy tidak thread-safe
+        self._lock = threading.Lock()
+        self._ready: Deque[List[MathRow]] = deque()  # Batch cadangan hasil thread latar
+        self._refilling = False
+        self._rows = self._generate()
+    
+    def _generate(self) -> List[MathRow]:
+        with self._rng_lock:
+            return generate_batch(self.operation, self.difficulty, self.batch_size, self._rng)
+    
+    def _refill(self) -> None:
+        rows = self._generate()
+        with self._lock:
+            self._ready.append(rows)
+            self._refilling = False
+    
+    def take(self, count: int) -> List[MathRow]:
+        """Ambil count baris soal (dihapus dari pool)"""
+        with self._lock:
+            while len(self._rows) < count:
+                # Cadangan belum siap (lonjakan permintaan): bangkitkan langsung
+                rows = self._ready.popleft() if self._ready else self._generate()
+                self._rows = rows + self._rows
+            taken = self._rows[-count:]
+            del self._rows[-count:]
+            
+            if len(self._rows) < self.batch_size // 2 and not self._ready and not self._refilling:
+                self._refilling = True
+                threading.Thread(target=self._refill, name='math-pool-refill', daemon=True).start()
+        return taken
+
+
+_pools: Dict[Tuple[str, str], MathPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_math_pool(operation: str, difficulty: str) -> MathPool:
+    """Ambil (atau buat) pool bersama satu proses untuk (operasi, tingkat kesulitan)"""
+    key = (operation, difficulty)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = MathPool(operation, difficulty)
+    return pool
+
+
+def prefill_pools(difficulties=tuple(DIFFICULTIES)) -> None:
+    """Bangkitkan semua pool di awal (mis. saat server start) agar sesi pertama tidak menunggu"""
+    for difficulty in difficulties:
+        for operation in OPERATIONS:
+            get_math_pool(operation, difficulty)
+
+
+# Nomor urut soal yang dibangkitkan di proses ini (id soal unik per sesi)
+_serial = itertools.count(1)
+
+
+class MathQuestionQueue:
+    """Antrian soal per sesi, diisi QUEUE_SIZE baris sekaligus dari pool bersama"""
+    
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._rows: Dict[Tuple[str, str], List[MathRow]] = {}
+    
+    def next_row(self, operation: str, difficulty: str = DEFAULT_DIFFICULTY) -> MathRow:
+        """Baris soal berikutnya untuk (operasi, tingkat kesulitan), lihat math_question"""
+        key = (operation, difficulty)
+        rows = self._rows.get(key)
+        if not rows:
+            rows = self._rows[key] = get_math_pool(operation, difficulty).take(self.queue_size)
+        return rows.pop()
+    
+    def next_question(self, operation: str, difficulty: str = DEFAULT_DIFFICULTY,
+                      on_correct: Outcome = EMPTY_OUTCOME, on_incorrect: Outcome = EMPTY_OUTCOME,
+                      question_type: str = 'multiple_choice') -> Question:
+        """
+        Soal baru untuk (operasi, tingkat kesulitan)
+        Bukti/flag di on_correct/on_incorrect diterapkan seperti soal biasa,
+        pesannya diganti penjelasan hitungan soal ini
+        """
+        return math_question(operation, difficulty, self.next_row(operation, difficulty),
+                             on_correct, on_incorrect, question_type)
+
+
+def math_question(operation: str, difficulty: str, row: MathRow,
+                  on_correct: Outcome = EMPTY_OUTCOME, on_incorrect: Outcome = EMPTY_OUTCOME,
+                  question_type: str = 'multiple_choice') -> Question:
+    """
+    Bangun soal dari satu baris pool (tanpa NumPy), dengan id baru
+    Baris yang sama selalu menghasilkan teks, opsi, dan jawaban yang sama,
+    jadi cukup baris ini yang disimpan untuk menanyakan ulang soal setelah load
+    Raise KeyError / IndexError jika operasi atau indeks template tidak dikenal
+    """
+    left, right, answer, options, template = row
+    text, unit = TEMPLATES[operation][template]
+    symbol = _SYMBOLS[operation]
+    correct_answer = f"{answer} {unit}"
+    return Question(
+        f"gen_{operation}_{difficulty}_{next(_serial)}", question_type,
+        text.format(a=left, b=right),
+        tuple(f"{option} {unit}" for option in options) if question_type == 'multiple_choice' else (),
+        correct_answer, '',
+        Outcome(f"Benar! {left} {symbol} {right} = {answer}.", on_correct.evidence,
+                on_correct.flags, on_correct.dialogue_unlock),
+        Outcome(f"Salah. Coba hitung lagi: {left} {symbol} {right} = ?", on_incorrect.evidence,
+                on_incorrect.flags, on_incorrect.dialogue_unlock),
+        accepted_answers=(str(answer),),  # Angka saja juga benar
+        topic=operation, difficulty=difficulty, tags=('generated',)
+    )
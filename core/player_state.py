@@ -0,0 +1,120 @@
+"""
+PlayerState - View list/dict di atas state pemain berbasis bitmask
+GameManager menyimpan bukti dan flag boolean sebagai integer bitmask,
+view ini menjaga API lama (player_evidence list, player_flags dict)
+"""
+
+from typing import Any, Dict, Iterator, List
+from collections.abc import MutableMapping, Sequence
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Iterasi indeks bit yang bernilai 1, dari yang terkecil"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class EvidenceView(Sequence):
+    """View list bukti pemain (urut sesuai urutan bukti di kasus)"""
+    
+    __slots__ = ('_manager',)
+    
+    def __init__(self, manager):
+        self._manager = manager
+    
+    def __iter__(self) -> Iterator[str]:
+        manager = self._manager
+        evidence_ids = manager._evidence_ids
+        for bit in iter_bits(manager._evidence_mask):
+            yield evidence_ids[bit]
+        yield from manager._extra_evidence
+    
+    def __len__(self) -> int:
+        return self._manager._evidence_count
+    
+    def __contains__(self, evidence_id: object) -> bool:
+        return self._manager.has_evidence(evidence_id)
+    
+    def __getitem__(self, index):
+        return list(self)[index]
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (EvidenceView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+    
+    def append(self, evidence_id: str) -> None:
+        """Sama dengan GameManager.add_evidence"""
+        self._manager.add_evidence(evidence_id)
+    
+    def remove(self, evidence_id: str) -> None:
+        """Hapus bukti, ValueError jika tidak ada (seperti list.remove)"""
+        if not self._manager.remove_evidence(evidence_id):
+            raise ValueError(f"{evidence_id} tidak ada di inventory")
+    
+    def copy(self) -> List[str]:
+        return list(self)
+
+
+class FlagView(MutableMapping):
+    """View dict flag pemain"""
+    
+    __slots__ = ('_manager',)
+    
+    def __init__(self, manager):
+        self._manager = manager
+    
+    @property
+    def manager(self):
+        """GameManager pemilik view"""
+        return self._manager
+    
+    def __getitem__(self, flag_name: str) -> Any:
+        missing = _MISSING
+        value = self._manager.get_flag(flag_name, missing)
+        if value is missing:
+            raise KeyError(flag_name)
+        return value
+    
+    def get(self, flag_name: str, default: Any = None) -> Any:
+        return self._manager.get_flag(flag_name, default)
+    
+    def __setitem__(self, flag_name: str, value: Any) -> None:
+        self._manager.set_flag(flag_name, value)
+    
+    def __delitem__(self, flag_name: str) -> None:
+        if not self._manager.clear_flag(flag_name):
+            raise KeyError(flag_name)
+    
+    def __iter__(self) -> Iterator[str]:
+        manager = self._manager
+        flag_ids = manager._flag_ids
+        for bit in iter_bits(manager._flag_set_mask):
+            yield flag_ids[bit]
+        yield from manager._flag_values
+    
+    def __len__(self) -> int:
+        manager = self._manager
+        return bin(manager._flag_set_mask).count('1') + len(manager._flag_values)
+    
+    def __contains__(self, flag_name: object) -> bool:
+        return self._manager.get_flag(flag_name, _MISSING) is not _MISSING
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (FlagView, dict)):
+            return dict(self) == dict(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
+    
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+_MISSING = object()
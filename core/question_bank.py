@@ -0,0 +1,206 @@
+"""
+QuestionBank - Bank soal ber-index yang bisa dipakai bersama banyak kasus
+Soal di-index berdasarkan tipe, topik, tingkat kesulitan, dan tag sehingga
+query seperti "soal pilihan ganda sedang tentang pengurangan yang belum
+dijawab" cukup satu lookup dict + sampling acak
+
+File bank: data/question_banks/<bank_id>.json
+    {"title": "...", "questions": {"q_id": {... format soal kasus ...,
+     "topic": "pengurangan", "difficulty": "medium", "tags": ["kelas_3"]}}}
+Kasus memakai bank lewat field "question_banks": ["<bank_id>", ...]
+"""
+
+import json
+import os
+import random
+import threading
+from collections import OrderedDict
+from itertools import product
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from core.answer_matcher import AnswerMatcher, get_answer_matcher
+from core.case_model import Case, CaseSchemaError, Question, build_questions
+from core.case_store import BASE_DIR
+
+
+DEFAULT_BANK_DIR = os.path.join(BASE_DIR, 'data', 'question_banks')
+
+# Key index: (type, topic, difficulty, tag), None = bebas
+IndexKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+# Percobaan sampling acak sebelum menyaring kandidat satu per satu
+_SAMPLE_ATTEMPTS = 8
+
+
+class QuestionBank:
+    """
+    Kumpulan soal immutable dengan index gabungan:
+    setiap soal didaftarkan di semua kombinasi (type, topic, difficulty, tag)
+    dengan None sebagai wildcard, jadi query kombinasi apa pun = satu lookup
+    """
+    
+    def __init__(self, bank_id: str, questions: Dict[str, Question], title: str = '',
+                 matcher: Optional[AnswerMatcher] = None):
+        self.id = bank_id
+        self.title = title or bank_id
+        self.questions = questions
+        self.matcher = matcher or AnswerMatcher(questions)
+        
+        index: Dict[IndexKey, List[str]] = {}
+        for question_id, question in questions.items():
+            # dict.fromkeys: field kosong hanya didaftarkan sebagai wildcard
+            fields = [tuple(dict.fromkeys(values)) for values in (
+                (question.type, None), (question.topic or None, None), (question.difficulty or None, None),
+                (None,) + question.tags
+            )]
+            for key in product(*fields):
+                index.setdefault(key, []).append(question_id)
+        self._index: Dict[IndexKey, Tuple[str, ...]] = {key: tuple(ids) for key, ids in index.items()}
+    
+    def __len__(self) -> int:
+        return len(self.questions)
+    
+    def __contains__(self, question_id: str) -> bool:
+        return question_id in self.questions
+    
+    def get(self, question_id: str) -> Optional[Question]:
+        return self.questions.get(question_id)
+    
+    def candidates(self, question_type: Optional[str] = None, topic: Optional[str] = None,
+                   difficulty: Optional[str] = None, tag: Optional[str] = None) -> Tuple[str, ...]:
+        """Id soal yang cocok dengan semua filter (urutan bank), O(1)"""
+        return self._index.get((question_type, topic, difficulty, tag), ())
+    
+    def first(self, question_type: Optional[str] = None, topic: Optional[str] = None,
+              difficulty: Optional[str] = None, tag: Optional[str] = None) -> Optional[Question]:
+        """Soal pertama yang cocok, None jika tidak ada"""
+        ids = self.candidates(question_type, topic, difficulty, tag)
+        return self.questions[ids[0]] if ids else None
+    
+    def pick(self, candidates: Tuple[str, ...], exclude: Container[str] = (),
+             rng: Optional[random.Random] = None) -> Optional[str]:
+        """
+        Pilih acak satu id dari candidates yang tidak ada di exclude (sekali pakai)
+        Sampling langsung dulu (O(1) selama sebagian besar belum dijawab),
+        baru menyaring kandidat jika terlalu banyak yang sudah dipakai;
+        untuk pemilihan berulang dalam satu sesi pakai QuestionPool
+        """
+        if not candidates:
+            return None
+        rng = rng or random
+        for _ in range(_SAMPLE_ATTEMPTS):
+            question_id = candidates[rng.randrange(len(candidates))]
+            if question_id not in exclude:
+                return question_id
+        remaining = [question_id for question_id in candidates if question_id not in exclude]
+        return rng.choice(remaining) if remaining else None
+    
+    def select(self, question_type: Optional[str] = None, topic: Optional[str] = None,
+               difficulty: Optional[str] = None, tag: Optional[str] = None,
+               exclude: Container[str] = (), rng: Optional[random.Random] = None) -> Optional[Question]:
+        """Soal acak yang cocok dengan filter dan tidak ada di exclude"""
+        question_id = self.pick(self.candidates(question_type, topic, difficulty, tag), exclude, rng)
+        return None if question_id is None else self.questions[question_id]
+
+
+class QuestionPool:
+    """
+    Kandidat satu query yang belum dijawab, dipegang per sesi (lihat QuestionManager)
+    Soal yang ternyata sudah dijawab dibuang dengan swap-remove, jadi setiap soal
+    paling banyak sekali ditolak selama sesi dan pick tidak pernah menyaring ulang
+    """
+    
+    __slots__ = ('_ids',)
+    
+    def __init__(self, candidates: Iterable[str]):
+        self._ids = list(candidates)
+    
+    def __len__(self) -> int:
+        """Jumlah kandidat tersisa (termasuk yang sudah dijawab tapi belum terambil)"""
+        return len(self._ids)
+    
+    def pick(self, answered: Container[str], rng: Optional[random.Random] = None) -> Optional[str]:
+        """Id acak yang tidak ada di answered, None jika semua sudah dijawab"""
+        rng = rng or random
+        ids = self._ids
+        while ids:
+            index = rng.randrange(len(ids))
+            question_id = ids[index]
+            if question_id not in answered:
+                return question_id
+            # Jawaban tidak pernah dihapus dari sesi: buang permanen, urutan tidak penting
+            ids[index] = ids[-1]
+            ids.pop()
+        return None
+
+
+def build_question_bank(data: Dict, bank_id: str) -> QuestionBank:
+    """Validasi dict JSON bank soal dan bangun QuestionBank (raise CaseSchemaError)"""
+    questions = build_questions(data, bank_id)
+    return QuestionBank(bank_id, questions, data.get('title', '') if isinstance(data, dict) else '')
+
+
+# ========== Cache bank ==========
+
+# Bank untuk soal milik kasus sendiri, dipakai bersama (seperti ending network)
+_case_banks = OrderedDict()  # id(case) -> (case, bank)
+_case_banks_lock = threading.Lock()
+_MAX_CASE_BANKS = 32
+
+
+def get_case_bank(case: Case) -> QuestionBank:
+    """Ambil (atau bangun) index soal milik satu kasus"""
+    key = id(case)
+    with _case_banks_lock:
+        entry = _case_banks.get(key)
+        if entry is not None and entry[0] is case:
+            _case_banks.move_to_end(key)
+            return entry[1]
+    
+    bank = QuestionBank(case.id, case.questions, case.title, get_answer_matcher(case))
+    with _case_banks_lock:
+        # Case ikut disimpan agar id() tidak dipakai ulang objek lain
+        _case_banks[key] = (case, bank)
+        _case_banks.move_to_end(key)
+        while len(_case_banks) > _MAX_CASE_BANKS:
+            _case_banks.popitem(last=False)
+    return bank
+
+
+_banks: Dict[str, Tuple[int, int, QuestionBank]] = {}  # path -> (size, mtime_ns, bank)
+_banks_lock = threading.Lock()
+
+
+def bank_path(bank_id: str, bank_dir: str = DEFAULT_BANK_DIR) -> str:
+    return os.path.join(bank_dir, f"{bank_id}.json")
+
+
+def load_question_bank(bank_id: str, bank_dir: str = DEFAULT_BANK_DIR) -> QuestionBank:
+    """
+    Muat bank soal (sekali per proses, dibaca ulang jika file berubah)
+    Raise FileNotFoundError jika tidak ada, CaseSchemaError jika tidak valid
+    """
+    path = bank_path(bank_id, bank_dir)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise FileNotFoundError(f"Bank soal {bank_id} tidak ditemukan")
+    with _banks_lock:
+        entry = _banks.get(path)
+    if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+        return entry[2]
+    
+    with open(path, 'rb') as f:
+        try:
+            data = json.loads(f.read().decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise CaseSchemaError(bank_id, [f"bank: JSON tidak valid ({e})"])
+    bank = build_question_bank(data, bank_id)
+    with _banks_lock:
+        _banks[path] = (stat.st_size, stat.st_mtime_ns, bank)
+    return bank
+
+
+def load_question_banks(bank_ids: Iterable[str], bank_dir: str = DEFAULT_BANK_DIR) -> List[QuestionBank]:
+    """Muat beberapa bank sesuai urutan"""
+    return [load_question_bank(bank_id, bank_dir) for bank_id in bank_ids]
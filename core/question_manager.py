@@ -3,10 +3,16 @@ QuestionManager - Pengelola sistem pertanyaan edukatif
 Menampilkan soal, memvalidasi jawaban, dan menentukan output
 """
 
-import json
-from typing import Dict, List, Optional, Tuple
+import random
+from collections.abc import Sequence
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 from enum import Enum
 
+from core.answer_matcher import AnswerMatcher, get_answer_matcher
+from core.case_model import Case, Clue, Outcome, Question
+from core.question_bank import QuestionBank, QuestionPool, get_case_bank, load_question_banks
+
 
 class QuestionType(Enum):
     """Tipe pertanyaan yang tersedia"""
@@ -15,143 +21,239 @@ class QuestionType(Enum):
     LOGIC = "logic"
 
 
+class _HistoryView(Sequence):
+    """Riwayat jawaban read-only: perubahan hanya lewat record_answer agar counter tetap sinkron"""
+    
+    __slots__ = ('_entries',)
+    
+    def __init__(self, entries: List[Dict]):
+        self._entries = entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(MappingProxyType(entry) for entry in self._entries[index])
+        return MappingProxyType(self._entries[index])
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._entries!r})"
+
+
 class QuestionManager:
     """Pengelola pertanyaan dan validasi jawaban"""
     
-    def __init__(self, case_data: Dict):
-        self.case_data = case_data
-        self.questions = case_data.get('questions', {})
+    def __init__(self, case: Case, banks: Optional[List[QuestionBank]] = None):
+        """
+        banks: bank soal bersama tambahan, default bank di case.question_banks
+        Raise FileNotFoundError / CaseSchemaError jika bank kasus tidak bisa dimuat
+        """
+        self.case = case
+        self.questions = case.questions
+        self.matcher = get_answer_matcher(case)  # Key jawaban dinormalisasi sekali per kasus
+        # Soal kasus sendiri selalu pertama: id kasus menutupi id bank yang sama
+        self.banks: List[QuestionBank] = [get_case_bank(case)]
+        self.banks.extend(load_question_banks(case.question_banks) if banks is None else banks)
+        # Soal yang dibangkitkan selama sesi (checkpoint prosedural, lihat core/math_generator)
+        self.session_questions: Dict[str, Question] = {}
+        self.session_matcher = AnswerMatcher({})
         self.question_history = []  # Track pertanyaan yang sudah dijawab
+    
+    @property
+    def question_history(self) -> Sequence:
+        """Riwayat jawaban read-only (tambah lewat record_answer, ganti seluruhnya lewat setter)"""
+        return _HistoryView(self._history)
+    
+    @question_history.setter
+    def question_history(self, history: Iterable[Mapping]) -> None:
+        # Dipakai saat load save: bangun ulang counter dan index dari riwayat
+        self._history = []
+        self._correct_count = 0
+        self._last_results: Dict[str, bool] = {}  # question_id -> hasil jawaban terakhir
+        self._pools: Dict[Tuple, QuestionPool] = {}  # (indeks bank, filter...) -> soal belum dijawab
+        for entry in history:
+            self.record_answer(entry['question_id'], entry['user_answer'], entry['is_correct'])
+    
+    def record_answer(self, question_id: str, user_answer: str, is_correct: bool) -> None:
+        """Catat satu jawaban ke riwayat, counter, dan index hasil terakhir"""
+        self._history.append({
+            'question_id': question_id,
+            'user_answer': user_answer,
+            'is_correct': is_correct
+        })
+        if is_correct:
+            self._correct_count += 1
+        self._last_results[question_id] = is_correct
+    
+    def get_question(self, question_id: str) -> Optional[Question]:
+        """Ambil data pertanyaan (kasus, soal sesi, lalu bank soal)"""
+        question = self.questions.get(question_id) or self.session_questions.get(question_id)
+        if question is None:
+            bank = self._bank_of(question_id)
+            question = bank.questions[question_id] if bank else None
+        return question
+    
+    def add_question(self, question: Question) -> None:
+        """Daftarkan soal yang dibangkitkan untuk sesi ini agar bisa dijawab lewat validate_answer"""
+        self.session_questions[question.id] = question
+        self.session_matcher.add(question)
+    
+    def get_question_by_type(self, question_type: str) -> Optional[Question]:
+        """Cari pertanyaan pertama berdasarkan tipe (lookup index)"""
+        for bank in self.banks:
+            question = bank.first(question_type)
+            if question:
+                return question
+        return None
+    
+    def select_question(self, question_type: Optional[str] = None, topic: Optional[str] = None,
+                        difficulty: Optional[str] = None, tag: Optional[str] = None,
+                        unanswered: bool = True, rng: Optional[random.Random] = None) -> Optional[Question]:
+        """
+        Pilih soal acak dari kasus + bank yang cocok dengan semua filter
+        unanswered=True: lewati soal yang sudah pernah dijawab di sesi ini, lewat
+        QuestionPool per query yang disimpan sepanjang sesi (tanpa menyaring ulang kandidat)
+        Bank dipilih sebanding jumlah kandidat tersisanya, jadi setiap soal berpeluang (hampir) sama
+        """
+        rng = rng or random
+        query = (question_type, topic, difficulty, tag)
+        pools = []
+        for bank_index, bank in enumerate(self.banks):
+            candidates = bank.candidates(*query)
+            if not candidates:
+                continue
+            if unanswered:
+                pool = self._pools.get((bank_index,) + query)
+                if pool is None:
+                    pool = self._pools[(bank_index,) + query] = QuestionPool(candidates)
+                candidates = pool
+            if len(candidates):
+                pools.append((bank, candidates))
         
-    def get_question(self, question_id: str) -> Optional[Dict]:
-        """Ambil data pertanyaan"""
-        return self.questions.get(question_id)
+        while pools:
+            target = rng.randrange(sum(len(candidates) for _, candidates in pools))
+            for i, (bank, candidates) in enumerate(pools):
+                if target < len(candidates):
+                    break
+                target -= len(candidates)
+            if not unanswered:
+                return bank.questions[candidates[target]]
+            question_id = candidates.pick(self._last_results, rng)
+            if question_id is not None:
+                return bank.questions[question_id]
+            pools.pop(i)  # Semua kandidat di bank ini sudah dijawab
+        return None
     
-    def get_question_by_type(self, question_type: str) -> Optional[Dict]:
-        """Cari pertanyaan berdasarkan tipe"""
-        for q_id, q_data in self.questions.items():
-            if q_data.get('type') == question_type:
-                return q_data
+    def matcher_for(self, question_id: str) -> Optional[AnswerMatcher]:
+        """Answer matcher yang memuat key soal tertentu, None jika soal tidak ada"""
+        if question_id in self.questions:
+            return self.matcher
+        if question_id in self.session_questions:
+            return self.session_matcher
+        bank = self._bank_of(question_id)
+        return bank.matcher if bank else None
+    
+    def _bank_of(self, question_id: str) -> Optional[QuestionBank]:
+        for bank in self.banks:
+            if question_id in bank.questions:
+                return bank
         return None
     
-    def validate_answer(self, question_id: str, user_answer: str) -> Tuple[bool, Dict]:
+    def validate_answer(self, question_id: str, user_answer: str) -> Tuple[bool, Optional[Outcome]]:
         """
         Validasi jawaban pertanyaan
-        Return: (is_correct, result_data)
+        Return: (is_correct, outcome), outcome None jika pertanyaan tidak ditemukan
         """
         question = self.get_question(question_id)
         
         if not question:
-            return False, {'error': 'Pertanyaan tidak ditemukan'}
-        
-        question_type = question.get('type')
-        correct_answer = question.get('correct_answer')
-        
-        # Normalize jawaban
-        user_answer_normalized = user_answer.strip().lower()
-        correct_answer_normalized = correct_answer.strip().lower()
+            return False, None
         
-        is_correct = user_answer_normalized == correct_answer_normalized
+        # Normalisasi + sinonim + toleransi salah ketik (lihat core/answer_matcher)
+        is_correct = self.matcher_for(question_id).is_correct(question_id, user_answer)
         
         # Ambil hasil berdasarkan kebenaran
-        if is_correct:
-            result = question.get('on_correct', {})
-        else:
-            result = question.get('on_incorrect', {})
+        result = question.on_correct if is_correct else question.on_incorrect
         
         # Simpan ke history
-        self.question_history.append({
-            'question_id': question_id,
-            'user_answer': user_answer,
-            'is_correct': is_correct
-        })
+        self.record_answer(question_id, user_answer, is_correct)
         
         return is_correct, result
     
-    def apply_result(self, result: Dict, game_manager) -> None:
+    def apply_result(self, result: Optional[Outcome], game_manager) -> None:
         """
-        Terapkan hasil ke game state
-        result format:
-        {
-            'evidence': [...],
-            'flags': {flag: value},
-            'dialogue_unlock': [...],
-            'message': str
-        }
+        Terapkan hasil (Outcome: evidence, flags, dialogue_unlock, message) ke game state
         """
+        if result is None:
+            return
+        
         # Tambah bukti
-        for evidence_id in result.get('evidence', []):
+        for evidence_id in result.evidence:
             game_manager.add_evidence(evidence_id)
         
         # Set flags
-        for flag_name, value in result.get('flags', {}).items():
+        for flag_name, value in result.flags:
             game_manager.set_flag(flag_name, value)
         
         # Unlock dialog
-        for dialogue_id in result.get('dialogue_unlock', []):
+        for dialogue_id in result.dialogue_unlock:
             # Dialog akan di-unlock saat ditampilkan berdasarkan flags
             pass
     
     def get_question_stats(self) -> Dict:
         """Ambil statistik jawaban pertanyaan"""
-        total = len(self.question_history)
-        correct = sum(1 for q in self.question_history if q['is_correct'])
-        accuracy = (correct / total * 100) if total > 0 else 0
+        total = len(self._history)
+        correct = self._correct_count
         
         return {
             'total_questions': total,
             'correct_answers': correct,
             'wrong_answers': total - correct,
-            'accuracy': accuracy
+            'accuracy': self.get_accuracy()
         }
     
-    def get_clue_unlock_question(self, clue_id: str) -> Optional[Dict]:
+    def get_accuracy(self) -> float:
+        """Persentase jawaban benar (0-100), 0 jika belum ada jawaban"""
+        total = len(self._history)
+        return (self._correct_count / total * 100) if total > 0 else 0
+    
+    def get_clue_unlock_question(self, clue_id: str) -> Optional[Question]:
         """Ambil pertanyaan untuk unlock clue tertentu"""
-        clues = self.case_data.get('clues', {})
-        clue = clues.get(clue_id)
-        
-        if not clue:
-            return None
-        
-        unlock_req = clue.get('unlock_requirement', {})
-        question_id = unlock_req.get('question_id')
+        clue = self.case.clues.get(clue_id)
         
-        if not question_id:
+        if not clue or not clue.unlock_question:
             return None
         
-        return self.get_question(question_id)
+        return self.questions[clue.unlock_question]
     
-    def get_dialogue_question(self, npc_id: str, dialogue_id: str) -> Optional[Dict]:
+    def get_dialogue_question(self, npc_id: str, dialogue_id: str) -> Optional[Question]:
         """Ambil pertanyaan dari dialog NPC"""
-        characters = self.case_data.get('characters', {})
-        npc = characters.get(npc_id)
+        npc = self.case.characters.get(npc_id)
         
         if not npc:
             return None
         
-        dialogues = npc.get('dialogues', {})
-        dialogue = dialogues.get(dialogue_id)
+        dialogue = npc.dialogues.get(dialogue_id)
         
-        if not dialogue:
+        if not dialogue or not dialogue.question:
             return None
         
-        question_id = dialogue.get('question')
-        
-        if not question_id:
-            return None
-        
-        return self.get_question(question_id)
+        return self.questions[dialogue.question]
+    
+    def get_question_dialogues(self, question_id: str) -> Tuple[Tuple[str, str], ...]:
+        """Dialog NPC yang menanyakan soal tertentu: ((npc_id, dialogue_id), ...)"""
+        return self.case.index.question_dialogues.get(question_id, ())
+    
+    def get_question_clues(self, question_id: str) -> List[Clue]:
+        """Clue yang di-unlock oleh soal tertentu"""
+        clues = self.case.clues
+        return [clues[clue_id] for clue_id in self.case.index.question_clues.get(question_id, ())]
     
     def has_answered_question(self, question_id: str) -> bool:
         """Cek apakah pemain sudah menjawab pertanyaan tertentu"""
-        for q in self.question_history:
-            if q['question_id'] == question_id:
-                return True
-        return False
+        return question_id in self._last_results
     
     def get_last_answer_result(self, question_id: str) -> Optional[bool]:
         """Ambil hasil jawaban terakhir untuk pertanyaan tertentu"""
-        for q in reversed(self.question_history):
-            if q['question_id'] == question_id:
-                return q['is_correct']
-        return None
+        return self._last_results.get(question_id)
@@ -0,0 +1,545 @@
+"""
+SaveFormat - Format simpan biner untuk satu sesi permainan
+Lokasi, flag, bukti, riwayat pertanyaan, pilihan, dan scene yang dikunjungi
+dikodekan ke bytes ringkas: id kasus diganti indeks ke tabel id yang di-intern
+per kasus, bukti dan flag boolean disimpan sebagai bitmask, zlib opsional
+
+Layout (semua integer = varint LEB128 kecuali disebut lain):
+    'DPSV' | versi (1 byte) | opsi (1 byte, bit 0 = zlib) | payload
+payload:
+    case_id (str) | checksum tabel (4 byte LE) | turn
+    string lokal: jumlah, lalu (str)... untuk teks yang tidak ada di tabel
+    lokasi (ref) | evidence_mask (bytes) | bukti ekstra: jumlah, ref...
+    flag_set_mask (bytes) | flag_true_mask (bytes) | flag lain: jumlah, (ref, nilai)...
+    riwayat soal: jumlah, (ref soal << 1 | benar, ref jawaban)...
+    pilihan: jumlah, (ref id, ref teks, ref konteks)...
+    scene dikunjungi: jumlah, ref...
+    tahap alur (versi 2+): tahap, lalu
+        FLOW_CHECKPOINT: ref ending tertunda | ref soal | antrian: jumlah, ref... | benar | sudah dijawab
+                         | baris soal prosedural (versi 3+, nilai: None atau list MathRow)
+        FLOW_ENDING: ref ending yang dicapai
+ref: 0 = None, 1..N = tabel kasus, N+1.. = string lokal
+"""
+
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.case_model import Case, CaseSchemaError
+from core.case_registry import CaseRegistry, default_case_registry
+from core.game_manager import GameManager, GameState
+
+
+SAVE_MAGIC = b'DPSV'
+
+# Naikkan jika layout berubah, decoder menolak versi yang tidak dikenal
+SAVE_FORMAT_VERSION = 3
+# Versi 1: tanpa tahap alur (selalu lanjut bermain), versi 2: tanpa baris soal prosedural checkpoint
+SUPPORTED_VERSIONS = (1, 2, 3)
+
+_OPTION_ZLIB = 0x01
+
+# Tag nilai flag non-boolean
+_VALUE_NONE, _VALUE_FALSE, _VALUE_TRUE, _VALUE_INT, _VALUE_FLOAT, _VALUE_STR, _VALUE_LIST, _VALUE_DICT = range(8)
+
+_DOUBLE = struct.Struct('<d')
+_UINT32 = struct.Struct('<I')
+
+
+class SaveFormatError(ValueError):
+    """Data save rusak, versi tidak dikenal, atau dibuat untuk versi kasus lain"""
+    pass
+
+
+# ========== Tabel id ==========
+
+class IdTable:
+    """
+    Tabel id yang di-intern untuk satu kasus: bukti, flag, lokasi, scene, soal,
+    NPC, dialog, teks opsi/pilihan. Urutan mengikuti data kasus sehingga
+    sama di setiap proses; checksum memastikan save dibaca dengan tabel yang sama
+    """
+    
+    def __init__(self, case: Case):
+        ids: List[str] = []
+        ids.extend(case.evidence_ids)
+        ids.extend(case.flag_ids)
+        ids.extend(case.locations)
+        ids.extend(case.scenes)
+        ids.extend(case.questions)
+        ids.extend(case.characters)
+        for npc in case.characters.values():
+            for dialogue in npc.dialogues.values():
+                ids.append(dialogue.id)
+                ids.extend(choice.text for choice in dialogue.choices)
+        for question in case.questions.values():
+            ids.extend(question.options)
+            ids.append(question.correct_answer)
+        
+        self.case = case
+        self.ids: Tuple[str, ...] = tuple(dict.fromkeys(ids))
+        self.refs: Dict[str, int] = {value: ref for ref, value in enumerate(self.ids, 1)}
+        
+        # Urutan bit bukti/flag ikut di-checksum karena mask bergantung padanya
+        signature = '\x00'.join(case.evidence_ids) + '\x01' + '\x00'.join(case.flag_ids) + '\x01' + '\x00'.join(self.ids)
+        self.checksum = zlib.crc32(signature.encode('utf-8'))
+
+
+# Tabel dipakai bersama untuk kasus yang sama (seperti ending network)
+_tables = OrderedDict()  # id(case) -> (case, table)
+_tables_lock = threading.Lock()
+_MAX_TABLES = 32
+
+
+def get_id_table(case: Case) -> IdTable:
+    """Ambil (atau bangun) tabel id untuk satu kasus"""
+    key = id(case)
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is not None and entry[0] is case:
+            _tables.move_to_end(key)
+            return entry[1]
+    
+    table = IdTable(case)
+    with _tables_lock:
+        _tables[key] = (case, table)
+        _tables.move_to_end(key)
+        while len(_tables) > _MAX_TABLES:
+            _tables.popitem(last=False)
+    return table
+
+
+# ========== Isi save ==========
+
+# Tahap alur sesi
+FLOW_PLAYING, FLOW_CHECKPOINT, FLOW_ENDING = range(3)
+
+
+class FlowState:
+    """
+    Tahap alur sesi di luar GameState (lihat SessionEngine)
+    - stage: FLOW_PLAYING, FLOW_CHECKPOINT (pertanyaan sebelum ending) atau FLOW_ENDING
+    - ending_id: ending yang menunggu checkpoint / ending yang sudah dicapai
+    - question_id: template checkpoint yang sedang ditanyakan, None = masih layar pembuka
+    - queue: template checkpoint berikutnya
+    - correct: jumlah checkpoint yang sudah dijawab benar
+    - answered: question_id sudah dijawab (layar hasil)
+    - generated: baris soal prosedural yang ditanyakan dari template question_id
+      (core/math_generator.MathRow), None = template ditanyakan apa adanya
+    """
+    
+    __slots__ = ('stage', 'ending_id', 'question_id', 'queue', 'correct', 'answered', 'generated')
+    
+    def __init__(self, stage: int = FLOW_PLAYING, ending_id: Optional[str] = None,
+                 question_id: Optional[str] = None, queue: Iterable[str] = (),
+                 correct: int = 0, answered: bool = False, generated: Optional[Tuple] = None):
+        self.stage = stage
+        self.ending_id = ending_id
+        self.question_id = question_id
+        self.queue = tuple(queue)
+        self.correct = correct
+        self.answered = answered
+        self.generated = generated
+    
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, FlowState) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"FlowState({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+
+class SessionSave:
+    """
+    Isi satu save: snapshot GameState + riwayat sesi
+    - question_history: ((question_id, user_answer, is_correct), ...)
+    - choices_made: ((id, text, context), ...)
+    - visited_scenes: frozenset scene id
+    - flow: FlowState (checkpoint / ending yang sedang berjalan)
+    """
+    
+    __slots__ = ('case_id', 'state', 'question_history', 'choices_made', 'visited_scenes', 'turn', 'flow')
+    
+    def __init__(self, case_id: str, state: GameState,
+                 question_history: Iterable[Tuple[str, str, bool]] = (),
+                 choices_made: Iterable[Tuple[Optional[str], Optional[str], Optional[str]]] = (),
+                 visited_scenes: Iterable[str] = (), turn: int = 0,
+                 flow: Optional[FlowState] = None):
+        self.case_id = case_id
+        self.state = state
+        self.question_history = tuple(question_history)
+        self.choices_made = tuple(choices_made)
+        self.visited_scenes = frozenset(visited_scenes)
+        self.turn = turn
+        self.flow = flow or FlowState()
+    
+    @classmethod
+    def capture(cls, game_manager: GameManager, question_manager=None, choice_tracker=None,
+                story_manager=None, turn: int = 0, flow: Optional[FlowState] = None) -> 'SessionSave':
+        """Ambil isi save dari manager sesi yang sedang berjalan"""
+        if game_manager.case is None:
+            raise ValueError("Belum ada kasus yang dimainkan")
+        
+        history = ()
+        if question_manager is not None:
+            history = [(q['question_id'], q['user_answer'], q['is_correct'])
+                       for q in question_manager.question_history]
+        choices = ()
+        if choice_tracker is not None:
+            choices = [(c.get('id'), c.get('text'), c.get('context'))
+                       for c in choice_tracker.choices_made]
+        scenes = story_manager.visited_scenes if story_manager is not None else ()
+        
+        return cls(game_manager.case.id, GameState(game_manager), history, choices, scenes, turn, flow)
+    
+    def restore(self, game_manager: GameManager, question_manager=None, choice_tracker=None,
+                story_manager=None) -> None:
+        """Kembalikan isi save ke manager sesi (kasus dibuka jika berbeda)"""
+        if game_manager.case is None or game_manager.case.id != self.case_id:
+            game_manager.open_case(self.case_id)
+        self.state.restore(game_manager)
+        
+        if question_manager is not None:
+            question_manager.question_history = [
+                {'question_id': question_id, 'user_answer': answer, 'is_correct': is_correct}
+                for question_id, answer, is_correct in self.question_history
+            ]
+        if choice_tracker is not None:
+            choice_tracker.choices_made = [
+                {'id': choice_id, 'text': text, 'context': context, 'timestamp': i}
+                for i, (choice_id, text, context) in enumerate(self.choices_made)
+            ]
+        if story_manager is not None:
+            story_manager.visited_scenes = set(self.visited_scenes)
+
+
+# ========== Encode ==========
+
+def _put_uint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _put_bytes(out: bytearray, data: bytes) -> None:
+    _put_uint(out, len(data))
+    out += data
+
+
+def _put_mask(out: bytearray, mask: int) -> None:
+    _put_bytes(out, mask.to_bytes((mask.bit_length() + 7) // 8, 'little'))
+
+
+class _Encoder:
+    """Penulis payload dengan string lokal untuk teks di luar tabel kasus"""
+    
+    def __init__(self, table: IdTable):
+        self.refs = table.refs
+        self.base = len(table.ids) + 1
+        self.local: Dict[str, int] = {}
+        self.out = bytearray()
+    
+    def index(self, value: Optional[str]) -> int:
+        """Nomor ref untuk satu string (didaftarkan sebagai string lokal jika perlu)"""
+        if value is None:
+            return 0
+        ref = self.refs.get(value)
+        if ref is None:
+            ref = self.local.get(value)
+            if ref is None:
+                if not isinstance(value, str):
+                    raise SaveFormatError(f"Nilai {value!r} bukan string")
+                ref = self.base + len(self.local)
+                self.local[value] = ref
+        return ref
+    
+    def ref(self, value: Optional[str]) -> None:
+        _put_uint(self.out, self.index(value))
+    
+    def value(self, value: Any) -> None:
+        out = self.out
+        if value is None:
+            out.append(_VALUE_NONE)
+        elif value is True:
+            out.append(_VALUE_TRUE)
+        elif value is False:
+            out.append(_VALUE_FALSE)
+        elif isinstance(value, int):
+            out.append(_VALUE_INT)
+            _put_uint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, float):
+            out.append(_VALUE_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            out.append(_VALUE_STR)
+            self.ref(value)
+        elif isinstance(value, (list, tuple)):
+            out.append(_VALUE_LIST)
+            _put_uint(out, len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, dict):
+            out.append(_VALUE_DICT)
+            _put_uint(out, len(value))
+            for key, item in value.items():
+                self.ref(key)
+                self.value(item)
+        else:
+            raise SaveFormatError(f"Tipe nilai flag tidak didukung: {type(value).__name__}")
+
+
+def encode_save(save: SessionSave, case: Case, compress: bool = False) -> bytes:
+    """Kodekan save ke bytes (case = kasus yang dimainkan, untuk tabel id)"""
+    if case.id != save.case_id:
+        raise SaveFormatError(f"Save untuk kasus {save.case_id}, bukan {case.id}")
+    table = get_id_table(case)
+    encoder = _Encoder(table)
+    state = save.state
+    out = encoder.out
+    
+    encoder.ref(state.location)
+    _put_mask(out, state.evidence_mask)
+    _put_uint(out, len(state.extra_evidence))
+    for evidence_id in state.extra_evidence:
+        encoder.ref(evidence_id)
+    
+    _put_mask(out, state.flag_set_mask)
+    _put_mask(out, state.flag_true_mask)
+    _put_uint(out, len(state.flag_values))
+    for flag_name, value in state.flag_values.items():
+        encoder.ref(flag_name)
+        encoder.value(value)
+    
+    _put_uint(out, len(save.question_history))
+    for question_id, answer, is_correct in save.question_history:
+        # Bit benar/salah ikut di ref soal
+        _put_uint(out, encoder.index(question_id) << 1 | bool(is_correct))
+        encoder.ref(answer)
+    
+    _put_uint(out, len(save.choices_made))
+    for choice_id, text, context in save.choices_made:
+        encoder.ref(choice_id)
+        encoder.ref(text)
+        encoder.ref(context)
+    
+    _put_uint(out, len(save.visited_scenes))
+    for scene_id in sorted(save.visited_scenes):
+        encoder.ref(scene_id)
+    
+    flow = save.flow
+    _put_uint(out, flow.stage)
+    if flow.stage == FLOW_CHECKPOINT:
+        encoder.ref(flow.ending_id)
+        encoder.ref(flow.question_id)
+        _put_uint(out, len(flow.queue))
+        for question_id in flow.queue:
+            encoder.ref(question_id)
+        _put_uint(out, flow.correct)
+        _put_uint(out, int(flow.answered))
+        encoder.value(flow.generated)
+    elif flow.stage == FLOW_ENDING:
+        encoder.ref(flow.ending_id)
+    
+    # Header payload: case_id, checksum, turn, lalu string lokal
+    payload = bytearray()
+    _put_bytes(payload, save.case_id.encode('utf-8'))
+    payload += _UINT32.pack(table.checksum)
+    _put_uint(payload, save.turn)
+    _put_uint(payload, len(encoder.local))
+    for text in encoder.local:
+        _put_bytes(payload, text.encode('utf-8'))
+    payload += out
+    
+    options = 0
+    if compress:
+        payload = zlib.compress(bytes(payload), 6)
+        options |= _OPTION_ZLIB
+    return SAVE_MAGIC + bytes((SAVE_FORMAT_VERSION, options)) + bytes(payload)
+
+
+# ========== Decode ==========
+
+class _Decoder:
+    """Pembaca payload dengan posisi berjalan"""
+    
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+        self.strings: Tuple[Optional[str], ...] = (None,)
+    
+    def uint(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        self.pos = pos
+        return value
+    
+    def raw(self) -> bytes:
+        size = self.uint()
+        start = self.pos
+        end = start + size
+        if end > len(self.data):
+            raise SaveFormatError("Data save terpotong")
+        self.pos = end
+        return self.data[start:end]
+    
+    def text(self) -> str:
+        return self.raw().decode('utf-8')
+    
+    def mask(self) -> int:
+        return int.from_bytes(self.raw(), 'little')
+    
+    def ref(self) -> Optional[str]:
+        return self.strings[self.uint()]
+    
+    def value(self) -> Any:
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == _VALUE_NONE:
+            return None
+        if tag == _VALUE_TRUE:
+            return True
+        if tag == _VALUE_FALSE:
+            return False
+        if tag == _VALUE_INT:
+            value = self.uint()
+            return value >> 1 if not value & 1 else -((value + 1) >> 1)
+        if tag == _VALUE_FLOAT:
+            (value,) = _DOUBLE.unpack_from(self.data, self.pos)
+            self.pos += _DOUBLE.size
+            return value
+        if tag == _VALUE_STR:
+            return self.ref()
+        if tag == _VALUE_LIST:
+            return [self.value() for _ in range(self.uint())]
+        if tag == _VALUE_DICT:
+            result = {}
+            for _ in range(self.uint()):
+                key = self.ref()
+                result[key] = self.value()
+            return result
+        raise SaveFormatError(f"Tag nilai tidak dikenal: {tag}")
+
+
+def _math_row(value: Any) -> Tuple:
+    """Nilai list dari save menjadi MathRow (kiri, kanan, jawaban, opsi, template)"""
+    if (not isinstance(value, list) or len(value) != 5 or not isinstance(value[3], list)
+            or not all(type(n) is int for n in value[:3] + value[3] + value[4:])):
+        raise SaveFormatError(f"Baris soal checkpoint tidak valid: {value!r}")
+    left, right, answer, options, template = value
+    return left, right, answer, tuple(options), template
+
+
+def read_save_header(data: bytes) -> Tuple[int, str]:
+    """Baca (versi, case_id) dari save tanpa decode isinya"""
+    version, payload = _payload(data)
+    return version, _Decoder(payload).text()
+
+
+def _payload(data: bytes) -> Tuple[int, bytes]:
+    """Validasi header, return (versi, payload yang sudah di-decompress)"""
+    header_size = len(SAVE_MAGIC) + 2
+    if len(data) < header_size or data[:len(SAVE_MAGIC)] != SAVE_MAGIC:
+        raise SaveFormatError("Bukan data save Detektif Pengetahuan")
+    version, options = data[len(SAVE_MAGIC)], data[len(SAVE_MAGIC) + 1]
+    if version not in SUPPORTED_VERSIONS:
+        raise SaveFormatError(f"Versi save {version} tidak didukung (versi saat ini {SAVE_FORMAT_VERSION})")
+    
+    payload = data[header_size:]
+    if options & _OPTION_ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise SaveFormatError(f"Data save terkompresi rusak: {e}")
+    return version, bytes(payload)
+
+
+def decode_save(data: bytes, case_registry: Optional[CaseRegistry] = None,
+                case: Optional[Case] = None) -> SessionSave:
+    """
+    Decode bytes menjadi SessionSave
+    Kasus diambil dari case_registry berdasarkan case_id di save, kecuali case diberikan
+    Raise SaveFormatError jika data rusak, kasus hilang / tidak valid, atau tabel kasus sudah berubah
+    """
+    version, payload = _payload(data)
+    decoder = _Decoder(payload)
+    try:
+        case_id = decoder.text()
+        if case is None:
+            try:
+                case = (case_registry or default_case_registry).load_case(case_id)
+            except FileNotFoundError:
+                raise SaveFormatError(f"Kasus {case_id} dari save tidak ditemukan")
+            except CaseSchemaError as e:
+                raise SaveFormatError(f"Kasus {case_id} dari save tidak valid: " + "; ".join(e.errors))
+            except OSError as e:
+                raise SaveFormatError(f"Kasus {case_id} dari save tidak bisa dibaca: {e}")
+        elif case.id != case_id:
+            raise SaveFormatError(f"Save untuk kasus {case_id}, bukan {case.id}")
+        table = get_id_table(case)
+        
+        (checksum,) = _UINT32.unpack_from(decoder.data, decoder.pos)
+        decoder.pos += _UINT32.size
+        if checksum != table.checksum:
+            raise SaveFormatError(f"Save dibuat untuk versi lain dari kasus {case_id}")
+        turn = decoder.uint()
+        
+        local = [decoder.text() for _ in range(decoder.uint())]
+        decoder.strings = (None,) + table.ids + tuple(local)
+        ref = decoder.ref
+        uint = decoder.uint
+        
+        location = ref()
+        evidence_mask = decoder.mask()
+        extra_evidence = tuple(ref() for _ in range(uint()))
+        flag_set_mask = decoder.mask()
+        flag_true_mask = decoder.mask()
+        flag_values = {}
+        for _ in range(uint()):
+            flag_name = ref()
+            flag_values[flag_name] = decoder.value()
+        
+        strings = decoder.strings
+        history = []
+        for _ in range(uint()):
+            packed = uint()
+            history.append((strings[packed >> 1], ref(), bool(packed & 1)))
+        choices = [(ref(), ref(), ref()) for _ in range(uint())]
+        scenes = [ref() for _ in range(uint())]
+        
+        flow = FlowState()
+        if version >= 2:
+            stage = uint()
+            if stage == FLOW_CHECKPOINT:
+                ending_id = ref()
+                question_id = ref()
+                queue = [ref() for _ in range(uint())]
+                correct, answered = uint(), bool(uint())
+                generated = decoder.value() if version >= 3 else None
+                if generated is not None:
+                    generated = _math_row(generated)
+                flow = FlowState(stage, ending_id, question_id, queue, correct, answered, generated)
+            elif stage == FLOW_ENDING:
+                flow = FlowState(stage, ref())
+            elif stage != FLOW_PLAYING:
+                raise SaveFormatError(f"Tahap alur tidak dikenal: {stage}")
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise SaveFormatError(f"Data save rusak: {e}")
+    
+    if evidence_mask >> len(case.evidence_ids) or flag_set_mask >> len(case.flag_ids):
+        raise SaveFormatError("Bitmask save tidak cocok dengan kasus")
+    
+    state = GameState.from_values(location, evidence_mask, extra_evidence,
+                                  flag_set_mask, flag_true_mask & flag_set_mask, flag_values)
+    return SessionSave(case_id, state, history, choices, scenes, turn, flow)
@@ -0,0 +1,643 @@
+"""
+SessionEngine - Engine permainan headless untuk satu sesi pemain
+Menerima perintah (move, talk, answer, search, ...) dan mengembalikan event
+serta model layar berupa dict biasa, tanpa input()/print()
+"""
+
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.case_model import Case, CaseSchemaError, Ending, Question
+from core.case_registry import CaseRegistry
+from core.choice_tracker import ChoiceTracker
+from core.ending_manager import GENERIC_FAILURE_ENDING, EndingManager
+from core.game_manager import GameManager
+from core.math_generator import (DEFAULT_DIFFICULTY, DIFFICULTIES, OPERATIONS, MathQuestionQueue,
+                                  MathRow, math_question)
+from core.math_generator import available as math_generator_available
+from core.question_manager import QuestionManager
+from core.save_format import (FLOW_CHECKPOINT, FLOW_ENDING, FLOW_PLAYING, FlowState, SaveFormatError,
+                               SessionSave, decode_save, encode_save)
+from core.story_manager import StoryManager
+
+
+# Petunjuk yang bisa ditemukan saat "Cari petunjuk" (peluang SEARCH_CHANCE)
+SEARCH_CLUES = [
+    ("catatan_kepala", "Anda menemukan catatan dari kepala perpustakaan tentang pemeriksaan terakhir buku."),
+    ("catatan_jam_jaga", "Anda menemukan catatan jam jaga penjaga malam."),
+    ("timeline_kejadian", "Anda berhasil merekonstruksi timeline kejadian.")
+]
+SEARCH_CHANCE = 0.5
+
+# Pertanyaan checkpoint sebelum ending dan flag yang dicatat untuk masing-masing
+# Soal dengan topic operasi aritmetika (core/math_generator) hanya menjadi template:
+# setiap checkpoint menanyakan soal baru yang dibangkitkan dengan bukti/flag hasil yang sama
+CHECKPOINT_QUESTIONS = {
+    'q_penjumlahan': 'checkpoint_penjumlahan_correct',
+    'q_pengurangan': 'checkpoint_pengurangan_correct'
+}
+
+CHECKPOINT_FAILURE_ENDING = Ending(
+    'checkpoint_failure', 'failure', '❌ Penyelidikan Gagal!',
+    'Anda tidak mampu menjawab pertanyaan checkpoint. Bukti yang Anda kumpulkan ternyata tidak cukup untuk mengungkap kasus ini. Penyelidikan harus dihentikan.',
+    (), (), (), 0, float('inf'), 0
+)
+
+# Aksi di layar lokasi, urutan sama dengan menu terminal
+LOCATION_ACTIONS = ['search', 'talk', 'inventory', 'notes', 'move']
+
+# Event yang mengubah state sesi (dicatat journal, diterapkan ulang oleh replay),
+# termasuk tahap alur checkpoint / ending
+STATE_EVENTS = frozenset(['case_started', 'evidence_added', 'evidence_removed', 'flag_changed', 'moved', 'answer',
+                          'checkpoint_started', 'checkpoint_asked', 'ending'])
+
+_MISSING = object()
+
+
+class CommandError(ValueError):
+    """Perintah tidak valid untuk layar saat ini"""
+    pass
+
+
+class SessionEngine:
+    """
+    State machine satu sesi permainan
+    Setiap perintah mengembalikan {'events': [...], 'screen': {...}},
+    screen['actions'] berisi perintah yang valid untuk layar tersebut
+    """
+    
+    def __init__(self, case_registry: Optional[CaseRegistry] = None,
+                 rng: Optional[random.Random] = None):
+        self.game_manager = GameManager(case_registry)
+        self.game_manager.add_state_listener(self._on_state_change)
+        self.rng = rng or random.Random()
+        self.story_manager: Optional[StoryManager] = None
+        self.question_manager: Optional[QuestionManager] = None
+        self.ending_manager: Optional[EndingManager] = None
+        self.choice_tracker = ChoiceTracker()
+        self.case_id: Optional[str] = None
+        self.turn = 0  # Jumlah perintah yang diproses
+        
+        self.screen: Dict = {'type': 'idle', 'actions': ['start']}
+        self._events: List[Dict] = []
+        self._recording = False
+        
+        # State alur yang sedang berjalan
+        self._checkpoint_asked = False
+        self._pending_ending: Optional[Ending] = None
+        self._checkpoint_queue: List[str] = []
+        self._checkpoint_template: Optional[str] = None  # Id soal checkpoint yang sedang ditanyakan
+        self._checkpoint_correct = 0
+        self._checkpoint_answered = False  # Soal checkpoint saat ini sudah dijawab (layar hasil)
+        self._checkpoint_row: Optional[MathRow] = None  # Baris soal prosedural yang sedang ditanyakan
+        self._reached_ending: Optional[Ending] = None
+        self.math_queue = MathQuestionQueue()  # Antrian soal prosedural sesi ini
+        self._dialogue_npc = None
+        self._dialogue_lines: List = []
+        self._dialogue_choices = ()
+        self._location_screen: Tuple[Optional[Any], Optional[Dict]] = (None, None)  # (LocationView, layar)
+        
+        self._handlers: Dict[str, Callable[[Any], None]] = {
+            'start': self._cmd_start,
+            'continue': self._cmd_continue,
+            'search': self._cmd_search,
+            'talk': self._cmd_talk,
+            'inventory': self._cmd_inventory,
+            'notes': self._cmd_notes,
+            'move': self._cmd_move,
+            'choose': self._cmd_choose,
+            'answer': self._cmd_answer,
+            'restart': self._cmd_restart,
+            'quit': self._cmd_quit,
+        }
+        
+        # Event yang mengubah state dan cara menerapkannya ulang (journal / replay)
+        self._replay_handlers: Dict[str, Callable[[Dict], None]] = {
+            'case_started': self._replay_started,
+            'evidence_added': self._replay_state,
+            'evidence_removed': self._replay_state,
+            'flag_changed': self._replay_state,
+            'moved': self._replay_state,
+            'answer': self._replay_state,
+            'checkpoint_started': self._replay_flow,
+            'checkpoint_asked': self._replay_flow,
+            'ending': self._replay_flow,
+        }
+    
+    @property
+    def finished(self) -> bool:
+        """True jika sesi sudah selesai (pemain keluar)"""
+        return self.screen['type'] == 'finished'
+    
+    # ========== API perintah ==========
+    
+    def start(self, case_id: str) -> Dict:
+        """Mulai kasus baru"""
+        return self.handle('start', case_id)
+    
+    def handle(self, action: str, arg: Any = None) -> Dict:
+        """
+        Proses satu perintah
+        Perintah yang tidak valid menghasilkan event 'error', layar tidak berubah
+        """
+        self._events = []
+        self._recording = True
+        try:
+            if action not in self.screen['actions']:
+                raise CommandError(f"Perintah '{action}' tidak tersedia di layar {self.screen['type']}")
+            self._handlers[action](arg)
+            self.turn += 1
+        except CommandError as e:
+            self._emit('error', message=str(e))
+        finally:
+            self._recording = False
+        return {'events': self._events, 'screen': self.screen}
+    
+    def execute(self, command: Dict) -> Dict:
+        """Proses perintah dalam bentuk dict {'action': ..., 'arg': ...}"""
+        return self.handle(command.get('action', ''), command.get('arg'))
+    
+    # ========== Save ==========
+    
+    def save(self, compress: bool = False) -> bytes:
+        """Simpan sesi ke format biner (core/save_format)"""
+        if self.game_manager.case is None:
+            raise CommandError("Belum ada kasus yang dimainkan")
+        save = SessionSave.capture(self.game_manager, self.question_manager, self.choice_tracker,
+                                   self.story_manager, self.turn, self._flow_state())
+        return encode_save(save, self.game_manager.case, compress)
+    
+    def load(self, data: bytes) -> Dict:
+        """
+        Lanjutkan sesi dari data save, permainan dilanjutkan dari layar lokasi
+        (atau dari checkpoint / ending jika save diambil di sana)
+        Raise SaveFormatError jika data tidak valid
+        """
+        return self.replay(data, ())
+    
+    def replay(self, snapshot: Optional[bytes], records: Iterable[Tuple[int, List[Dict]]]) -> Dict:
+        """
+        Bangun ulang sesi dari snapshot (save, boleh None) + event state dari journal
+        records: ((turn, events), ...) dengan event hasil handle()
+        Event diterapkan langsung ke state tanpa menjalankan ulang aksi (tanpa RNG),
+        sehingga hasilnya deterministik. Permainan dilanjutkan dari tahap alur save
+        (lokasi, checkpoint atau ending)
+        """
+        save = decode_save(snapshot, self.game_manager.case_registry) if snapshot is not None else None
+        self._events = []
+        try:
+            if save is not None:
+                self._open_case(save.case_id)
+                save.restore(self.game_manager, self.question_manager, self.choice_tracker, self.story_manager)
+                self.turn = save.turn
+                self._restore_flow(save.flow)
+                self._emit('session_loaded', case_id=save.case_id, turn=save.turn)
+            
+            replayed = 0
+            for turn, events in records:
+                for event in events:
+                    handler = self._replay_handlers.get(event['type'])
+                    if handler is not None:
+                        handler(event)
+                self.turn = turn
+                replayed += 1
+            if replayed:
+                self._emit('session_replayed', turn=self.turn, records=replayed)
+            
+            if self.game_manager.case is not None:
+                self._resume()
+        except CommandError as e:
+            self._emit('error', message=str(e))
+        return {'events': self._events, 'screen': self.screen}
+    
+    def _flow_state(self) -> FlowState:
+        """Tahap alur saat ini untuk save"""
+        if self._reached_ending is not None:
+            return FlowState(FLOW_ENDING, self._reached_ending.id)
+        if self._checkpoint_asked and self._pending_ending is not None:
+            return FlowState(FLOW_CHECKPOINT, self._pending_ending.id, self._checkpoint_template,
+                             self._checkpoint_queue, self._checkpoint_correct, self._checkpoint_answered,
+                             self._checkpoint_row)
+        return FlowState(FLOW_PLAYING)
+    
+    def _restore_flow(self, flow: FlowState) -> None:
+        """Kembalikan tahap alur dari save (state kasus sudah dipulihkan)"""
+        if flow.stage == FLOW_PLAYING:
+            return
+        ending = self._ending_by_id(flow.ending_id)
+        self.ending_manager.achieved_ending = ending
+        self._checkpoint_asked = True
+        if flow.stage == FLOW_ENDING:
+            self._reached_ending = ending
+            return
+        
+        for question_id in (flow.question_id,) + flow.queue:
+            if question_id is not None and not self.question_manager.get_question(question_id):
+                raise SaveFormatError(f"Soal checkpoint {question_id} dari save tidak ditemukan")
+        self._pending_ending = ending
+        self._checkpoint_template = flow.question_id
+        self._checkpoint_queue = list(flow.queue)
+        self._checkpoint_correct = flow.correct
+        self._checkpoint_answered = flow.answered
+        self._checkpoint_row = flow.generated
+        if flow.generated is not None:
+            template = self.question_manager.get_question(flow.question_id) if flow.question_id else None
+            try:
+                self._generated_question(template, flow.generated)  # Validasi saja, didaftarkan saat _resume
+            except (AttributeError, KeyError, IndexError) as e:
+                raise SaveFormatError(f"Soal checkpoint {flow.question_id} dari save tidak valid: {e!r}")
+    
+    def _ending_by_id(self, ending_id: Optional[str]) -> Ending:
+        for ending in (CHECKPOINT_FAILURE_ENDING, GENERIC_FAILURE_ENDING):
+            if ending.id == ending_id:
+                return ending
+        ending = self.ending_manager.get_ending_data(ending_id)
+        if ending is None:
+            raise SaveFormatError(f"Ending {ending_id} dari save tidak ditemukan")
+        return ending
+    
+    def _resume(self) -> None:
+        """Tampilkan layar sesuai tahap alur setelah load / replay"""
+        if self._reached_ending is not None:
+            self._ending_screen(self._reached_ending)
+        elif not self._checkpoint_asked:
+            self._advance()
+        elif self._checkpoint_template is None:
+            self._checkpoint_intro()
+        elif self._checkpoint_answered:
+            self._next_checkpoint_question()
+        elif self._checkpoint_row is not None:
+            # Soal prosedural yang sama dibangun ulang dari barisnya, tidak diacak ulang
+            question = self._generated_question(self.question_manager.get_question(self._checkpoint_template),
+                                                self._checkpoint_row)
+            self.question_manager.add_question(question)
+            self._question_screen('checkpoint_question', question)
+        else:
+            self._ask_checkpoint(self._checkpoint_template)
+    
+    def _replay_started(self, event: Dict) -> None:
+        self._open_case(event['case_id'])
+    
+    def _replay_state(self, event: Dict) -> None:
+        game = self.game_manager
+        if game.case is None:
+            raise CommandError("Journal tidak diawali case_started")
+        
+        event_type = event['type']
+        if event_type == 'evidence_added':
+            game.add_evidence(event['evidence_id'])
+        elif event_type == 'evidence_removed':
+            game.remove_evidence(event['evidence_id'])
+        elif event_type == 'flag_changed':
+            if event.get('cleared'):
+                game.clear_flag(event['flag'])
+            else:
+                game.set_flag(event['flag'], event['value'])
+        elif event_type == 'moved':
+            game.move_to_location(event['location_id'])
+        elif event_type == 'answer':
+            self.question_manager.record_answer(event['question_id'], event['answer'], event['correct'])
+            # Jawaban saat checkpoint berjalan selalu jawaban soal checkpoint
+            if (self._checkpoint_template is not None and not self._checkpoint_answered
+                    and self._reached_ending is None):
+                self._checkpoint_answered = True
+                if event['correct']:
+                    self._checkpoint_correct += 1
+    
+    def _replay_flow(self, event: Dict) -> None:
+        if self.game_manager.case is None:
+            raise CommandError("Journal tidak diawali case_started")
+        
+        event_type = event['type']
+        if event_type == 'checkpoint_started':
+            self._checkpoint_asked = True
+            self._pending_ending = self._ending_by_id(event['ending_id'])
+            self.ending_manager.achieved_ending = self._pending_ending
+            self._checkpoint_queue = list(event['questions'])
+            self._checkpoint_template = None
+            self._checkpoint_correct = 0
+            self._checkpoint_answered = False
+            self._checkpoint_row = None
+        elif event_type == 'checkpoint_asked':
+            question_id = event['question_id']
+            if question_id in self._checkpoint_queue:
+                self._checkpoint_queue.remove(question_id)
+            self._checkpoint_template = question_id
+            self._checkpoint_answered = False
+            # Baris soal tidak ikut event (berisi jawaban); journal menulis snapshot sesudah giliran ini
+            self._checkpoint_row = None
+        elif event_type == 'ending':
+            self._reached_ending = self._ending_by_id(event['ending_id'])
+            self.ending_manager.achieved_ending = self._reached_ending
+    
+    # ========== Event ==========
+    
+    def _emit(self, event_type: str, **data) -> None:
+        data['type'] = event_type
+        self._events.append(data)
+    
+    def _on_state_change(self, kind: str, key: Optional[str]) -> None:
+        """Catat perubahan state (dari aksi maupun hasil soal) sebagai event"""
+        if not self._recording:
+            return
+        game = self.game_manager
+        if kind == 'evidence':
+            if game.has_evidence(key):
+                clue = game.case.clues.get(key)
+                self._emit('evidence_added', evidence_id=key, name=clue.name if clue else key)
+            else:
+                self._emit('evidence_removed', evidence_id=key)
+        elif kind == 'flag':
+            value = game.get_flag(key, _MISSING)
+            if value is _MISSING:
+                self._emit('flag_changed', flag=key, value=None, cleared=True)
+            else:
+                self._emit('flag_changed', flag=key, value=value)
+    
+    # ========== Model layar ==========
+    
+    def _show(self, screen_type: str, actions: List[str], **data) -> None:
+        data['type'] = screen_type
+        data['actions'] = actions
+        self.screen = data
+    
+    def _show_message(self, messages: List, **data) -> None:
+        """Layar pesan singkat: messages = [(level, teks), ...], level success/warning/error/info"""
+        self._show('message', ['continue'], messages=[{'level': level, 'text': text} for level, text in messages], **data)
+    
+    def _show_location(self) -> None:
+        game = self.game_manager
+        view = self.story_manager.get_location_view(game)
+        if view is None:
+            self._show_message([('error', "Lokasi tidak ditemukan!")])
+            return
+        
+        # View yang sama = state tidak berubah sejak layar lokasi terakhir dibuat
+        if self._location_screen[0] is view:
+            self.screen = self._location_screen[1]
+            return
+        
+        location = view.location
+        clues = game.case.clues
+        self._show(
+            'location', LOCATION_ACTIONS,
+            location={'id': location.id, 'name': location.name, 'description': location.description},
+            evidence=[{'id': e, 'name': clues[e].name, 'description': clues[e].description}
+                      for e in game.player_evidence if e in clues],
+            npcs=[{'id': npc.id, 'name': npc.name, 'role': npc.role} for npc in view.npcs],
+            exits=[{'id': location_id, 'label': label} for location_id, label in view.exits]
+        )
+        self._location_screen = (view, self.screen)
+    
+    def _advance(self) -> None:
+        """Kembali ke loop utama: cek ending lalu tampilkan lokasi"""
+        ending = self.ending_manager.evaluate_ending(self.game_manager, self.question_manager)
+        
+        # Ending "nyata" (bukan generic_failure) didahului pertanyaan checkpoint
+        if ending and ending.id != 'generic_failure' and not self._checkpoint_asked:
+            self._checkpoint_asked = True
+            self._pending_ending = ending
+            self._checkpoint_queue = [
+                q_id for q_id in CHECKPOINT_QUESTIONS
+                if (self.question_manager.get_question(q_id) and
+                    self.question_manager.get_question(q_id).type == 'multiple_choice')
+            ]
+            self._checkpoint_correct = 0
+            self._checkpoint_row = None
+            self._emit('checkpoint_started', ending_id=ending.id, questions=list(self._checkpoint_queue))
+            self._checkpoint_intro()
+            return
+        
+        self._show_location()
+    
+    def _checkpoint_intro(self) -> None:
+        self._show('checkpoint_intro', ['continue'],
+                   text="Sebelum kasus ini selesai, Anda harus menjawab satu pertanyaan terakhir untuk membuktikan kemampuan Anda!")
+    
+    def _question_screen(self, screen_type: str, question, **data) -> None:
+        self._show(screen_type, ['answer'], question={
+            'id': question.id, 'type': question.type, 'text': question.text,
+            'options': list(question.options)
+        }, **data)
+    
+    # ========== Handler perintah ==========
+    
+    def _open_case(self, case_id: str) -> Case:
+        """Buka kasus dan buat manager baru untuk sesi"""
+        try:
+            case = self.game_manager.open_case(case_id)
+        except FileNotFoundError:
+            raise CommandError(f"Kasus {case_id} tidak ditemukan")
+        except CaseSchemaError as e:
+            raise CommandError(f"Kasus {case_id} tidak valid: " + "; ".join(e.errors))
+        
+        try:
+            question_manager = QuestionManager(case)
+        except (FileNotFoundError, CaseSchemaError) as e:
+            raise CommandError(f"Bank soal kasus {case_id} tidak bisa dimuat: {e}")
+        
+        self.case_id = case_id
+        self.story_manager = StoryManager(case)
+        self.question_manager = question_manager
+        self.ending_manager = EndingManager(case)
+        self.choice_tracker = ChoiceTracker()
+        self._checkpoint_asked = False
+        self._pending_ending = None
+        self._checkpoint_queue = []
+        self._checkpoint_template = None
+        self._checkpoint_correct = 0
+        self._checkpoint_answered = False
+        self._checkpoint_row = None
+        self._reached_ending = None
+        return case
+    
+    def _cmd_start(self, case_id: Any) -> None:
+        case_id = case_id or self.case_id or 'case_01'
+        case = self._open_case(case_id)
+        self._emit('case_started', case_id=case_id, title=case.title)
+        self._show('intro', ['continue'], title=case.title, description=case.description)
+    
+    def _cmd_restart(self, _: Any) -> None:
+        self._cmd_start(self.case_id)
+    
+    def _cmd_quit(self, _: Any) -> None:
+        self._emit('session_finished')
+        self._show('finished', [])
+    
+    def _cmd_continue(self, _: Any) -> None:
+        screen_type = self.screen['type']
+        if screen_type == 'checkpoint_intro' or screen_type == 'checkpoint_result':
+            self._next_checkpoint_question()
+        elif screen_type == 'answer_result' and self._dialogue_choices:
+            self._show_dialogue()
+        else:
+            self._advance()
+    
+    def _cmd_search(self, _: Any) -> None:
+        if self.rng.random() < SEARCH_CHANCE:
+            clue_id, message = self.rng.choice(SEARCH_CLUES)
+            if self.game_manager.add_evidence(clue_id):
+                self._show_message([('success', message)])
+            else:
+                self._show_message([('warning', "Anda sudah memiliki petunjuk ini.")])
+        else:
+            self._emit('search_empty')
+            self._show_message([('warning', "Anda tidak menemukan petunjuk apapun di sini.")])
+    
+    def _cmd_inventory(self, _: Any) -> None:
+        clues = self.game_manager.case.clues
+        self._show('inventory', ['continue'], items=[
+            {'id': e, 'name': clues[e].name, 'category': clues[e].category, 'description': clues[e].description}
+            for e in self.game_manager.player_evidence if e in clues
+        ])
+    
+    def _cmd_notes(self, _: Any) -> None:
+        self._show('notes', ['continue'],
+                   choices_made=len(self.choice_tracker.choices_made),
+                   evidence_count=self.game_manager.get_evidence_count(),
+                   flag_count=len(self.game_manager.player_flags),
+                   question_stats=self.question_manager.get_question_stats())
+    
+    def _cmd_move(self, target: Any) -> None:
+        exits = self.screen['exits']
+        location_id = self._pick(target, [e['id'] for e in exits], "lokasi")
+        self.game_manager.move_to_location(location_id)
+        self._emit('moved', location_id=location_id)
+        self._advance()
+    
+    def _cmd_talk(self, target: Any) -> None:
+        npcs = self.screen['npcs']
+        if not npcs:
+            self._show_message([('warning', "Tidak ada NPC di lokasi ini.")])
+            return
+        npc_id = self._pick(target, [npc['id'] for npc in npcs], "NPC")
+        npc = self.game_manager.case.characters.get(npc_id)
+        
+        dialogue = npc.dialogues[npc.first_dialogue]
+        self._dialogue_npc = npc
+        self._dialogue_lines = [(npc.name, dialogue.text)]
+        self._dialogue_choices = dialogue.choices
+        self._emit('dialogue', npc_id=npc.id, dialogue_id=dialogue.id)
+        
+        # Soal di dalam dialog ditanyakan sebelum pilihan dialog
+        if dialogue.question:
+            question = self.question_manager.get_question(dialogue.question)
+            if not question:
+                self._show_message([('error', "Pertanyaan tidak ditemukan!")])
+                return
+            self._question_screen('question', question, speaker=npc.name, dialogue=dialogue.text)
+            return
+        
+        self._show_dialogue()
+    
+    def _show_dialogue(self) -> None:
+        choices = self._dialogue_choices
+        self._show('dialogue', ['choose'] if choices else ['continue'],
+                   npc={'id': self._dialogue_npc.id, 'name': self._dialogue_npc.name},
+                   lines=[{'speaker': speaker, 'text': text} for speaker, text in self._dialogue_lines],
+                   choices=[choice.text for choice in choices])
+    
+    def _cmd_choose(self, index: Any) -> None:
+        choices = self._dialogue_choices
+        choice = choices[self._index(index, len(choices), "pilihan")]
+        npc = self._dialogue_npc
+        
+        self._dialogue_choices = ()
+        if choice.next:
+            next_dialogue = npc.dialogues[choice.next]
+            self._dialogue_lines.append((npc.name, next_dialogue.text))
+            self._emit('dialogue', npc_id=npc.id, dialogue_id=next_dialogue.id)
+        self._show_dialogue()
+    
+    def _cmd_answer(self, answer: Any) -> None:
+        question_id = self.screen['question']['id']
+        question = self.question_manager.get_question(question_id)
+        
+        # Pilihan ganda boleh dijawab dengan nomor opsi (0-based)
+        if question.type == 'multiple_choice' and isinstance(answer, int):
+            answer = question.options[self._index(answer, len(question.options), "opsi")]
+        if not isinstance(answer, str):
+            raise CommandError("Jawaban harus berupa teks atau nomor opsi")
+        
+        is_correct, result = self.question_manager.validate_answer(question_id, answer)
+        self._emit('answer', question_id=question_id, answer=answer, correct=is_correct,
+                   message=result.message if result else '')
+        self.question_manager.apply_result(result, self.game_manager)
+        
+        if self.screen['type'] == 'checkpoint_question':
+            flag_name = CHECKPOINT_QUESTIONS.get(self._checkpoint_template)
+            if flag_name:
+                self.game_manager.set_flag(flag_name, is_correct)
+            if is_correct:
+                self._checkpoint_correct += 1
+            self._checkpoint_answered = True
+            self._show('checkpoint_result', ['continue'], correct=is_correct,
+                       message=result.message if result else '')
+            return
+        
+        if is_correct:
+            self._show('answer_result', ['continue'], correct=True, message="Jawaban Anda benar!")
+        else:
+            self._show('answer_result', ['continue'], correct=False, message="Jawaban Anda salah. Coba lagi nanti.")
+    
+    def _next_checkpoint_question(self) -> None:
+        if self._checkpoint_queue:
+            self._ask_checkpoint(self._checkpoint_queue.pop(0))
+            return
+        
+        # Perlu jawab minimal 1 pertanyaan dengan benar untuk mendapat ending sebenarnya
+        ending = self._pending_ending if self._checkpoint_correct > 0 else CHECKPOINT_FAILURE_ENDING
+        self._show_ending(ending)
+    
+    def _ask_checkpoint(self, template_id: str) -> None:
+        self._checkpoint_template = template_id
+        self._checkpoint_answered = False
+        self._emit('checkpoint_asked', question_id=template_id)
+        question = self._checkpoint_question(self.question_manager.get_question(template_id))
+        self._question_screen('checkpoint_question', question)
+    
+    def _checkpoint_question(self, template: Question) -> Question:
+        """Soal prosedural dari template checkpoint, atau template itu sendiri jika bukan soal aritmetika"""
+        difficulty = template.difficulty or DEFAULT_DIFFICULTY
+        if (template.topic not in OPERATIONS or difficulty not in DIFFICULTIES
+                or not math_generator_available()):
+            self._checkpoint_row = None
+            return template
+        self._checkpoint_row = self.math_queue.next_row(template.topic, difficulty)
+        question = self._generated_question(template, self._checkpoint_row)
+        self.question_manager.add_question(question)
+        return question
+    
+    @staticmethod
+    def _generated_question(template: Question, row: MathRow) -> Question:
+        """Soal prosedural dari baris pool dengan template checkpoint (juga untuk soal dari save)"""
+        return math_question(template.topic, template.difficulty or DEFAULT_DIFFICULTY, row,
+                             template.on_correct, template.on_incorrect, template.type)
+    
+    def _show_ending(self, ending: Ending) -> None:
+        self._reached_ending = ending
+        self.ending_manager.achieved_ending = ending  # Statistik mengikuti ending yang benar-benar dicapai
+        self._emit('ending', ending_id=ending.id, ending_type=ending.type)
+        self._ending_screen(ending)
+    
+    def _ending_screen(self, ending: Ending) -> None:
+        stats = self.ending_manager.get_playthrough_stats(self.game_manager, self.question_manager)
+        self._show('ending', ['restart', 'quit'],
+                   ending={'id': ending.id, 'type': ending.type, 'title': ending.title, 'text': ending.text},
+                   stats=stats)
+    
+    # ========== Helper ==========
+    
+    def _index(self, value: Any, count: int, label: str) -> int:
+        """Validasi nomor pilihan 0-based"""
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if not isinstance(value, int) or not 0 <= value < count:
+            raise CommandError(f"Nomor {label} tidak valid")
+        return value
+    
+    def _pick(self, value: Any, ids: List[str], label: str) -> str:
+        """Terima id atau nomor pilihan 0-based"""
+        if isinstance(value, str) and value in ids:
+            return value
+        return ids[self._index(value, len(ids), label)]
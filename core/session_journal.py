@@ -0,0 +1,259 @@
+"""
+SessionJournal - Journal append-only untuk satu sesi
+Setiap giliran dicatat sebagai record (event state dari SessionEngine, kosong jika
+giliran tidak mengubah state), sehingga sesi bisa dibangun ulang secara deterministik setelah
+crash. Snapshot (save biner) secara berkala memadatkan journal agar replay tetap singkat
+
+Layout file:
+    'DPSJ' | versi (1 byte) | record...
+record:
+    panjang payload (4 byte LE) | crc32 jenis+payload (4 byte LE) | jenis (1 byte) | payload
+jenis:
+    'E' - event satu giliran, payload JSON [turn, [event, ...]]
+    'S' - snapshot, payload = save dari core/save_format
+Record terakhir yang terpotong (crash saat menulis) diabaikan dan dibuang saat dibuka
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.session_engine import STATE_EVENTS
+
+
+JOURNAL_MAGIC = b'DPSJ'
+
+# Naikkan jika layout berubah
+JOURNAL_FORMAT_VERSION = 1
+
+RECORD_EVENTS = b'E'
+RECORD_SNAPSHOT = b'S'
+
+_HEADER = JOURNAL_MAGIC + bytes((JOURNAL_FORMAT_VERSION,))
+_RECORD_HEADER = struct.Struct('<II')
+
+# Field event yang dibutuhkan replay (sisanya hanya untuk tampilan)
+_EVENT_FIELDS = {
+    'case_started': ('case_id',),
+    'evidence_added': ('evidence_id',),
+    'evidence_removed': ('evidence_id',),
+    'flag_changed': ('flag', 'value', 'cleared'),
+    'moved': ('location_id',),
+    'answer': ('question_id', 'answer', 'correct'),
+    'checkpoint_started': ('ending_id', 'questions'),
+    'checkpoint_asked': ('question_id',),
+    'ending': ('ending_id',),
+}
+
+
+class JournalError(ValueError):
+    """File journal tidak valid"""
+    pass
+
+
+def _state_events(events: List[Dict]) -> List[Dict]:
+    """Ambil event yang mengubah state, hanya field yang dibutuhkan replay"""
+    result = []
+    for event in events:
+        event_type = event['type']
+        if event_type in STATE_EVENTS:
+            entry = {'type': event_type}
+            for field in _EVENT_FIELDS[event_type]:
+                if field in event:
+                    entry[field] = event[field]
+            result.append(entry)
+    return result
+
+
+class SessionJournal:
+    """
+    Journal satu sesi di satu file
+    - record(engine, response) setelah setiap handle()
+    - setiap snapshot_every record event, journal dipadatkan menjadi satu snapshot
+    - replay(engine) membangun ulang sesi: snapshot terakhir + event sesudahnya
+    """
+    
+    def __init__(self, path: str, snapshot_every: int = 64, fsync: bool = False):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync  # True = fsync setiap record (tahan crash OS, lebih lambat)
+        self.records_since_snapshot = 0
+        
+        valid_size = self._scan()
+        self._file = open(path, 'r+b' if valid_size else 'w+b')
+        if not valid_size:
+            self._file.write(_HEADER)
+            valid_size = len(_HEADER)
+            if fsync:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                _fsync_directory(path)
+        # Buang ekor record yang terpotong
+        self._file.truncate(valid_size)
+        self._file.seek(valid_size)
+    
+    # ========== Tulis ==========
+    
+    def append(self, turn: int, events: List[Dict]) -> bool:
+        """
+        Catat event state satu giliran, return False jika tidak ada yang dicatat
+        Giliran tanpa event state tetap dicatat (hanya turn) agar replay sampai ke turn yang sama;
+        perintah yang ditolak (event error, turn tidak naik) tidak dicatat
+        """
+        if any(event['type'] == 'error' for event in events):
+            return False
+        state_events = _state_events(events)
+        payload = json.dumps([turn, state_events], ensure_ascii=False, separators=(',', ':'))
+        self._write(RECORD_EVENTS, payload.encode('utf-8'))
+        self.records_since_snapshot += 1
+        return True
+    
+    def record(self, engine, response: Dict) -> None:
+        """
+        Catat hasil engine.handle(), padatkan journal jika sudah waktunya
+        Soal checkpoint prosedural hanya tersimpan di save (event tidak memuat jawabannya),
+        jadi giliran yang menanyakan soal checkpoint langsung diikuti snapshot
+        """
+        if not self.append(engine.turn, response['events']) or engine.game_manager.case is None:
+            return
+        if self.records_since_snapshot >= self.snapshot_every:
+            self.compact(engine.save())
+        elif any(event['type'] == 'checkpoint_asked' for event in response['events']):
+            self.snapshot(engine.save())
+    
+    def snapshot(self, data: bytes) -> None:
+        """Tambahkan snapshot di akhir journal (record sebelumnya tidak lagi dibutuhkan replay)"""
+        self._write(RECORD_SNAPSHOT, data)
+        self.records_since_snapshot = 0
+    
+    def compact(self, snapshot: bytes) -> None:
+        """Ganti seluruh journal dengan satu snapshot (ditulis atomik lewat file sementara)"""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as temp:
+            temp.write(_HEADER)
+            temp.write(self._encode(RECORD_SNAPSHOT, snapshot))
+            temp.flush()
+            os.fsync(temp.fileno())
+        self._file.close()
+        os.replace(temp_path, self.path)
+        _fsync_directory(self.path)  # Rename baru tahan crash setelah entri direktori ditulis
+        self._file = open(self.path, 'r+b')
+        self._file.seek(0, os.SEEK_END)
+        self.records_since_snapshot = 0
+    
+    def _write(self, kind: bytes, payload: bytes) -> None:
+        self._file.write(self._encode(kind, payload))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+    
+    @staticmethod
+    def _encode(kind: bytes, payload: bytes) -> bytes:
+        body = kind + payload
+        return _RECORD_HEADER.pack(len(payload), zlib.crc32(body)) + body
+    
+    # ========== Baca ==========
+    
+    def records(self) -> Iterator[Tuple[bytes, Any]]:
+        """Iterasi record: (RECORD_EVENTS, (turn, events)) atau (RECORD_SNAPSHOT, bytes)"""
+        self._file.flush()
+        with open(self.path, 'rb') as journal:
+            data = journal.read()
+        for kind, payload in self._iter_records(data)[0]:
+            if kind == RECORD_EVENTS:
+                turn, events = json.loads(payload.decode('utf-8'))
+                yield kind, (turn, events)
+            else:
+                yield kind, payload
+    
+    def replay(self, engine) -> Dict:
+        """Bangun ulang sesi di engine dari snapshot terakhir + event sesudahnya"""
+        snapshot: Optional[bytes] = None
+        pending: List[Tuple[int, List[Dict]]] = []
+        for kind, value in self.records():
+            if kind == RECORD_SNAPSHOT:
+                snapshot = value
+                pending = []
+            else:
+                pending.append(value)
+        return engine.replay(snapshot, pending)
+    
+    def _scan(self) -> int:
+        """Validasi file yang sudah ada, return ukuran bagian yang valid (0 = file baru)"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as journal:
+            data = journal.read()
+        if _HEADER.startswith(data):
+            return 0  # Kosong atau header terpotong
+        if data[:len(JOURNAL_MAGIC)] != JOURNAL_MAGIC:
+            raise JournalError(f"{self.path} bukan file journal")
+        if data[:len(_HEADER)] != _HEADER:
+            raise JournalError(f"Versi journal {self.path} tidak didukung")
+        
+        records, valid_size = self._iter_records(data)
+        count = 0
+        for kind, _ in records:
+            count = 0 if kind == RECORD_SNAPSHOT else count + 1
+        self.records_since_snapshot = count
+        return valid_size
+    
+    @staticmethod
+    def _iter_records(data: bytes) -> Tuple[List[Tuple[bytes, bytes]], int]:
+        """Pecah isi file menjadi record, berhenti di record rusak/terpotong"""
+        records = []
+        pos = len(_HEADER)
+        header_size = _RECORD_HEADER.size
+        while pos + header_size + 1 <= len(data):
+            size, checksum = _RECORD_HEADER.unpack_from(data, pos)
+            start = pos + header_size
+            end = start + 1 + size
+            if end > len(data):
+                break
+            body = data[start:end]
+            if zlib.crc32(body) != checksum:
+                break
+            records.append((body[:1], body[1:]))
+            pos = end
+        return records, pos
+    
+    @property
+    def empty(self) -> bool:
+        """True jika journal belum berisi record (tidak ada yang bisa di-replay)"""
+        self._file.flush()
+        return os.path.getsize(self.path) <= len(_HEADER)
+    
+    # ========== Lainnya ==========
+    
+    def close(self) -> None:
+        self._file.close()
+    
+    def discard(self) -> None:
+        """Tutup dan hapus file journal (sesi selesai)"""
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+    
+    def __enter__(self) -> 'SessionJournal':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _fsync_directory(path: str) -> None:
+    """fsync direktori berisi path agar pembuatan/rename file ikut tersimpan (diabaikan jika OS tidak mendukung)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,217 @@
+"""
+SessionStore - Penyimpanan sesi pemain di SQLite
+Save sesi (core/save_format) ditulis ke database mode WAL oleh satu thread
+writer di belakang layar: update per giliran dari banyak sesi digabung
+menjadi satu transaksi per batch. Baca saat reconnect dilayani cache memori dulu
+"""
+
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from core.save_format import read_save_header
+
+
+# Penanda hapus di antrian tulis
+_DELETED = object()
+
+
+class SessionStore:
+    """
+    Store sesi dengan write-behind:
+    - put() hanya mengisi cache + antrian (tidak menunggu disk)
+    - writer thread menulis antrian setiap flush_interval detik dalam satu transaksi,
+      update berulang untuk sesi yang sama digabung (yang terakhir menang)
+    - synchronous=NORMAL di mode WAL: fsync hanya saat checkpoint, bukan per commit
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            case_id TEXT NOT NULL,
+            data BLOB NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    
+    def __init__(self, path: str, flush_interval: float = 0.2, max_batch: int = 1024,
+                 cache_entries: int = 4096):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.cache_entries = cache_entries
+        self.last_error: Optional[Exception] = None
+        
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+        
+        self._cache = OrderedDict()  # session_id -> data, LRU
+        self._pending: Dict[str, object] = {}  # session_id -> (data, case_id, waktu) atau _DELETED
+        self._inflight: Dict[str, object] = {}  # Batch yang sedang ditulis writer
+        self._queued = 0  # Nomor urut put/delete terakhir
+        self._written = 0  # Nomor urut yang sudah ter-commit
+        self._cond = threading.Condition()
+        self._closed = False
+        
+        self._writer = threading.Thread(target=self._write_loop, name='session-store-writer', daemon=True)
+        self._writer.start()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(self.SCHEMA)
+        return conn
+    
+    # ========== API ==========
+    
+    def put(self, session_id: str, data: bytes) -> None:
+        """Simpan save sesi (non-blocking, ditulis ke disk oleh writer thread)"""
+        if self._closed:
+            raise RuntimeError("SessionStore sudah ditutup")
+        case_id = read_save_header(data)[1]
+        with self._cond:
+            self._cache_put(session_id, data)
+            self._pending[session_id] = (data, case_id, time.time())
+            self._queued += 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+    
+    def get(self, session_id: str) -> Optional[bytes]:
+        """Ambil save sesi: cache memori, antrian tulis, lalu database"""
+        with self._cond:
+            data = self._cache.get(session_id)
+            if data is not None:
+                self._cache.move_to_end(session_id)
+                return data
+            pending = self._pending.get(session_id, self._inflight.get(session_id))
+            if pending is _DELETED:
+                return None
+            if pending is not None:
+                return pending[0]
+        
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        data = bytes(row[0])
+        with self._cond:
+            # Jangan timpa put() yang terjadi selama membaca database
+            if session_id not in self._pending and session_id not in self._inflight:
+                self._cache_put(session_id, data)
+        return data
+    
+    def delete(self, session_id: str) -> None:
+        """Hapus sesi (misalnya setelah permainan selesai)"""
+        with self._cond:
+            self._cache.pop(session_id, None)
+            self._pending[session_id] = _DELETED
+            self._queued += 1
+    
+    def save_engine(self, session_id: str, engine, compress: bool = False) -> None:
+        """Shortcut: simpan SessionEngine yang sedang bermain"""
+        self.put(session_id, engine.save(compress))
+    
+    def load_engine(self, session_id: str, engine) -> Optional[Dict]:
+        """Shortcut: lanjutkan SessionEngine dari save, None jika sesi tidak ada"""
+        data = self.get(session_id)
+        if data is None:
+            return None
+        return engine.load(data)
+    
+    def stats(self) -> Tuple[int, int]:
+        """(jumlah sesi di cache, jumlah update yang belum ditulis)"""
+        with self._cond:
+            return len(self._cache), len(self._pending)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Tunggu sampai semua put/delete sebelumnya ter-commit, False jika timeout"""
+        with self._cond:
+            target = self._queued
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target or not self._writer.is_alive(), timeout)
+    
+    def close(self) -> None:
+        """Tulis sisa antrian lalu hentikan writer thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        with self._read_lock:
+            self._read_conn.close()
+    
+    def __enter__(self) -> 'SessionStore':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    # ========== Internal ==========
+    
+    def _cache_put(self, session_id: str, data: bytes) -> None:
+        self._cache[session_id] = data
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+    
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    if not self._closed and len(self._pending) < self.max_batch:
+                        # Tunggu sebentar agar update sesi lain ikut masuk batch yang sama
+                        self._cond.wait(self.flush_interval)
+                    batch, self._pending = self._pending, {}
+                    self._inflight = batch
+                    target = self._queued
+                    closing = self._closed
+                
+                written = self._write_batch(conn, batch) if batch else True
+                
+                with self._cond:
+                    self._inflight = {}
+                    if written:
+                        self._written = max(self._written, target)
+                    self._cond.notify_all()
+                    if closing and (not self._pending or not written):
+                        return
+        finally:
+            conn.close()
+    
+    def _write_batch(self, conn: sqlite3.Connection, batch: Dict[str, object]) -> bool:
+        """Tulis satu batch dalam satu transaksi, False jika gagal (batch dikembalikan ke antrian)"""
+        rows = []
+        deleted = []
+        for session_id, entry in batch.items():
+            if entry is _DELETED:
+                deleted.append((session_id,))
+            else:
+                data, case_id, updated_at = entry
+                rows.append((session_id, case_id, data, updated_at))
+        try:
+            conn.execute("BEGIN")
+            if rows:
+                conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)", rows)
+            if deleted:
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", deleted)
+            conn.execute("COMMIT")
+            return True
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self.last_error = e
+            print(f"✗ Gagal menulis {len(batch)} sesi: {e}", file=sys.stderr)
+            with self._cond:
+                # Kembalikan ke antrian kecuali sudah ada update yang lebih baru
+                for session_id, entry in batch.items():
+                    self._pending.setdefault(session_id, entry)
+            time.sleep(self.flush_interval)
+            return False
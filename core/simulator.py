@@ -0,0 +1,257 @@
+"""
+Simulator - Simulasi Monte Carlo playthrough
+Memainkan kasus secara otomatis lewat SessionEngine (logika yang sama dengan
+GameLoop) dengan policy yang bisa diganti, RNG di-seed per run, dan
+menggabungkan hasil banyak run dari process pool
+"""
+
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.answer_matcher import AnswerMatcher
+from core.case_registry import CaseRegistry
+from core.case_store import open_case_store
+from core.session_engine import SEARCH_CLUES, SessionEngine
+
+
+# Label hasil run yang tidak mencapai ending dalam batas giliran
+TIMEOUT_ENDING = 'timeout'
+
+
+# ========== Policy ==========
+
+class Policy:
+    """
+    Policy dasar: navigasi acak (cari, bicara, pindah), pilihan dialog acak
+    Subclass mengganti cara menjawab soal dan/atau memilih aksi di lokasi
+    """
+    
+    name = 'random'
+    
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.matcher: Optional[AnswerMatcher] = None  # Matcher soal yang sedang dijawab
+    
+    def act(self, engine: SessionEngine) -> Tuple[str, Any]:
+        """Pilih perintah berikutnya untuk layar engine saat ini"""
+        screen = engine.screen
+        screen_type = screen['type']
+        if screen_type == 'location':
+            return self.location_action(engine, screen)
+        if screen_type in ('question', 'checkpoint_question'):
+            question = engine.question_manager.get_question(screen['question']['id'])
+            self.matcher = engine.question_manager.matcher_for(question.id)
+            return 'answer', self.answer(question)
+        if screen_type == 'dialogue' and screen['choices']:
+            return 'choose', self.rng.randrange(len(screen['choices']))
+        return 'continue', None
+    
+    def location_action(self, engine: SessionEngine, screen: Dict) -> Tuple[str, Any]:
+        # Inventory dan catatan tidak mengubah state, tidak dipilih
+        options = [('search', None)]
+        options.extend(('talk', npc['id']) for npc in screen['npcs'])
+        options.extend(('move', e['id']) for e in screen['exits'])
+        return self.rng.choice(options)
+    
+    def answer(self, question) -> Any:
+        if self.rng.random() < 0.5:
+            return self.correct_answer(question)
+        return self.wrong_answer(question)
+    
+    @staticmethod
+    def correct_answer(question) -> str:
+        return question.correct_answer
+    
+    def wrong_answer(self, question) -> str:
+        wrong = [o for o in question.options if not self.matcher.is_correct(question.id, o)]
+        return self.rng.choice(wrong) if wrong else ''
+
+
+class AlwaysCorrectPolicy(Policy):
+    """Navigasi acak, semua soal dijawab benar"""
+    
+    name = 'always-correct'
+    
+    def answer(self, question) -> Any:
+        return self.correct_answer(question)
+
+
+class AlwaysWrongPolicy(Policy):
+    """Navigasi acak, semua soal dijawab salah"""
+    
+    name = 'always-wrong'
+    
+    def answer(self, question) -> Any:
+        return self.wrong_answer(question)
+
+
+class GreedyEvidencePolicy(AlwaysCorrectPolicy):
+    """
+    Kejar bukti: bicara dengan NPC yang soalnya belum dijawab benar,
+    cari petunjuk selama masih ada yang belum ditemukan, lalu pindah lokasi
+    """
+    
+    name = 'greedy-evidence'
+    
+    def location_action(self, engine: SessionEngine, screen: Dict) -> Tuple[str, Any]:
+        case = engine.game_manager.case
+        questions = engine.question_manager
+        for npc in screen['npcs']:
+            character = case.characters.get(npc['id'])
+            question_id = character.dialogues[character.first_dialogue].question if character else None
+            if question_id and questions.get_last_answer_result(question_id) is not True:
+                return 'talk', npc['id']
+        
+        game = engine.game_manager
+        if not all(game.has_evidence(clue_id) for clue_id, _ in SEARCH_CLUES):
+            return 'search', None
+        if screen['exits']:
+            return 'move', self.rng.choice(screen['exits'])['id']
+        return 'search', None
+
+
+POLICIES = {
+    policy.name: policy
+    for policy in (Policy, GreedyEvidencePolicy, AlwaysCorrectPolicy, AlwaysWrongPolicy)
+}
+
+
+# ========== Run ==========
+
+def run_seed(seed: int, run_index: int) -> int:
+    """Seed RNG engine untuk satu run (deterministik, beda per run)"""
+    return seed * 1000003 + run_index
+
+
+def simulate_run(case_id: str, policy_name: str, seed: int, run_index: int,
+                 max_turns: int = 200, case_registry: Optional[CaseRegistry] = None) -> Tuple[str, int, int]:
+    """
+    Mainkan satu run sampai layar ending
+    Return (ending_id atau TIMEOUT_ENDING, jumlah giliran, jumlah bukti)
+    """
+    run_rng = random.Random(run_seed(seed, run_index))
+    engine = SessionEngine(case_registry, rng=random.Random(run_rng.getrandbits(64)))
+    policy = POLICIES[policy_name](random.Random(run_rng.getrandbits(64)))
+    
+    response = engine.start(case_id)
+    if engine.screen['type'] == 'idle':
+        errors = [e['message'] for e in response['events'] if e['type'] == 'error']
+        raise ValueError("; ".join(errors) or f"Kasus {case_id} tidak bisa dimulai")
+    
+    while engine.turn < max_turns:
+        if engine.screen['type'] == 'ending':
+            ending_id = engine.screen['ending']['id']
+            return ending_id, engine.turn, engine.game_manager.get_evidence_count()
+        action, arg = policy.act(engine)
+        response = engine.handle(action, arg)
+        if response['events'] and response['events'][-1]['type'] == 'error':
+            raise RuntimeError(f"Policy {policy_name} mengirim perintah tidak valid: {response['events'][-1]['message']}")
+    
+    return TIMEOUT_ENDING, engine.turn, engine.game_manager.get_evidence_count()
+
+
+class SimulationReport:
+    """Agregat hasil banyak run (bisa digabung antar worker)"""
+    
+    def __init__(self, case_id: str, policy: str):
+        self.case_id = case_id
+        self.policy = policy
+        self.runs = 0
+        self.endings = Counter()  # ending_id -> jumlah run
+        self.turns = Counter()  # jumlah giliran -> jumlah run
+        self.evidence = Counter()  # jumlah bukti akhir -> jumlah run
+        self.turns_by_ending = Counter()  # ending_id -> total giliran
+    
+    def add(self, ending_id: str, turns: int, evidence_count: int) -> None:
+        self.runs += 1
+        self.endings[ending_id] += 1
+        self.turns[turns] += 1
+        self.evidence[evidence_count] += 1
+        self.turns_by_ending[ending_id] += turns
+    
+    def merge(self, other: 'SimulationReport') -> None:
+        self.runs += other.runs
+        self.endings.update(other.endings)
+        self.turns.update(other.turns)
+        self.evidence.update(other.evidence)
+        self.turns_by_ending.update(other.turns_by_ending)
+    
+    def to_dict(self) -> Dict:
+        return {
+            'case_id': self.case_id,
+            'policy': self.policy,
+            'runs': self.runs,
+            'endings': {
+                ending_id: {
+                    'runs': count,
+                    'share': count / self.runs,
+                    'mean_turns': self.turns_by_ending[ending_id] / count
+                }
+                for ending_id, count in self.endings.most_common()
+            },
+            'turns_histogram': dict(sorted(self.turns.items())),
+            'evidence_histogram': dict(sorted(self.evidence.items()))
+        }
+    
+    def format_text(self, bar_width: int = 40) -> str:
+        """Laporan teks dengan histogram sederhana"""
+        lines = [f"Kasus {self.case_id} - policy {self.policy} - {self.runs} run", "", "ENDING:"]
+        for ending_id, count in self.endings.most_common():
+            lines.append(f"  {ending_id:<28} {count:>8}  {count / self.runs * 100:5.1f}%"
+                         f"  rata-rata {self.turns_by_ending[ending_id] / count:.1f} giliran")
+        for title, histogram in (("GILIRAN SAMPAI ENDING:", self.turns), ("JUMLAH BUKTI AKHIR:", self.evidence)):
+            lines += ["", title]
+            peak = max(histogram.values()) if histogram else 1
+            for value, count in sorted(histogram.items()):
+                lines.append(f"  {value:>4} {count:>8}  {'█' * max(1, round(count / peak * bar_width))}")
+        return "\n".join(lines)
+
+
+# ========== Process pool ==========
+
+_worker_registry: Optional[CaseRegistry] = None
+
+
+def _init_worker(store_location: Optional[str]) -> None:
+    global _worker_registry
+    _worker_registry = CaseRegistry(open_case_store(store_location)) if store_location else None
+
+
+def _simulate_chunk(case_id: str, policy_name: str, seed: int, start: int, stop: int,
+                    max_turns: int) -> SimulationReport:
+    report = SimulationReport(case_id, policy_name)
+    for run_index in range(start, stop):
+        report.add(*simulate_run(case_id, policy_name, seed, run_index, max_turns, _worker_registry))
+    return report
+
+
+def simulate(case_id: str, policy_name: str = 'random', runs: int = 1000, seed: int = 0,
+             workers: Optional[int] = None, max_turns: int = 200,
+             store_location: Optional[str] = None) -> SimulationReport:
+    """
+    Jalankan runs playthrough, dibagi ke process pool (workers=1 = tanpa pool)
+    Hasil hanya bergantung pada seed, bukan jumlah worker
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"Policy tidak dikenal: {policy_name} (pilihan: {', '.join(POLICIES)})")
+    workers = workers or os.cpu_count() or 1
+    report = SimulationReport(case_id, policy_name)
+    
+    if workers == 1 or runs < 100:
+        _init_worker(store_location)
+        report.merge(_simulate_chunk(case_id, policy_name, seed, 0, runs, max_turns))
+        return report
+    
+    # Chunk cukup besar agar overhead IPC kecil, cukup banyak agar beban merata
+    chunk = max(50, min(5000, runs // (workers * 8) or 1))
+    bounds: List[Tuple[int, int]] = [(start, min(start + chunk, runs)) for start in range(0, runs, chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(store_location,)) as pool:
+        futures = [pool.submit(_simulate_chunk, case_id, policy_name, seed, start, stop, max_turns)
+                   for start, stop in bounds]
+        for future in futures:
+            report.merge(future.result())
+    return report
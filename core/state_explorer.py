@@ -0,0 +1,570 @@
+"""
+StateExplorer - Eksplorasi lengkap ruang state satu kasus
+BFS atas semua state yang bisa dicapai (lokasi, flag, bukti, tahap checkpoint)
+dengan aturan yang sama dengan SessionEngine. State di-hash dengan Zobrist
+hashing (diperbarui incremental per transisi), frontier dan tabel visited yang besar
+ditulis ke disk, dan ekspansi satu lapis BFS bisa dibagi ke beberapa proses
+"""
+
+import hashlib
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.case_model import Case
+from core.ending_manager import GENERIC_FAILURE_ENDING
+from core.ending_network import get_ending_network
+from core.game_manager import GameManager, GameState
+from core.player_state import iter_bits
+from core.question_manager import QuestionManager
+from core.session_engine import CHECKPOINT_FAILURE_ENDING, CHECKPOINT_QUESTIONS, SEARCH_CLUES
+from core.story_manager import StoryManager
+
+
+# State: (lokasi, evidence_mask, bukti ekstra, flag_set_mask, flag_true_mask, flag lain, tahap)
+# tahap: None = menjelajah, (posisi soal checkpoint, ada jawaban benar, indeks ending) = checkpoint
+State = Tuple[str, int, Tuple[str, ...], int, int, Tuple[Tuple[str, Any], ...], Optional[Tuple[int, bool, int]]]
+
+# Hasil transisi: state baru, atau ('ending', ending_id) untuk akhir permainan
+Successor = Tuple[str, Any]
+
+
+def _random_key(*parts: Any) -> int:
+    """Key Zobrist 64-bit yang stabil antar proses untuk komponen di luar tabel"""
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class ZobristHasher:
+    """
+    Hash Zobrist: XOR key acak setiap komponen state
+    Transisi hanya mengubah sedikit bit sehingga hash baru dihitung dari selisihnya
+    """
+    
+    def __init__(self, case: Case, seed: int = 0x5EED):
+        rng = random.Random(seed)
+        self.location_keys = {location_id: rng.getrandbits(64) for location_id in case.locations}
+        self.evidence_keys = [rng.getrandbits(64) for _ in case.evidence_ids]
+        self.flag_set_keys = [rng.getrandbits(64) for _ in case.flag_ids]
+        self.flag_true_keys = [rng.getrandbits(64) for _ in case.flag_ids]
+    
+    def location(self, location_id: str) -> int:
+        key = self.location_keys.get(location_id)
+        return key if key is not None else _random_key('location', location_id)
+    
+    def full(self, state: State) -> int:
+        """Hash lengkap satu state"""
+        location, evidence_mask, extra, set_mask, true_mask, values, stage = state
+        result = self.location(location)
+        result ^= self._mask(self.evidence_keys, evidence_mask)
+        result ^= self._mask(self.flag_set_keys, set_mask)
+        result ^= self._mask(self.flag_true_keys, true_mask)
+        for evidence_id in extra:
+            result ^= _random_key('evidence', evidence_id)
+        for item in values:
+            result ^= _random_key('flag', item)
+        if stage is not None:
+            result ^= _random_key('stage', stage)
+        return result
+    
+    def update(self, old_hash: int, old: State, new: State) -> int:
+        """Hash state baru dari hash state lama + komponen yang berubah"""
+        result = old_hash
+        if old[0] != new[0]:
+            result ^= self.location(old[0]) ^ self.location(new[0])
+        result ^= self._mask(self.evidence_keys, old[1] ^ new[1])
+        result ^= self._mask(self.flag_set_keys, old[3] ^ new[3])
+        result ^= self._mask(self.flag_true_keys, old[4] ^ new[4])
+        if old[2] != new[2]:
+            for evidence_id in set(old[2]).symmetric_difference(new[2]):
+                result ^= _random_key('evidence', evidence_id)
+        if old[5] != new[5]:
+            for item in set(old[5]).symmetric_difference(new[5]):
+                result ^= _random_key('flag', item)
+        if old[6] != new[6]:
+            if old[6] is not None:
+                result ^= _random_key('stage', old[6])
+            if new[6] is not None:
+                result ^= _random_key('stage', new[6])
+        return result
+    
+    @staticmethod
+    def _mask(keys: List[int], mask: int) -> int:
+        result = 0
+        for bit in iter_bits(mask):
+            result ^= keys[bit]
+        return result
+
+
+def _freeze(value: Any) -> Any:
+    """Nilai flag list/dict dijadikan hashable untuk state"""
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class TransitionModel:
+    """
+    Aturan transisi SessionEngine dalam bentuk fungsi state -> successor
+    Aksi yang tidak mengubah state (inventory, catatan, pilihan dialog) diabaikan
+    """
+    
+    def __init__(self, case: Case):
+        self.case = case
+        self.game = GameManager()
+        self.game.case = case
+        self.game.current_case = case.id
+        self.game._set_bit_tables(case)
+        self.story = StoryManager(case)
+        self.questions = QuestionManager(case)
+        self.network = get_ending_network(case)
+        self.hasher = ZobristHasher(case)
+        self.checkpoint_queue = [
+            q_id for q_id in CHECKPOINT_QUESTIONS
+            if q_id in case.questions and case.questions[q_id].type == 'multiple_choice'
+        ]
+        
+        # Akurasi jawaban bukan bagian state (riwayat jawaban tidak terbatas): untuk ending dengan
+        # min_accuracy setiap rentang akurasi antar ambang menjadi cabang. (label, akurasi wakil)
+        self.accuracy_bands: List[Tuple[str, Optional[float]]] = [('', None)]
+        if self.network.uses_accuracy:
+            thresholds = sorted({ending.min_accuracy for ending in case.endings if ending.min_accuracy > 0})
+            self.accuracy_bands = [(f"akurasi<{thresholds[0]:g}", 0.0)] + [
+                (f"akurasi>={threshold:g}", threshold) for threshold in thresholds
+            ]
+    
+    def initial(self) -> Successor:
+        """Hasil 'continue' di layar intro: lokasi awal tanpa bukti dan flag, lalu cek ending"""
+        self._load((self.case.start_location, 0, (), 0, 0, (), None))
+        # Belum ada jawaban: akurasi 0 (sama dengan QuestionManager.get_accuracy)
+        return self._outcome(self.network.match_index(self.game, 0.0))
+    
+    def successors(self, state: State) -> List[Tuple[str, Successor]]:
+        """Daftar (aksi, hasil) dari satu state"""
+        stage = state[6]
+        if stage is not None:
+            return self._checkpoint_successors(state)
+        
+        result = []
+        for clue_id, _ in SEARCH_CLUES:
+            self._load(state)
+            self.game.add_evidence(clue_id)
+            result += self._advance(f"search:{clue_id}")
+        
+        flags = self._load(state).player_flags
+        for npc in self.story.get_npcs_at_location(state[0], flags):
+            question_id = npc.dialogues[npc.first_dialogue].question
+            question = self.case.questions.get(question_id) if question_id else None
+            if question is None:
+                continue  # Dialog tanpa soal tidak mengubah state
+            for correct in (True, False):
+                self._load(state)
+                self.questions.apply_result(question.on_correct if correct else question.on_incorrect, self.game)
+                result += self._advance(f"talk:{npc.id}:{'benar' if correct else 'salah'}")
+        
+        location = self.case.locations.get(state[0])
+        for target, _ in (location.exits if location else ()):
+            self._load(state)
+            self.game.move_to_location(target)
+            result += self._advance(f"move:{target}")
+        return result
+    
+    def _checkpoint_successors(self, state: State) -> List[Tuple[str, Successor]]:
+        position, any_correct, ending_index = state[6]
+        question_id = self.checkpoint_queue[position]
+        question = self.case.questions[question_id]
+        result = []
+        for correct in (True, False):
+            self._load(state)
+            self.game.set_flag(CHECKPOINT_QUESTIONS[question_id], correct)
+            self.questions.apply_result(question.on_correct if correct else question.on_incorrect, self.game)
+            reached = any_correct or correct
+            if position + 1 < len(self.checkpoint_queue):
+                outcome = ('state', self._capture((position + 1, reached, ending_index)))
+            else:
+                # Minimal satu jawaban benar untuk mendapat ending sebenarnya
+                ending_id = self.case.endings[ending_index].id if reached else CHECKPOINT_FAILURE_ENDING.id
+                outcome = ('ending', ending_id)
+            result.append((f"checkpoint:{question_id}:{'benar' if correct else 'salah'}", outcome))
+        return result
+    
+    def _advance(self, action: str) -> List[Tuple[str, Successor]]:
+        """
+        Sama dengan SessionEngine._advance: ending nyata memulai checkpoint
+        Jika hasil ending bergantung pada akurasi, satu cabang per rentang akurasi
+        (aksi diberi label rentangnya)
+        """
+        branches = []
+        for label, accuracy in self.accuracy_bands:
+            index = self.network.match_index(self.game, accuracy)
+            if all(index != other for _, other in branches):
+                branches.append((label, index))
+        if len(branches) == 1:
+            return [(action, self._outcome(branches[0][1]))]
+        return [(f"{action}[{label}]", self._outcome(index)) for label, index in branches]
+    
+    def _outcome(self, index: Optional[int]) -> Successor:
+        if index is None or self.case.endings[index].id == GENERIC_FAILURE_ENDING.id:
+            return 'state', self._capture(None)
+        if not self.checkpoint_queue:
+            return 'ending', CHECKPOINT_FAILURE_ENDING.id
+        return 'state', self._capture((0, False, index))
+    
+    def _load(self, state: State) -> GameManager:
+        location, evidence_mask, extra, set_mask, true_mask, values, _ = state
+        GameState.from_values(location, evidence_mask, extra, set_mask, true_mask,
+                              {name: value for name, value in values}).restore(self.game)
+        return self.game
+    
+    def _capture(self, stage) -> State:
+        game = self.game
+        values = tuple(sorted((name, _freeze(value)) for name, value in game._flag_values.items()))
+        return (game.current_location, game._evidence_mask, tuple(sorted(game._extra_evidence)),
+                game._flag_set_mask, game._flag_true_mask, values, stage)
+
+
+class Frontier:
+    """Antrian satu lapis BFS, sisa di atas memory_limit ditulis ke file sementara"""
+    
+    def __init__(self, memory_limit: int = 200000, spill_dir: Optional[str] = None):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self._memory: List = []
+        self._file = None
+        self.size = 0
+        self.spilled = 0
+    
+    def append(self, item) -> None:
+        self._memory.append(item)
+        self.size += 1
+        if len(self._memory) >= self.memory_limit:
+            self._spill()
+    
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+        pickle.dump(self._memory, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled += len(self._memory)
+        self._memory = []
+    
+    def __iter__(self) -> Iterator:
+        if self._file is not None:
+            self._file.seek(0)
+            while True:
+                try:
+                    chunk = pickle.load(self._file)
+                except EOFError:
+                    break
+                yield from chunk
+        yield from self._memory
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class VisitedTable:
+    """
+    Tabel visited BFS: id node -> (id induk, indeks aksi), dicari lewat hash Zobrist
+    Hash hanya untuk mencari kandidat: state disimpan utuh dan dibandingkan, sehingga
+    tabrakan hash 64-bit tidak menggabungkan dua state yang berbeda (dihitung di collisions).
+    Sampai memory_limit state disimpan di memori, selebihnya di database SQLite sementara
+    """
+    
+    def __init__(self, memory_limit: int = 1000000, spill_dir: Optional[str] = None):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.collisions = 0
+        self.spilled = 0
+        self._index: Dict[int, Any] = {}  # hash -> id node, atau list id jika bertabrakan
+        self._rows: List[Tuple[int, int, State]] = []  # id node -> (id induk, aksi, state)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[str] = None
+    
+    def __len__(self) -> int:
+        return len(self._rows) + self.spilled
+    
+    def seen(self, state_hash: int, state: State) -> bool:
+        """True jika state sudah pernah dikunjungi"""
+        if self._db is not None:
+            return any(row[0] == repr(state) for row in self._db_candidates(state_hash))
+        node = self._index.get(state_hash)
+        if node is None:
+            return False
+        return any(self._rows[n][2] == state for n in (node if isinstance(node, list) else (node,)))
+    
+    def add(self, state_hash: int, state: State, parent: int, action: int) -> Optional[int]:
+        """Tambah state, return id node baru atau None jika state sudah pernah dikunjungi"""
+        if self._db is not None:
+            return self._add_db(state_hash, state, parent, action)
+        
+        node = self._index.get(state_hash)
+        if node is not None:
+            if any(self._rows[n][2] == state for n in (node if isinstance(node, list) else (node,))):
+                return None
+            self.collisions += 1
+        
+        node_id = len(self._rows)
+        self._rows.append((parent, action, state))
+        if node is None:
+            self._index[state_hash] = node_id
+        elif isinstance(node, list):
+            node.append(node_id)
+        else:
+            self._index[state_hash] = [node, node_id]
+        
+        if len(self._rows) >= self.memory_limit:
+            self._spill()
+        return node_id
+    
+    def parent(self, node_id: int) -> Tuple[int, int]:
+        """(id induk, indeks aksi) satu node, aksi -1 = node awal"""
+        if self._db is None:
+            parent, action, _ = self._rows[node_id]
+            return parent, action
+        return self._db.execute("SELECT parent, action FROM visited WHERE id = ?", (node_id,)).fetchone()
+    
+    def _add_db(self, state_hash: int, state: State, parent: int, action: int) -> Optional[int]:
+        encoded = repr(state)
+        rows = self._db_candidates(state_hash)
+        if rows:
+            if any(row[0] == encoded for row in rows):
+                return None
+            self.collisions += 1
+        node_id = self.spilled
+        self._db.execute("INSERT INTO visited VALUES (?, ?, ?, ?, ?)",
+                         (node_id, _signed(state_hash), parent, action, encoded))
+        self.spilled += 1
+        return node_id
+    
+    def _db_candidates(self, state_hash: int) -> List[Tuple[str]]:
+        return self._db.execute("SELECT state FROM visited WHERE hash = ?", (_signed(state_hash),)).fetchall()
+    
+    def _spill(self) -> None:
+        """Pindahkan seluruh tabel ke SQLite, state disimpan sebagai repr kanonik"""
+        fd, self._db_path = tempfile.mkstemp(suffix='.db', dir=self.spill_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE visited (id INTEGER PRIMARY KEY, hash INTEGER NOT NULL, "
+                         "parent INTEGER NOT NULL, action INTEGER NOT NULL, state TEXT NOT NULL)")
+        hashes = {}
+        for state_hash, node in self._index.items():
+            for node_id in (node if isinstance(node, list) else (node,)):
+                hashes[node_id] = _signed(state_hash)
+        self._db.executemany("INSERT INTO visited VALUES (?, ?, ?, ?, ?)",
+                             ((node_id, hashes[node_id], parent, action, repr(state))
+                              for node_id, (parent, action, state) in enumerate(self._rows)))
+        self._db.execute("CREATE INDEX visited_hash ON visited (hash)")
+        self.spilled = len(self._rows)
+        self._index = {}
+        self._rows = []
+    
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.remove(self._db_path)
+
+
+def _signed(value: int) -> int:
+    """Hash 64-bit tanpa tanda -> INTEGER SQLite (64-bit bertanda)"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class ExplorationReport:
+    """Hasil eksplorasi"""
+    
+    def __init__(self, case: Case):
+        self.case_id = case.id
+        self.ending_ids = [ending.id for ending in case.endings]
+        self.states = 0
+        self.transitions = 0
+        self.depth = 0
+        self.truncated = False
+        self.spilled = 0
+        self.visited_spilled = 0
+        self.hash_collisions = 0
+        self.endings: Dict[str, List[str]] = OrderedDict()  # ending_id -> urutan aksi terpendek
+        self.dead_ends: List[List[str]] = []  # Jalur ke state tanpa aksi yang mengubah state
+        self.dead_end_count = 0
+    
+    @property
+    def unreachable_endings(self) -> List[str]:
+        return [ending_id for ending_id in self.ending_ids if ending_id not in self.endings]
+    
+    def to_dict(self) -> Dict:
+        return {
+            'case_id': self.case_id,
+            'states': self.states,
+            'transitions': self.transitions,
+            'depth': self.depth,
+            'truncated': self.truncated,
+            'spilled_states': self.spilled,
+            'visited_spilled': self.visited_spilled,
+            'hash_collisions': self.hash_collisions,
+            'reachable_endings': {ending_id: path for ending_id, path in self.endings.items()},
+            'unreachable_endings': self.unreachable_endings,
+            'dead_ends': self.dead_end_count,
+            'dead_end_examples': self.dead_ends
+        }
+    
+    def format_text(self) -> str:
+        lines = [f"Kasus {self.case_id}: {self.states} state, {self.transitions} transisi, kedalaman {self.depth}"]
+        if self.truncated:
+            lines.append("⚠ Eksplorasi dihentikan karena mencapai batas state")
+        if self.hash_collisions:
+            lines.append(f"Tabrakan hash Zobrist: {self.hash_collisions} (state tetap dibedakan)")
+        lines += ["", "ENDING TERCAPAI (jalur terpendek):"]
+        for ending_id, path in self.endings.items():
+            lines.append(f"  {ending_id} ({len(path)} aksi): {' -> '.join(path)}")
+        lines += ["", "ENDING TIDAK TERCAPAI:"]
+        lines += [f"  {ending_id}" for ending_id in self.unreachable_endings] or ["  (tidak ada)"]
+        lines += ["", f"DEAD END: {self.dead_end_count} state"]
+        for path in self.dead_ends:
+            lines.append(f"  {' -> '.join(path) or '(awal)'}")
+        return "\n".join(lines)
+
+
+# ========== Worker ==========
+
+_worker_model: Optional[TransitionModel] = None
+
+
+def _init_worker(case: Case) -> None:
+    global _worker_model
+    _worker_model = TransitionModel(case)
+
+
+def _expand(model: TransitionModel, item: Tuple[int, int, State]) -> Tuple[int, List[Tuple[str, str, Any, int]]]:
+    """Ekspansi satu state (id node, hash, state): (id node, [(aksi, jenis, hasil, hash hasil), ...])"""
+    node_id, state_hash, state = item
+    expanded = []
+    for action, (kind, outcome) in model.successors(state):
+        if kind == 'state':
+            if outcome == state:
+                continue  # Aksi tanpa efek
+            expanded.append((action, kind, outcome, model.hasher.update(state_hash, state, outcome)))
+        else:
+            expanded.append((action, kind, outcome, 0))
+    return node_id, expanded
+
+
+def _expand_chunk(chunk: List[Tuple[int, State]]) -> List:
+    return [_expand(_worker_model, item) for item in chunk]
+
+
+# ========== BFS ==========
+
+def explore(case: Case, max_states: int = 5000000, workers: int = 1, memory_limit: int = 200000,
+            spill_dir: Optional[str] = None, max_dead_end_examples: int = 10,
+            visited_memory_limit: int = 1000000) -> ExplorationReport:
+    """
+    BFS lengkap dari state awal
+    Tabel visited (VisitedTable) menyimpan id node -> (id induk, aksi) untuk merekonstruksi
+    jalur terpendek. Memori dibatasi memory_limit item frontier per lapis (x2) ditambah
+    visited_memory_limit state visited; selebihnya ditulis ke spill_dir
+    """
+    model = TransitionModel(case)
+    report = ExplorationReport(case)
+    actions: List[str] = []  # Aksi di-intern, visited menyimpan indeksnya
+    action_index: Dict[str, int] = {}
+    
+    kind, start = model.initial()
+    if kind == 'ending':
+        report.endings[start] = []
+        report.states = 0
+        return report
+    start_hash = model.hasher.full(start)
+    visited = VisitedTable(visited_memory_limit, spill_dir)
+    start_id = visited.add(start_hash, start, 0, -1)
+    
+    def path_to(node_id: int, last_action: Optional[str] = None) -> List[str]:
+        path = [last_action] if last_action else []
+        while True:
+            parent, action = visited.parent(node_id)
+            if action < 0:
+                break
+            path.append(actions[action])
+            node_id = parent
+        path.reverse()
+        return path
+    
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(case,))
+    
+    frontier = Frontier(memory_limit, spill_dir)
+    frontier.append((start_id, start_hash, start))
+    try:
+        while frontier.size:
+            next_frontier = Frontier(memory_limit, spill_dir)
+            for node_id, expanded in _expand_layer(model, frontier, pool, workers):
+                if not expanded:
+                    report.dead_end_count += 1
+                    if len(report.dead_ends) < max_dead_end_examples:
+                        report.dead_ends.append(path_to(node_id))
+                for action, kind, outcome, child_hash in expanded:
+                    report.transitions += 1
+                    if kind == 'ending':
+                        if outcome not in report.endings:
+                            report.endings[outcome] = path_to(node_id, action)
+                        continue
+                    index = action_index.get(action)
+                    if index is None:
+                        index = action_index[action] = len(actions)
+                        actions.append(action)
+                    if len(visited) >= max_states:
+                        if not visited.seen(child_hash, outcome):
+                            report.truncated = True
+                        continue
+                    child_id = visited.add(child_hash, outcome, node_id, index)
+                    if child_id is not None:
+                        next_frontier.append((child_id, child_hash, outcome))
+            report.spilled += frontier.spilled
+            frontier.close()
+            frontier = next_frontier
+            if frontier.size:
+                report.depth += 1
+        report.states = len(visited)
+        report.visited_spilled = visited.spilled
+        report.hash_collisions = visited.collisions
+    finally:
+        frontier.close()
+        visited.close()
+        if pool is not None:
+            pool.shutdown()
+    return report
+
+
+def _expand_layer(model: TransitionModel, frontier: Frontier, pool, workers: int) -> Iterator:
+    """Ekspansi satu lapis BFS, paralel per chunk jika ada pool"""
+    if pool is None:
+        for item in frontier:
+            yield _expand(model, item)
+        return
+    
+    chunk_size = max(64, min(4096, frontier.size // (workers * 4) or 1))
+    chunk: List = []
+    pending = []
+    for item in frontier:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            pending.append(pool.submit(_expand_chunk, chunk))
+            chunk = []
+            # Batasi chunk yang sedang diproses agar memori tetap terbatas
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+    if chunk:
+        pending.append(pool.submit(_expand_chunk, chunk))
+    for future in pending:
+        yield from future.result()
@@ -3,144 +3,171 @@ StoryManager - Pengelola narasi dan dialog
 Mengatur flow cerita, menampilkan narasi, dan menangani pilihan pemain
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from core.case_model import Case, Character, Clue, Conditions, Dialogue, Location, Scene
+from systems.condition_checker import as_condition_state, compile_condition
+
+
+class LocationView:
+    """Isi lokasi untuk satu state pemain: NPC yang muncul, exit, dan scene yang tersedia"""
+    
+    __slots__ = ('location', 'npcs', 'exits', 'scenes')
+    
+    def __init__(self, location: Location, npcs: Tuple[Character, ...], scenes: Tuple[Scene, ...]):
+        self.location = location
+        self.npcs = npcs
+        self.exits = location.exits  # ((location_id, label), ...)
+        self.scenes = scenes
 
 
 class StoryManager:
     """Pengelola cerita bercabang"""
     
-    def __init__(self, case_data: Dict):
-        self.case_data = case_data
+    def __init__(self, case: Case):
+        self.case = case
         self.visited_scenes = set()
-        
+        # Tampilan lokasi terakhir, kunci (game_manager, lokasi, state_version)
+        self._view_key: Optional[Tuple[Any, str, int]] = None
+        self._view: Optional[LocationView] = None
+    
+    def get_location_data(self, location_id: str) -> Optional[Location]:
+        """Ambil data lokasi"""
+        return self.case.locations.get(location_id)
+    
     def get_location_description(self, location_id: str) -> str:
         """Ambil deskripsi lokasi"""
-        location = self.case_data['locations'].get(location_id, {})
-        return location.get('description', 'Lokasi tidak dikenal')
+        location = self.case.locations.get(location_id)
+        return location.description if location else 'Lokasi tidak dikenal'
     
-    def get_scene(self, scene_id: str, flags: Dict = None) -> Optional[Dict]:
+    def get_scene(self, scene_id: str, flags: Dict = None) -> Optional[Scene]:
         """Ambil data scene dengan cek kondisi"""
         if flags is None:
             flags = {}
         
-        scenes = self.case_data.get('scenes', {})
-        scene = scenes.get(scene_id)
+        scene = self.case.scenes.get(scene_id)
         
         if not scene:
             return None
         
         # Cek apakah scene sesuai kondisi flags
-        conditions = scene.get('conditions', {})
-        if conditions and not self._check_conditions(conditions, flags):
+        if scene.conditions and not self._check_conditions(scene.conditions, flags):
             return None
         
         return scene
     
-    def get_location_scenes(self, location_id: str, flags: Dict = None) -> List[Dict]:
+    def get_location_scenes(self, location_id: str, flags: Dict = None) -> List[Scene]:
         """Ambil semua scene di lokasi tertentu"""
         if flags is None:
             flags = {}
         
-        location = self.case_data['locations'].get(location_id, {})
-        scenes = location.get('scenes', [])
+        location = self.case.locations.get(location_id)
+        if not location:
+            return []
         
         available_scenes = []
-        for scene_id in scenes:
+        for scene_id in location.scenes:
             scene = self.get_scene(scene_id, flags)
             if scene:
-                available_scenes.append({
-                    'id': scene_id,
-                    'title': scene.get('title', scene_id),
-                    'type': scene.get('type', 'dialogue'),
-                    'description': scene.get('description', '')
-                })
+                available_scenes.append(scene)
         
         return available_scenes
     
-    def get_npcs_at_location(self, location_id: str, flags: Dict = None) -> List[Dict]:
+    def get_npcs_at_location(self, location_id: str, flags: Dict = None) -> List[Character]:
         """Ambil daftar NPC di lokasi"""
         if flags is None:
             flags = {}
         
-        location = self.case_data['locations'].get(location_id, {})
-        npcs = location.get('npcs', [])
+        location = self.case.locations.get(location_id)
+        if not location:
+            return []
         
+        characters = self.case.characters
         available_npcs = []
-        for npc_id in npcs:
-            npc = self.case_data.get('characters', {}).get(npc_id)
-            if npc and self._check_conditions(npc.get('conditions', {}), flags):
-                available_npcs.append({
-                    'id': npc_id,
-                    'name': npc.get('name', npc_id),
-                    'role': npc.get('role', 'Unknown')
-                })
+        for npc_id in location.npcs:
+            npc = characters[npc_id]
+            if self._check_conditions(npc.conditions, flags):
+                available_npcs.append(npc)
         
         return available_npcs
     
-    def get_dialogue(self, npc_id: str, dialogue_id: str, flags: Dict = None) -> Optional[Dict]:
+    def get_location_view(self, game_manager) -> Optional[LocationView]:
+        """
+        Tampilan lokasi pemain saat ini (None jika lokasi tidak dikenal)
+        Kondisi NPC/scene hanya dicek ulang jika lokasi atau state_version berubah,
+        jadi objek yang sama dikembalikan selama state tidak berubah
+        """
+        key = (game_manager, game_manager.current_location, game_manager.state_version)
+        if self._view_key == key:
+            return self._view
+        
+        location = self.case.locations.get(key[1])
+        if location is None:
+            return None
+        flags = game_manager.player_flags
+        view = LocationView(location, tuple(self.get_npcs_at_location(location.id, flags)),
+                            tuple(self.get_location_scenes(location.id, flags)))
+        self._view_key = key
+        self._view = view
+        return view
+    
+    def get_dialogue(self, npc_id: str, dialogue_id: str, flags: Dict = None) -> Optional[Dialogue]:
         """Ambil dialog dari NPC"""
         if flags is None:
             flags = {}
         
-        npcs = self.case_data.get('characters', {})
-        npc = npcs.get(npc_id)
+        npc = self.case.characters.get(npc_id)
         
         if not npc:
             return None
         
-        dialogues = npc.get('dialogues', {})
-        dialogue = dialogues.get(dialogue_id)
+        dialogue = npc.dialogues.get(dialogue_id)
         
         if not dialogue:
             return None
         
         # Cek kondisi
-        if not self._check_conditions(dialogue.get('conditions', {}), flags):
+        if not self._check_conditions(dialogue.conditions, flags):
             return None
         
         return dialogue
     
-    def get_available_dialogues(self, npc_id: str, flags: Dict = None) -> List[Dict]:
+    def get_available_dialogues(self, npc_id: str, flags: Dict = None) -> List[Dialogue]:
         """Ambil dialog yang bisa diakses dari NPC"""
         if flags is None:
             flags = {}
         
-        npcs = self.case_data.get('characters', {})
-        npc = npcs.get(npc_id)
+        npc = self.case.characters.get(npc_id)
         
         if not npc:
             return []
         
         available = []
-        dialogues = npc.get('dialogues', {})
-        
-        for dialogue_id, dialogue_data in dialogues.items():
-            if self._check_conditions(dialogue_data.get('conditions', {}), flags):
-                available.append({
-                    'id': dialogue_id,
-                    'text': dialogue_data.get('text', dialogue_id),
-                    'question': dialogue_data.get('question', None)
-                })
+        for dialogue in npc.dialogues.values():
+            if self._check_conditions(dialogue.conditions, flags):
+                available.append(dialogue)
         
         return available
     
-    def get_clue_unlock_info(self, clue_id: str) -> Optional[Dict]:
-        """Ambil info soal/syarat unlock clue"""
-        clues = self.case_data.get('clues', {})
-        clue = clues.get(clue_id)
-        
-        if not clue:
-            return None
-        
-        unlock_requirement = clue.get('unlock_requirement', {})
-        return unlock_requirement
+    def get_clue_unlock_info(self, clue_id: str) -> Optional[Clue]:
+        """Ambil info soal/syarat unlock clue (unlock_question, requires_evidence)"""
+        return self.case.clues.get(clue_id)
+    
+    def get_clue_sources(self, clue_id: str) -> Tuple[str, ...]:
+        """Path outcome (dialog/soal) yang memberikan clue"""
+        return self.case.index.clue_sources.get(clue_id, ())
+    
+    def get_clue_endings(self, clue_id: str) -> Tuple[str, ...]:
+        """Id ending yang mensyaratkan clue"""
+        return self.case.index.clue_endings.get(clue_id, ())
+    
+    def get_location_neighbors(self, location_id: str) -> Tuple[str, ...]:
+        """Id lokasi tujuan exit dari lokasi tertentu"""
+        return self.case.index.location_neighbors.get(location_id, ())
     
-    def _check_conditions(self, conditions: Dict, flags: Dict) -> bool:
-        """Cek apakah kondisi terpenuhi"""
-        for flag_name, expected_value in conditions.items():
-            if flags.get(flag_name) != expected_value:
-                return False
-        return True
+    def _check_conditions(self, conditions: Conditions, flags: Dict) -> bool:
+        """Cek apakah kondisi terpenuhi (closure hasil compile, di-cache per kondisi)"""
+        return compile_condition(conditions)(as_condition_state(flags))
     
     def mark_scene_visited(self, scene_id: str) -> None:
         """Tandai scene sudah dikunjungi"""
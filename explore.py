@@ -0,0 +1,51 @@
+"""
+Explore - Eksplorasi lengkap state kasus untuk content designer
+Melaporkan ending yang tidak bisa dicapai, dead end, dan urutan aksi
+terpendek ke setiap ending
+
+Contoh: python explore.py case_01 --workers 4
+"""
+
+import argparse
+import json
+import time
+
+from core.case_registry import CaseRegistry, default_case_registry
+from core.case_store import open_case_store
+from core.state_explorer import explore
+
+
+def main():
+    """Entry point eksplorasi"""
+    parser = argparse.ArgumentParser(description="Eksplorasi state kasus Detektif Pengetahuan")
+    parser.add_argument('case_id', nargs='?', default='case_01')
+    parser.add_argument('--max-states', type=int, default=5000000)
+    parser.add_argument('--workers', type=int, default=1, help="Jumlah proses untuk ekspansi BFS")
+    parser.add_argument('--memory-limit', type=int, default=200000,
+                        help="State frontier di memori sebelum ditulis ke disk")
+    parser.add_argument('--visited-memory-limit', type=int, default=1000000,
+                        help="State visited di memori sebelum tabel dipindah ke SQLite sementara")
+    parser.add_argument('--spill-dir', help="Direktori file sementara frontier dan tabel visited")
+    parser.add_argument('--store', help="Direktori kasus, pack .zip, atau database .db")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+    
+    registry = CaseRegistry(open_case_store(args.store)) if args.store else default_case_registry
+    case = registry.load_case(args.case_id)
+    
+    started = time.perf_counter()
+    report = explore(case, args.max_states, args.workers, args.memory_limit, args.spill_dir,
+                     visited_memory_limit=args.visited_memory_limit)
+    elapsed = time.perf_counter() - started
+    
+    if args.json:
+        data = report.to_dict()
+        data['seconds'] = elapsed
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(report.format_text())
+        print(f"\nSelesai dalam {elapsed:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
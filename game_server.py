@@ -0,0 +1,408 @@
+"""
+GameServer - Server TCP multi-sesi (gaya telnet)
+Satu event loop asyncio melayani banyak pemain sekaligus, masing-masing dengan
+SessionEngine sendiri. Tampilan sama dengan terminal karena memakai ui/screen_flow
+
+Jalankan: python game_server.py [--host 127.0.0.1] [--port 4000] [--sessions sesi.db]
+         [--journal-dir journal/] [sumber kasus]
+Coba: telnet 127.0.0.1 4000  (atau nc 127.0.0.1 4000)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import re
+import secrets
+import sys
+from typing import Any, Dict, Optional
+
+from core.case_registry import CaseRegistry, default_case_registry
+from core.case_store import open_case_store
+from core.math_generator import available as math_generator_available, prefill_pools
+from core.save_format import SaveFormatError
+from core.session_engine import SessionEngine
+from core.session_journal import JournalError, SessionJournal
+from core.session_store import SessionStore
+from ui import screen_flow
+from ui.game_ui import GameUI, output_to, ui_print
+
+
+# Negosiasi telnet (IAC ...) yang dikirim sebagian klien, dibuang dari input
+_TELNET_COMMAND = re.compile(rb'\xff[\xfb-\xfe].|\xff[\xf0-\xfa]', re.DOTALL)
+
+
+class ClientDisconnected(Exception):
+    """Koneksi klien putus, timeout, atau terlalu lambat"""
+    pass
+
+
+def session_key(name: str, code: str) -> str:
+    """Kunci SessionStore: nama pemain + kode sesi acak (nama saja bisa ditebak pemain lain)"""
+    return f"{name}#{code.strip().lower()}"
+
+
+class ClientConnection:
+    """Satu pemain yang terhubung: menjalankan menu dan sesi game lewat socket"""
+    
+    def __init__(self, server: 'GameServer', reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.engine = SessionEngine(server.case_registry)
+        self.player_name: Optional[str] = None
+        self.session_id: Optional[str] = None  # Kunci save (session_key) jika server memakai SessionStore
+        self.journal: Optional[SessionJournal] = None  # Journal giliran sesi ini (jika server memakai journal_dir)
+        self.task: Optional[asyncio.Task] = None
+        self._output = io.StringIO()  # Output UI koneksi ini yang belum dikirim
+        
+        # Backpressure: drain() menunggu jika buffer kirim melewati batas ini
+        writer.transport.set_write_buffer_limits(high=server.write_buffer_high)
+    
+    # ========== I/O ==========
+    
+    async def flush(self, prompt: str = '') -> None:
+        """Kirim output yang tertampung + prompt dalam satu write"""
+        text = self._output.getvalue() + prompt
+        self._output.seek(0)
+        self._output.truncate()
+        if not text:
+            return
+        
+        # Klien yang tidak membaca output tidak boleh menumpuk memori server
+        transport = self.writer.transport
+        if transport.is_closing():
+            raise ClientDisconnected("koneksi ditutup")
+        if transport.get_write_buffer_size() > self.server.max_pending_output:
+            raise ClientDisconnected("klien terlalu lambat")
+        
+        self.writer.write(text.replace('\r\n', '\n').replace('\n', '\r\n').encode('utf-8'))
+        try:
+            await asyncio.wait_for(self.writer.drain(), self.server.write_timeout)
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            raise ClientDisconnected(f"gagal kirim output: {e}")
+    
+    async def read_line(self) -> str:
+        """Baca satu baris input, dengan idle timeout"""
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.server.idle_timeout)
+        except asyncio.TimeoutError:
+            self.write(f"\n{GameUI.Colors.YELLOW}⚠ Sesi ditutup karena tidak ada aktivitas.{GameUI.Colors.ENDC}\n")
+            await self.flush()
+            raise ClientDisconnected("idle timeout")
+        except (ValueError, asyncio.LimitOverrunError, ConnectionError) as e:
+            raise ClientDisconnected(f"input tidak valid: {e}")
+        
+        if not line:
+            raise ClientDisconnected("EOF")
+        return _TELNET_COMMAND.sub(b'', line).decode('utf-8', errors='replace').rstrip('\r\n')
+    
+    def write(self, text: str) -> None:
+        self._output.write(text)
+    
+    async def run_flow(self, flow: screen_flow.Flow) -> Any:
+        """Jalankan flow UI: output ke buffer koneksi (lihat serve), input dari socket"""
+        try:
+            prompt = next(flow)
+            while True:
+                await self.flush(prompt)
+                reply = await self.read_line()
+                prompt = flow.send(reply)
+        except StopIteration as stop:
+            return stop.value
+    
+    # ========== Journal ==========
+    
+    def journal_path(self) -> Optional[str]:
+        """File journal sesi ini, None jika server tidak memakai journal"""
+        if self.server.journal_dir is None or not self.session_id:
+            return None
+        name = hashlib.sha256(self.session_id.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.server.journal_dir, f"{name}.dpsj")
+    
+    def open_existing_journal(self) -> bool:
+        """Buka journal sesi yang sudah ada, return True jika ada record untuk di-replay"""
+        path = self.journal_path()
+        if path is None or not os.path.exists(path):
+            return False
+        self.journal = SessionJournal(path)
+        return not self.journal.empty
+    
+    async def record(self, response: Dict) -> None:
+        """Catat hasil satu perintah ke journal (dibuka saat giliran pertama)"""
+        path = self.journal_path()
+        if path is None:
+            return
+        if self.journal is None:
+            self.journal = await asyncio.to_thread(SessionJournal, path)
+        await asyncio.to_thread(self.journal.record, self.engine, response)
+    
+    async def start_journal_from_save(self) -> None:
+        """Journal baru diawali snapshot sesi yang baru dimuat, agar giliran berikutnya bisa di-replay"""
+        path = self.journal_path()
+        if path is None or self.engine.game_manager.case is None:
+            return
+        self.discard_journal()
+        self.journal = await asyncio.to_thread(SessionJournal, path)
+        await asyncio.to_thread(self.journal.compact, self.engine.save())
+    
+    def discard_journal(self) -> None:
+        """Hapus journal sesi (selesai atau dimulai ulang)"""
+        if self.journal is not None:
+            self.journal.discard()
+            self.journal = None
+        else:
+            path = self.journal_path()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+    
+    # ========== Alur sesi (sama dengan GameLoop) ==========
+    
+    async def serve(self) -> None:
+        """
+        (Lanjutkan sesi tersimpan) -> main menu -> pilih kasus -> main sampai selesai
+        Output UI diarahkan ke buffer koneksi lewat context task ini saja, jadi print
+        dari task/thread lain (refill pool soal, penulis sesi, log) tidak ikut terkirim
+        """
+        with output_to(self._output):
+            await self._serve()
+    
+    async def _serve(self) -> None:
+        if self.server.session_store is not None and await self.resume():
+            await self.play()
+            await self.goodbye()
+            return
+        
+        while True:
+            choice = await self.run_flow(screen_flow.main_menu())
+            
+            if choice == "1":
+                # Scan store dan muat kasus bisa membaca disk: jangan blok sesi lain di event loop
+                cases = await asyncio.to_thread(self.server.case_registry.list_cases)
+                case_id = await self.run_flow(screen_flow.choose_case(cases))
+                if case_id:
+                    response = await asyncio.to_thread(self.engine.start, case_id)
+                    screen_flow.print_events(response['events'])
+                    await self.record(response)
+                    await self.play()
+                    break
+            elif choice == "2":
+                await self.run_flow(screen_flow.about())
+            elif choice == "3":
+                break
+        
+        await self.goodbye()
+    
+    async def goodbye(self) -> None:
+        GameUI.clear_screen()
+        ui_print(f"\n{GameUI.Colors.CYAN}Terima kasih telah bermain Detektif Pengetahuan!{GameUI.Colors.ENDC}\n")
+        await self.flush()
+    
+    async def resume(self) -> bool:
+        """
+        Tanya nama pemain dan kode sesi, tawarkan lanjut jika ada sesi tersimpan
+        Save hanya bisa dibuka dengan kode yang diberikan saat sesi dibuat, dan satu nama
+        hanya boleh dipakai satu koneksi aktif agar save tidak saling menimpa.
+        Jika ada journal, sesi dibangun ulang dari journal (lebih baru dari save yang ditulis batch)
+        """
+        store = self.server.session_store
+        while self.player_name is None:
+            name = await self.run_flow(screen_flow.text_input("Nama detektif: "))
+            if not name:
+                continue
+            if not self.server.claim_name(name, self):
+                GameUI.print_error("Nama ini sedang dipakai pemain lain yang terhubung. Gunakan nama lain.")
+                continue
+            self.player_name = name
+        
+        data = None
+        has_journal = False
+        code = await self.run_flow(screen_flow.text_input("Kode sesi (kosongkan untuk sesi baru): "))
+        if code:
+            self.session_id = session_key(self.player_name, code)
+            data = await asyncio.to_thread(store.get, self.session_id)
+            try:
+                has_journal = await asyncio.to_thread(self.open_existing_journal)
+            except JournalError as e:
+                GameUI.print_error(f"Journal sesi tidak bisa dibuka: {e}")
+                self.discard_journal()
+            if data is None and not has_journal:
+                GameUI.print_warning("Sesi dengan nama dan kode ini tidak ditemukan, sesi baru dibuat.")
+        if data is None and not has_journal:
+            code = secrets.token_hex(4)
+            self.session_id = session_key(self.player_name, code)
+            GameUI.print_success(f"Kode sesi Anda: {code} (catat untuk melanjutkan permainan nanti)")
+            return False
+        
+        if not await self.run_flow(screen_flow.confirm("Lanjutkan penyelidikan sebelumnya?")):
+            self.discard_journal()
+            return False
+        try:
+            # Decode save / replay journal memuat kasus dari store (disk)
+            if has_journal:
+                response = await asyncio.to_thread(self.journal.replay, self.engine)
+            else:
+                response = await asyncio.to_thread(self.engine.load, data)
+                await self.start_journal_from_save()
+        except SaveFormatError as e:
+            GameUI.print_error(f"Sesi tersimpan tidak bisa dibuka: {e}")
+            store.delete(self.session_id)
+            self.discard_journal()
+            return False
+        screen_flow.print_events(response['events'])
+        return self.engine.screen['type'] != 'idle'
+    
+    async def play(self) -> None:
+        """Loop permainan: layar engine -> flow -> perintah"""
+        store = self.server.session_store
+        while not self.engine.finished and self.engine.screen['type'] != 'idle':
+            action, arg = await self.run_flow(screen_flow.screen_flow(self.engine.screen))
+            response = self.engine.handle(action, arg)
+            screen_flow.print_events(response['events'])
+            
+            # Simpan setiap giliran (save write-behind + journal per giliran)
+            # Kasus yang sudah mencapai ending tidak dilanjutkan lagi, save dan journal-nya dihapus
+            if store is not None and self.session_id:
+                if self.engine.finished or self.engine.screen['type'] == 'ending':
+                    store.delete(self.session_id)
+                    self.discard_journal()
+                elif self.engine.game_manager.case is not None:
+                    store.save_engine(self.session_id, self.engine)
+                    await self.record(response)
+    
+    async def close(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        try:
+            self.writer.close()
+            await asyncio.wait_for(self.writer.wait_closed(), 1.0)
+        except (asyncio.TimeoutError, ConnectionError, OSError):
+            pass
+
+
+class GameServer:
+    """Server asyncio yang menampung banyak sesi dalam satu proses"""
+    
+    def __init__(self, case_registry: Optional[CaseRegistry] = None,
+                 session_store: Optional[SessionStore] = None, host: str = '127.0.0.1', port: int = 4000,
+                 journal_dir: Optional[str] = None,
+                 max_sessions: int = 500, idle_timeout: float = 900.0,
+                 write_timeout: float = 30.0, write_buffer_high: int = 64 * 1024,
+                 max_pending_output: int = 1024 * 1024, max_line: int = 4096):
+        # Satu registry (dan cache kasus) untuk semua sesi
+        self.case_registry = case_registry or default_case_registry
+        self.session_store = session_store  # None = sesi tidak disimpan
+        self.journal_dir = journal_dir  # Journal per sesi untuk pemulihan crash (butuh session_store)
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.write_timeout = write_timeout
+        self.write_buffer_high = write_buffer_high
+        self.max_pending_output = max_pending_output
+        self.max_line = max_line
+        self.connections = set()
+        self.player_names: Dict[str, ClientConnection] = {}  # Nama (casefold) -> koneksi aktif
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self) -> None:
+        if math_generator_available():
+            prefill_pools()  # Pool soal checkpoint disiapkan sebelum sesi pertama masuk
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, limit=self.max_line
+        )
+        sockets = self._server.sockets or []
+        if sockets:
+            # Port 0 = pilih port bebas (berguna untuk testing)
+            self.port = sockets[0].getsockname()[1]
+    
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        print(f"🔍 Server Detektif Pengetahuan berjalan di {self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Tutup socket lalu tunggu setiap sesi selesai sendiri (readline -> EOF)
+        connections = list(self.connections)
+        for connection in connections:
+            connection.writer.close()
+        await asyncio.gather(*(c.task for c in connections if c.task), return_exceptions=True)
+    
+    def claim_name(self, name: str, connection: ClientConnection) -> bool:
+        """Pakai nama untuk koneksi ini, False jika sedang dipakai koneksi aktif lain"""
+        holder = self.player_names.setdefault(name.casefold(), connection)
+        return holder is connection
+    
+    def release_name(self, connection: ClientConnection) -> None:
+        if connection.player_name is not None:
+            key = connection.player_name.casefold()
+            if self.player_names.get(key) is connection:
+                del self.player_names[key]
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self.connections) >= self.max_sessions:
+            writer.write("Server penuh, coba lagi nanti.\r\n".encode('utf-8'))
+            try:
+                await asyncio.wait_for(writer.drain(), 1.0)
+            except (asyncio.TimeoutError, ConnectionError):
+                pass
+            writer.close()
+            return
+        
+        connection = ClientConnection(self, reader, writer)
+        connection.task = asyncio.current_task()
+        self.connections.add(connection)
+        try:
+            await connection.serve()
+        except ClientDisconnected:
+            pass
+        except Exception as e:
+            # Error satu sesi tidak boleh menjatuhkan sesi lain
+            print(f"✗ Error sesi {connection.peer}: {e}", file=sys.stderr)
+        finally:
+            self.connections.discard(connection)
+            self.release_name(connection)
+            await connection.close()
+
+
+def main():
+    """Entry point server"""
+    parser = argparse.ArgumentParser(description="Server multi-sesi Detektif Pengetahuan")
+    parser.add_argument('store', nargs='?', help="Direktori kasus, pack .zip, atau database .db")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4000)
+    parser.add_argument('--max-sessions', type=int, default=500)
+    parser.add_argument('--sessions', help="Database SQLite untuk menyimpan sesi (lanjut saat reconnect)")
+    parser.add_argument('--journal-dir', help="Direktori journal per sesi (pemulihan crash, butuh --sessions)")
+    parser.add_argument('--idle-timeout', type=float, default=900.0, help="Detik tanpa input sebelum sesi ditutup")
+    args = parser.parse_args()
+    if args.journal_dir and not args.sessions:
+        parser.error("--journal-dir membutuhkan --sessions")
+    if args.journal_dir:
+        os.makedirs(args.journal_dir, exist_ok=True)
+    
+    case_registry = CaseRegistry(open_case_store(args.store)) if args.store else None
+    session_store = SessionStore(args.sessions) if args.sessions else None
+    server = GameServer(case_registry, session_store, host=args.host, port=args.port,
+                        journal_dir=args.journal_dir, max_sessions=args.max_sessions,
+                        idle_timeout=args.idle_timeout)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer dihentikan.")
+    finally:
+        if session_store is not None:
+            session_store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Grade - Penilaian massal lembar jawaban kelas (CSV / JSONL)
+Setiap baris berisi student, question_id, answer; hasil berupa agregat
+per siswa dan per soal. File dibaca streaming sehingga jutaan baris aman
+
+Contoh: python grade.py kelas_3a.csv --case case_01 --graded hasil.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from core.batch_grader import BatchGrader, read_submissions
+from core.case_model import CaseSchemaError
+from core.case_registry import CaseRegistry, default_case_registry
+from core.case_store import open_case_store
+
+
+def main():
+    """Entry point penilaian"""
+    parser = argparse.ArgumentParser(description="Penilaian massal jawaban Detektif Pengetahuan")
+    parser.add_argument('files', nargs='+', help="File .csv / .jsonl ('-' = stdin)")
+    parser.add_argument('--case', dest='case_id', default='case_01', help="Kasus pemilik soal (default: case_01)")
+    parser.add_argument('--store', help="Direktori kasus, pack .zip, atau database .db")
+    parser.add_argument('--input-format', choices=('csv', 'jsonl'), help="Default: dari ekstensi file")
+    parser.add_argument('--graded', help="Tulis hasil per baris ke CSV ini (student, question_id, answer, correct)")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+    
+    registry = CaseRegistry(open_case_store(args.store)) if args.store else default_case_registry
+    try:
+        grader = BatchGrader.for_case(registry.load_case(args.case_id))
+    except FileNotFoundError as e:
+        sys.exit(f"Kasus {args.case_id}: {e}")
+    except CaseSchemaError as e:
+        sys.exit(f"Kasus {args.case_id} tidak valid: " + "; ".join(e.errors))
+    
+    started = time.perf_counter()
+    graded_file = open(args.graded, 'w', encoding='utf-8', newline='') if args.graded else None
+    try:
+        on_graded = None
+        if graded_file is not None:
+            writer = csv.writer(graded_file)
+            writer.writerow(('student', 'question_id', 'answer', 'correct'))
+            on_graded = lambda student, question_id, answer, correct: writer.writerow(
+                (student, question_id, answer, int(correct)))
+        
+        report = None
+        for path in args.files:
+            try:
+                report = grader.grade_rows(read_submissions(path, args.input_format), report, on_graded)
+            except (OSError, ValueError) as e:
+                sys.exit(f"{path}: {e}")
+    finally:
+        if graded_file is not None:
+            graded_file.close()
+    elapsed = time.perf_counter() - started
+    
+    if args.json:
+        data = report.to_dict()
+        data['seconds'] = elapsed
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(report.format_text())
+        print(f"\n{report.rows} baris dalam {elapsed:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
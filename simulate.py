@@ -0,0 +1,44 @@
+"""
+Simulate - Simulasi Monte Carlo untuk content designer
+Memainkan kasus ribuan kali dengan policy otomatis dan melaporkan distribusi
+ending, jumlah giliran sampai ending, dan jumlah bukti
+
+Contoh: python simulate.py case_01 --runs 100000 --policy greedy-evidence
+"""
+
+import argparse
+import json
+import time
+
+from core.simulator import POLICIES, simulate
+
+
+def main():
+    """Entry point simulasi"""
+    parser = argparse.ArgumentParser(description="Simulasi playthrough Detektif Pengetahuan")
+    parser.add_argument('case_id', nargs='?', default='case_01')
+    parser.add_argument('-n', '--runs', type=int, default=1000)
+    parser.add_argument('-p', '--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: jumlah CPU)")
+    parser.add_argument('--max-turns', type=int, default=200, help="Batas giliran per run")
+    parser.add_argument('--store', help="Direktori kasus, pack .zip, atau database .db")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    report = simulate(args.case_id, args.policy, args.runs, args.seed, args.workers,
+                      args.max_turns, args.store)
+    elapsed = time.perf_counter() - started
+    
+    if args.json:
+        data = report.to_dict()
+        data['seconds'] = elapsed
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    else:
+        print(report.format_text())
+        print(f"\n{report.runs} run dalam {elapsed:.2f} detik")
+
+
+if __name__ == "__main__":
+    main()
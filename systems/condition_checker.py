@@ -3,83 +3,363 @@ ConditionChecker - Evaluator untuk kondisi kompleks
 Mengecek flag, bukti, dan kondisi lainnya untuk determine story branch
 """
 
-from typing import Dict, Any, List, Optional, Callable
+import threading
+import weakref
+from typing import Dict, Any, Iterable, List, Optional, Callable
 
 
-class Condition:
+# Predicate hasil compile: fn(state) -> bool
+# state = objek dengan get_flag, has_evidence, get_evidence_count (mis. GameManager)
+Predicate = Callable[[Any], bool]
+
+
+def _always_true(state) -> bool:
+    return True
+
+
+def _always_false(state) -> bool:
+    return False
+
+
+# Dispatch table tipe kondisi -> factory(target, value) -> predicate
+CONDITION_HANDLERS: Dict[str, Callable[[str, Any], Predicate]] = {
+    "flag": lambda target, value: lambda state: state.get_flag(target) == value,
+    "flag_true": lambda target, value: lambda state: state.get_flag(target, False) is True,
+    "flag_false": lambda target, value: lambda state: state.get_flag(target, False) is False,
+    "evidence": lambda target, value: lambda state: state.has_evidence(target),
+    "no_evidence": lambda target, value: lambda state: not state.has_evidence(target),
+    "evidence_count_min": lambda target, value: lambda state: state.get_evidence_count() >= value,
+    "evidence_count_max": lambda target, value: lambda state: state.get_evidence_count() <= value,
+    "evidence_count_equal": lambda target, value: lambda state: state.get_evidence_count() == value,
+}
+
+
+def compile_simple(condition_type: str, target: str, value: Any = None) -> Predicate:
+    """Compile satu kondisi simple lewat dispatch table (tipe tidak dikenal = False)"""
+    factory = CONDITION_HANDLERS.get(condition_type)
+    return factory(target, value) if factory else _always_false
+
+
+def _combine(operator: str, predicates: List[Predicate]) -> Predicate:
+    """Gabungkan predicate dengan operator logika, short-circuit"""
+    predicates = tuple(predicates)
+    
+    if operator == "AND":
+        if not predicates:
+            return _always_true
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda state: all(p(state) for p in predicates)
+    
+    elif operator == "OR":
+        if not predicates:
+            return _always_false
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda state: any(p(state) for p in predicates)
+    
+    elif operator == "NOT":
+        # NOT = tidak semua kondisi terpenuhi
+        if not predicates:
+            return _always_true
+        return lambda state: not all(p(state) for p in predicates)
+    
+    return _always_false
+
+
+def _compile_flag_pairs(pairs) -> Predicate:
+    """Compile kondisi flag ((flag_name, value), ...) dari model kasus"""
+    pairs = tuple(pairs)
+    if not pairs:
+        return _always_true
+    if len(pairs) == 1:
+        flag_name, expected_value = pairs[0]
+        return lambda state: state.get_flag(flag_name) == expected_value
+    
+    def check(state) -> bool:
+        get_flag = state.get_flag
+        for flag_name, expected_value in pairs:
+            if get_flag(flag_name) != expected_value:
+                return False
+        return True
+    return check
+
+
+class FlagState:
+    """Adapter dict flag biasa menjadi state untuk predicate (tanpa bukti)"""
+    
+    __slots__ = ('flags',)
+    
+    def __init__(self, flags: Dict[str, Any]):
+        self.flags = flags
+    
+    def get_flag(self, flag_name: str, default: Any = None) -> Any:
+        return self.flags.get(flag_name, default)
+    
+    def has_evidence(self, evidence_id: str) -> bool:
+        return False
+    
+    def get_evidence_count(self) -> int:
+        return 0
+
+
+def as_condition_state(source: Any) -> Any:
+    """Ubah GameManager / player_flags / dict flag menjadi state untuk predicate"""
+    if source is None:
+        return FlagState({})
+    # player_flags (FlagView) -> GameManager pemiliknya, agar kondisi bukti ikut bisa dicek
+    manager = getattr(source, 'manager', None)
+    if manager is not None:
+        return manager
+    if hasattr(source, 'get_flag'):
+        return source
+    return FlagState(source)
+
+
+class _CompiledNode:
+    """
+    Basis node kondisi dengan closure ter-cache
+    Setiap perubahan field membuang closure node ini dan semua parent-nya,
+    jadi evaluasi berikutnya compile ulang hanya jalur yang berubah
+    """
+    
+    def __init__(self):
+        self._predicate: Optional[Predicate] = None
+        self._parents = weakref.WeakSet()  # ComplexCondition yang memuat node ini
+    
+    def _invalidate(self) -> None:
+        # Closure None = parent-nya juga sudah None (parent selalu compile anaknya),
+        # sekaligus mencegah loop pada pohon yang memuat dirinya sendiri
+        if self._predicate is None:
+            return
+        self._predicate = None
+        for parent in list(self._parents):
+            parent._invalidate()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Closure dan link parent tidak ikut di-copy/pickle, dibangun ulang saat dipakai
+        state = self.__dict__.copy()
+        state['_predicate'] = None
+        del state['_parents']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._parents = weakref.WeakSet()
+
+
+class Condition(_CompiledNode):
     """Representasi satu kondisi"""
     
     def __init__(self, condition_type: str, target: str, value: Any = None):
-        self.type = condition_type  # "flag", "evidence", "evidence_count", "flag_range"
-        self.target = target  # Nama flag atau evidence_id
-        self.value = value
-        
+        super().__init__()
+        self._type = condition_type  # "flag", "evidence", "evidence_count", "flag_range"
+        self._target = target  # Nama flag atau evidence_id
+        self._value = value
+    
+    @property
+    def type(self) -> str:
+        return self._type
+    
+    @type.setter
+    def type(self, condition_type: str) -> None:
+        self._type = condition_type
+        self._invalidate()
+    
+    @property
+    def target(self) -> str:
+        return self._target
+    
+    @target.setter
+    def target(self, target: str) -> None:
+        self._target = target
+        self._invalidate()
+    
+    @property
+    def value(self) -> Any:
+        return self._value
+    
+    @value.setter
+    def value(self, value: Any) -> None:
+        self._value = value
+        self._invalidate()
+    
+    def compile(self) -> Predicate:
+        """Compile kondisi menjadi closure (di-cache sampai field diubah)"""
+        if self._predicate is None:
+            self._predicate = compile_simple(self._type, self._target, self._value)
+        return self._predicate
+    
     def check(self, game_manager) -> bool:
         """Evaluasi kondisi"""
-        if self.type == "flag":
-            return game_manager.get_flag(self.target) == self.value
-        
-        elif self.type == "flag_true":
-            return game_manager.get_flag(self.target, False) is True
-        
-        elif self.type == "flag_false":
-            return game_manager.get_flag(self.target, False) is False
-        
-        elif self.type == "evidence":
-            return game_manager.has_evidence(self.target)
-        
-        elif self.type == "no_evidence":
-            return not game_manager.has_evidence(self.target)
-        
-        elif self.type == "evidence_count_min":
-            return game_manager.get_evidence_count() >= self.value
-        
-        elif self.type == "evidence_count_max":
-            return game_manager.get_evidence_count() <= self.value
-        
-        elif self.type == "evidence_count_equal":
-            return game_manager.get_evidence_count() == self.value
-        
-        return False
+        return self.compile()(game_manager)
 
 
-class ComplexCondition:
+class _ChildList(list):
+    """List anak ComplexCondition; setiap mutasi mendaftarkan parent dan membuang closure"""
+    
+    def __init__(self, owner: 'ComplexCondition', items: Iterable = ()):
+        super().__init__(items)
+        self._owner = owner
+    
+    def __reduce_ex__(self, protocol):
+        # Copy/pickle sebagai list biasa, ComplexCondition membungkus ulang saat restore
+        return list, (list(self),)
+
+
+def _child_list_mutator(name: str):
+    """Method list yang memberi tahu ComplexCondition pemilik setelah mutasi"""
+    method = getattr(list, name)
+    
+    def mutator(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._owner._children_changed()
+        return result
+    mutator.__name__ = name
+    return mutator
+
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(_ChildList, _name, _child_list_mutator(_name))
+
+
+class ComplexCondition(_CompiledNode):
     """Kondisi kompleks dengan logical operators"""
     
     def __init__(self, operator: str = "AND"):
-        self.operator = operator  # "AND", "OR", "NOT"
-        self.conditions: List[Condition] = []
-        self.sub_conditions: List['ComplexCondition'] = []
-        
+        super().__init__()
+        self._operator = operator  # "AND", "OR", "NOT"
+        self._conditions = _ChildList(self)
+        self._sub_conditions = _ChildList(self)
+    
+    @property
+    def operator(self) -> str:
+        return self._operator
+    
+    @operator.setter
+    def operator(self, operator: str) -> None:
+        self._operator = operator
+        self._invalidate()
+    
+    @property
+    def conditions(self) -> List[Condition]:
+        return self._conditions
+    
+    @conditions.setter
+    def conditions(self, conditions: List[Condition]) -> None:
+        self._conditions = _ChildList(self, conditions)
+        self._children_changed()
+    
+    @property
+    def sub_conditions(self) -> List['ComplexCondition']:
+        return self._sub_conditions
+    
+    @sub_conditions.setter
+    def sub_conditions(self, sub_conditions: List['ComplexCondition']) -> None:
+        self._sub_conditions = _ChildList(self, sub_conditions)
+        self._children_changed()
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        super().__setstate__(state)
+        self._conditions = _ChildList(self, self._conditions)
+        self._sub_conditions = _ChildList(self, self._sub_conditions)
+        for child in self._conditions + self._sub_conditions:
+            child._parents.add(self)
+    
+    def _children_changed(self) -> None:
+        for child in self._conditions + self._sub_conditions:
+            child._parents.add(self)
+        self._invalidate()
+    
     def add_condition(self, condition: Condition) -> None:
         """Tambah kondisi simple"""
-        self.conditions.append(condition)
+        self._conditions.append(condition)
     
     def add_complex_condition(self, complex_condition: 'ComplexCondition') -> None:
         """Tambah kondisi kompleks nested"""
-        self.sub_conditions.append(complex_condition)
+        self._sub_conditions.append(complex_condition)
+    
+    def compile(self) -> Predicate:
+        """
+        Compile pohon kondisi menjadi satu closure short-circuit
+        Compile ulang otomatis jika node mana pun di pohon diubah
+        """
+        if self._predicate is None:
+            predicates = [condition.compile() for condition in self._conditions]
+            predicates += [sub.compile() for sub in self._sub_conditions]
+            self._predicate = _combine(self._operator, predicates)
+        return self._predicate
     
     def evaluate(self, game_manager) -> bool:
         """Evaluasi kondisi kompleks"""
-        results = []
-        
-        # Evaluasi semua kondisi simple
-        for condition in self.conditions:
-            results.append(condition.check(game_manager))
-        
-        # Evaluasi semua sub-conditions
-        for sub in self.sub_conditions:
-            results.append(sub.evaluate(game_manager))
-        
-        # Apply operator
-        if self.operator == "AND":
-            return all(results) if results else True
-        elif self.operator == "OR":
-            return any(results) if results else False
-        elif self.operator == "NOT":
-            return not all(results) if results else True
+        return self.compile()(game_manager)
+
+
+class ConditionCompiler:
+    """
+    Compiler kondisi terpusat dengan cache berdasarkan identitas objek kondisi
+    Menerima: tuple kondisi flag dari model kasus, dict flag {nama: nilai},
+    dict JSON kondisi simple/kompleks, Condition, dan ComplexCondition
+    Hanya tuple (data kasus immutable) yang di-cache di sini; Condition/ComplexCondition
+    menyimpan closure sendiri, dict/list bisa berubah jadi selalu di-compile ulang
+    """
+    
+    def __init__(self, max_entries: int = 8192):
+        self.max_entries = max_entries
+        self._cache: Dict[int, tuple] = {}  # id(spec) -> (spec, predicate)
+        self._lock = threading.Lock()
+    
+    def compile(self, spec: Any, cache: bool = True) -> Predicate:
+        """
+        Ambil closure untuk satu kondisi, compile jika belum ada di cache
+        cache=False untuk memaksa compile ulang
+        """
+        if isinstance(spec, (Condition, ComplexCondition)):
+            return spec.compile()
+        if not cache or not isinstance(spec, tuple):
+            return self._compile(spec)
+        entry = self._cache.get(id(spec))
+        if entry is not None and entry[0] is spec:
+            return entry[1]
         
-        return False
+        predicate = self._compile(spec)
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                self._cache.clear()
+            # Spec ikut disimpan agar id() tidak dipakai ulang objek lain
+            self._cache[id(spec)] = (spec, predicate)
+        return predicate
+    
+    def check(self, spec: Any, source: Any) -> bool:
+        """Compile (cached) lalu evaluasi kondisi terhadap GameManager/flags"""
+        return self.compile(spec)(as_condition_state(source))
+    
+    def _compile(self, spec: Any) -> Predicate:
+        if spec is None:
+            return _always_true
+        if isinstance(spec, (Condition, ComplexCondition)):
+            return spec.compile()
+        if isinstance(spec, dict):
+            if 'operator' in spec or 'sub_conditions' in spec:
+                predicates = [self._compile(c) for c in spec.get('conditions', [])]
+                predicates += [self._compile(c) for c in spec.get('sub_conditions', [])]
+                return _combine(spec.get('operator', 'AND'), predicates)
+            if 'type' in spec and 'target' in spec:
+                return compile_simple(spec['type'], spec['target'], spec.get('value'))
+            # Dict flag biasa {nama_flag: nilai}
+            return _compile_flag_pairs(spec.items())
+        # Tuple/list kondisi flag dari model kasus
+        return _compile_flag_pairs(spec)
+
+
+# Compiler bersama untuk semua manager dalam proses
+default_condition_compiler = ConditionCompiler()
+
+
+def compile_condition(spec: Any) -> Predicate:
+    """Shortcut ke default_condition_compiler.compile"""
+    return default_condition_compiler.compile(spec)
 
 
 class ConditionChecker:
@@ -93,10 +373,7 @@ class ConditionChecker:
     @staticmethod
     def check_multiple_flags(game_manager, flags_dict: Dict[str, Any]) -> bool:
         """Cek apakah multiple flags sesuai dengan nilai yang diharapkan"""
-        for flag_name, expected_value in flags_dict.items():
-            if game_manager.get_flag(flag_name) != expected_value:
-                return False
-        return True
+        return default_condition_compiler.compile(flags_dict, cache=False)(game_manager)
     
     @staticmethod
     def check_any_flag(game_manager, flag_names: List[str]) -> bool:
@@ -151,7 +428,7 @@ class ConditionChecker:
     @staticmethod
     def check_scene_available(game_manager, scene_conditions: Dict) -> bool:
         """Cek apakah scene bisa diakses berdasarkan kondisi"""
-        return ConditionChecker.check_multiple_flags(game_manager, scene_conditions)
+        return default_condition_compiler.compile(scene_conditions, cache=False)(game_manager)
     
     @staticmethod
     def create_condition_from_dict(condition_dict: Dict) -> Condition:
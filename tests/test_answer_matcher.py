@@ -0,0 +1,111 @@
+"""
+Normalisasi dan pencocokan jawaban (core/answer_matcher)
+Jalankan: python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.answer_matcher import AnswerKey, normalize_answer, within_edits
+from core.case_model import EMPTY_OUTCOME, Question
+
+
+def question(correct, question_type='short_answer', accepted=(), synonyms=(), max_edits=None):
+    return Question('q_test', question_type, "Soal?", (), correct, '', EMPTY_OUTCOME, EMPTY_OUTCOME,
+                    accepted, synonyms, max_edits)
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class NormalizeTest(unittest.TestCase):
+    
+    def test_sign(self):
+        self.assertEqual(normalize_answer("-5"), "-5")
+        self.assertEqual(normalize_answer("−5"), "-5")
+        self.assertNotEqual(normalize_answer("-17 buku"), normalize_answer("17 buku"))
+        self.assertEqual(normalize_answer("Hasilnya: -3"), "hasilnya -3")
+    
+    def test_minus_between_digits(self):
+        self.assertEqual(normalize_answer("3-2"), "3 - 2")
+        self.assertEqual(normalize_answer("3 - 2"), normalize_answer("3-2"))
+        self.assertNotEqual(normalize_answer("3-2"), normalize_answer("3 2"))
+    
+    def test_decimals_and_thousands(self):
+        self.assertEqual(normalize_answer("2,5"), "2.5")
+        self.assertEqual(normalize_answer("-2,5"), "-2.5")
+        self.assertEqual(normalize_answer("1.000.000"), "1000000")
+        self.assertEqual(normalize_answer("Rp 12.500"), "rp 12500")
+    
+    def test_number_words(self):
+        self.assertEqual(normalize_answer("dua puluh tujuh"), "27")
+        self.assertEqual(normalize_answer("Sebelas buku"), "11 buku")
+        self.assertEqual(normalize_answer("seratus dua belas"), "112")
+        self.assertEqual(normalize_answer("tiga ribu lima ratus"), "3500")
+        self.assertEqual(normalize_answer("sejuta"), "1000000")
+        self.assertEqual(normalize_answer("dua tiga"), "2 3")
+        self.assertEqual(normalize_answer("puluh"), "puluh")
+    
+    def test_accents_and_punctuation(self):
+        self.assertEqual(normalize_answer("  Café,  RESTORAN! "), "cafe restoran")
+
+
+class WithinEditsTest(unittest.TestCase):
+    
+    def test_matches_levenshtein(self):
+        rng = random.Random(7)
+        for _ in range(3000):
+            a = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+            b = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 8)))
+            max_edits = rng.randint(0, 3)
+            self.assertEqual(within_edits(a, b, max_edits), levenshtein(a, b) <= max_edits, (a, b, max_edits))
+
+
+class AnswerKeyTest(unittest.TestCase):
+    
+    def test_sign_is_significant(self):
+        key = AnswerKey(question("17 buku"))
+        self.assertTrue(key.matches("tujuh belas buku"))
+        self.assertFalse(key.matches("-17 buku"))
+        self.assertTrue(AnswerKey(question("-5")).matches("-5"))
+        self.assertFalse(AnswerKey(question("-5")).matches("5"))
+    
+    def test_fuzzy_bounds(self):
+        key = AnswerKey(question("perpustakaan"))  # 12 huruf: toleransi 2
+        self.assertTrue(key.matches("perpustakan"))
+        self.assertTrue(key.matches("perpustkaan"))
+        self.assertTrue(key.matches("perpusstakan"))
+        self.assertFalse(key.matches("prpstakan"))
+        self.assertFalse(AnswerKey(question("buku")).matches("buka"))  # Jawaban pendek: tanpa toleransi
+        self.assertFalse(AnswerKey(question("perpustakaan", max_edits=0)).matches("perpustakan"))
+    
+    def test_fuzzy_never_changes_numbers(self):
+        key = AnswerKey(question("jumlahnya 1250 buku"))
+        self.assertTrue(key.matches("jumlahnya 1250 bukku"))
+        self.assertFalse(key.matches("jumlahnya 1251 buku"))
+        self.assertFalse(key.matches("jumlahnya -1250 buku"))
+    
+    def test_multiple_choice_is_exact(self):
+        key = AnswerKey(question("perpustakaan", question_type='multiple_choice'))
+        self.assertFalse(key.matches("perpustakan"))
+    
+    def test_accepted_and_synonyms(self):
+        key = AnswerKey(question("kepala perpustakaan", accepted=("pustakawan kepala",),
+                                 synonyms=(("kepala", ("ketua",)),)))
+        self.assertTrue(key.matches("Ketua Perpustakaan"))
+        self.assertTrue(key.matches("pustakawan kepala"))
+
+
+if __name__ == '__main__':
+    unittest.main()
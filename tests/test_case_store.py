@@ -0,0 +1,66 @@
+"""
+DirectoryCaseStore menolak id kasus yang keluar dari direktori store
+Jalankan: python -m unittest discover tests
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.case_cache import CaseCache
+from core.case_registry import CaseRegistry
+from core.case_store import DirectoryCaseStore, is_safe_case_id
+from core.session_engine import SessionEngine
+
+CASES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cases')
+
+BAD_IDS = ('../rahasia', '..', 'sub/case_01', 'sub\\case_01', '/tmp/case_01', 'C:case_01', 'case\0', '')
+
+
+class DirectoryCaseStoreTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cases = os.path.join(self.root, 'cases')
+        os.makedirs(os.path.join(self.cases, 'sub'))
+        shutil.copy(os.path.join(CASES_DIR, 'case_01.json'), self.cases)
+        shutil.copy(os.path.join(CASES_DIR, 'case_01.json'), os.path.join(self.cases, 'sub'))
+        shutil.copy(os.path.join(CASES_DIR, 'case_01.json'), os.path.join(self.root, 'rahasia.json'))
+        self.store = DirectoryCaseStore(self.cases)
+    
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+    
+    def test_rejects_path_ids(self):
+        for case_id in BAD_IDS:
+            with self.assertRaises(FileNotFoundError, msg=case_id):
+                self.store.read(case_id)
+            self.assertIsNone(self.store.stat(case_id), case_id)
+    
+    def test_valid_ids(self):
+        self.assertFalse(any(is_safe_case_id(case_id) for case_id in BAD_IDS))
+        self.assertTrue(is_safe_case_id('case_01'))
+        self.assertTrue(self.store.read('case_01'))
+        self.assertIsNotNone(self.store.stat('case_01'))
+        self.assertEqual(self.store.list_ids(), ['case_01'])
+    
+    def test_cache_artifact_stays_in_cache_dir(self):
+        cache = CaseCache(os.path.join(self.root, 'cache'))
+        for case_id in BAD_IDS[:-1]:
+            path = cache._artifact_path(('store', case_id))
+            self.assertEqual(os.path.dirname(path), cache.cache_dir, case_id)
+    
+    def test_engine_reports_missing_case(self):
+        engine = SessionEngine(CaseRegistry(self.store), rng=random.Random(1))
+        result = engine.start('../rahasia')
+        self.assertIn('error', [event['type'] for event in result['events']])
+        self.assertIsNone(engine.game_manager.case)
+
+
+if __name__ == '__main__':
+    unittest.main()
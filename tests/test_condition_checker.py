@@ -0,0 +1,174 @@
+"""
+Closure ComplexCondition di-compile ulang setelah conditions / sub_conditions diubah
+Jalankan: python -m unittest discover tests
+"""
+
+import copy
+import os
+import pickle
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from systems.condition_checker import ComplexCondition, Condition, ConditionCompiler, FlagState
+
+FLAG_NAMES = ('f0', 'f1', 'f2', 'f3')
+
+
+def naive(node, flags):
+    """Evaluasi pohon kondisi langsung dari field-nya, tanpa closure (semantik evaluate versi awal)"""
+    if isinstance(node, Condition):
+        return flags.get(node.target) == node.value
+    results = [naive(c, flags) for c in node.conditions] + [naive(s, flags) for s in node.sub_conditions]
+    if node.operator == 'AND':
+        return all(results)
+    if node.operator == 'OR':
+        return any(results)
+    return not all(results) if results else True
+
+
+def flag(name, value=True):
+    return Condition('flag', name, value)
+
+
+def group(operator, *children):
+    node = ComplexCondition(operator)
+    for child in children:
+        if isinstance(child, ComplexCondition):
+            node.add_complex_condition(child)
+        else:
+            node.add_condition(child)
+    return node
+
+
+class RecompileTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.state = FlagState({'f0': True, 'f1': False})
+        self.inner = group('OR', flag('f1'), flag('f2'))
+        self.root = group('AND', flag('f0'), self.inner)
+        self.assertFalse(self.root.evaluate(self.state))  # Closure sudah di-compile
+    
+    def assertCurrent(self):
+        self.assertEqual(self.root.evaluate(self.state), naive(self.root, self.state.flags))
+    
+    def test_conditions_list_mutations(self):
+        self.root.conditions.append(flag('f3'))
+        self.assertCurrent()
+        self.root.conditions.pop()
+        self.assertCurrent()
+        self.root.conditions[0] = flag('f0', False)
+        self.assertCurrent()
+        del self.root.conditions[0]
+        self.assertCurrent()
+        self.root.conditions.insert(0, flag('f1', False))
+        self.assertCurrent()
+        self.root.conditions.extend([flag('f2', None)])
+        self.assertCurrent()
+        self.root.conditions.remove(self.root.conditions[-1])
+        self.assertCurrent()
+        self.root.conditions += [flag('f0')]
+        self.assertCurrent()
+        self.root.conditions.clear()
+        self.assertCurrent()
+    
+    def test_sub_conditions_mutations(self):
+        self.inner.add_condition(flag('f0'))
+        self.assertTrue(self.root.evaluate(self.state))
+        self.root.sub_conditions.clear()
+        self.assertTrue(self.root.evaluate(self.state))
+        self.root.sub_conditions.append(group('NOT', flag('f0')))
+        self.assertFalse(self.root.evaluate(self.state))
+        self.root.sub_conditions[0] = group('OR', flag('f1', False))
+        self.assertTrue(self.root.evaluate(self.state))
+    
+    def test_setters_and_fields(self):
+        self.root.sub_conditions = [group('OR', flag('f0'))]
+        self.assertTrue(self.root.evaluate(self.state))
+        self.root.conditions = [flag('f1')]
+        self.assertFalse(self.root.evaluate(self.state))
+        self.root.operator = 'OR'
+        self.assertTrue(self.root.evaluate(self.state))
+        self.root.sub_conditions[0].conditions[0].value = False
+        self.assertFalse(self.root.evaluate(self.state))
+        self.root.conditions[0].target = 'f0'
+        self.assertTrue(self.root.evaluate(self.state))
+    
+    def test_detached_child_does_not_invalidate(self):
+        old = self.root.sub_conditions[0]
+        self.root.sub_conditions = []
+        self.assertTrue(self.root.evaluate(self.state))
+        predicate = self.root.compile()
+        old.add_condition(flag('f0'))
+        self.assertIs(self.root.compile(), predicate)
+    
+    def test_copy_and_pickle(self):
+        for clone in (copy.deepcopy(self.root), pickle.loads(pickle.dumps(self.root))):
+            self.assertFalse(clone.evaluate(self.state))
+            clone.sub_conditions[0].conditions.append(flag('f0'))
+            self.assertTrue(clone.evaluate(self.state))
+            clone.conditions.append(flag('f3'))
+            self.assertFalse(clone.evaluate(self.state))
+        self.assertFalse(self.root.evaluate(self.state))
+    
+    def test_compiler_follows_mutation(self):
+        compiler = ConditionCompiler()
+        self.assertFalse(compiler.check(self.root, self.state.flags))
+        self.inner.conditions.append(flag('f0'))
+        self.assertTrue(compiler.check(self.root, self.state.flags))
+
+
+class RandomMutationTest(unittest.TestCase):
+    
+    def random_condition(self, rng):
+        return flag(rng.choice(FLAG_NAMES), rng.choice((True, False, 1, None)))
+    
+    def random_tree(self, rng, depth):
+        node = ComplexCondition(rng.choice(('AND', 'OR', 'NOT')))
+        for _ in range(rng.randint(0, 3)):
+            node.add_condition(self.random_condition(rng))
+        if depth:
+            for _ in range(rng.randint(0, 2)):
+                node.add_complex_condition(self.random_tree(rng, depth - 1))
+        return node
+    
+    def nodes(self, root):
+        found = [root]
+        for sub in root.sub_conditions:
+            found += self.nodes(sub)
+        return found
+    
+    def mutate(self, rng, root):
+        node = rng.choice(self.nodes(root))
+        choice = rng.randrange(8)
+        if choice == 0:
+            node.conditions.append(self.random_condition(rng))
+        elif choice == 1 and node.conditions:
+            node.conditions.pop(rng.randrange(len(node.conditions)))
+        elif choice == 2 and node.conditions:
+            node.conditions[rng.randrange(len(node.conditions))] = self.random_condition(rng)
+        elif choice == 3 and node.conditions:
+            node.conditions[rng.randrange(len(node.conditions))].value = rng.choice((True, False, 1, None))
+        elif choice == 4:
+            node.sub_conditions.append(self.random_tree(rng, 1))
+        elif choice == 5 and node.sub_conditions:
+            del node.sub_conditions[rng.randrange(len(node.sub_conditions))]
+        elif choice == 6:
+            node.operator = rng.choice(('AND', 'OR', 'NOT'))
+        else:
+            node.sub_conditions = list(node.sub_conditions)[::-1]
+    
+    def test_matches_naive_evaluation(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            root = self.random_tree(rng, 2)
+            for _ in range(15):
+                flags = {name: rng.choice((True, False, 1)) for name in FLAG_NAMES if rng.random() < 0.8}
+                self.assertEqual(root.evaluate(FlagState(flags)), naive(root, flags))
+                self.mutate(rng, root)
+
+
+if __name__ == '__main__':
+    unittest.main()
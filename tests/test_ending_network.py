@@ -0,0 +1,115 @@
+"""
+EndingNetwork.match_index dibandingkan dengan scan first-match naif atas tabel ending acak
+Jalankan: python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.case_model import Case, Clue, Ending
+from core.ending_network import EndingNetwork
+
+CLUE_IDS = ('c0', 'c1', 'c2', 'c3', 'c4', 'c5')
+EXTRA_IDS = ('x0', 'x1')  # Bukti di luar tabel bit kasus
+FLAG_NAMES = ('f0', 'f1', 'f2', 'f3')
+FLAG_VALUES = (True, False, 1, 2, 'ya', ['a', 'b'])
+
+
+class State:
+    """State pemain minimal (antarmuka yang dipakai tes ending, seperti GameManager)"""
+    
+    def __init__(self, case, evidence, flags):
+        self.evidence = set(evidence)
+        self.flags = dict(flags)
+        self.mask = 0
+        for evidence_id in self.evidence:
+            bit = case.evidence_index.get(evidence_id)
+            if bit is not None:
+                self.mask |= 1 << bit
+    
+    def get_flag(self, flag_name, default=None):
+        return self.flags.get(flag_name, default)
+    
+    def has_evidence(self, evidence_id):
+        return evidence_id in self.evidence
+    
+    def has_all_evidence(self, mask):
+        return (self.mask & mask) == mask
+    
+    def get_evidence_count(self):
+        return len(self.evidence)
+
+
+def random_case(rng):
+    clues = {clue_id: Clue(clue_id, clue_id, '', 'umum', None, False, ()) for clue_id in CLUE_IDS}
+    endings = []
+    for number in range(rng.randint(1, 12)):
+        evidence = rng.sample(CLUE_IDS + EXTRA_IDS, rng.randint(0, 3))
+        conditions = [(name, rng.choice(FLAG_VALUES)) for name in rng.sample(FLAG_NAMES, rng.randint(0, 2))]
+        flags = [(name, rng.choice(FLAG_VALUES)) for name in rng.sample(FLAG_NAMES, rng.randint(0, 1))]
+        min_evidence = rng.choice((0, 0, 1, 2, 3, 5))
+        max_evidence = rng.choice((float('inf'), float('inf'), 1, 2, 4))
+        min_accuracy = rng.choice((0, 0, 50, 75, 100))
+        endings.append(Ending(f'e{number}', 'normal', '', '', tuple(evidence), tuple(conditions),
+                              tuple(flags), min_evidence, max_evidence, min_accuracy))
+    return Case('acak', '', '', 'start', {}, {}, {}, clues, {}, tuple(endings))
+
+
+def random_state(rng, case):
+    evidence = rng.sample(CLUE_IDS + EXTRA_IDS, rng.randint(0, len(CLUE_IDS + EXTRA_IDS)))
+    flags = {name: rng.choice(FLAG_VALUES) for name in FLAG_NAMES if rng.random() < 0.7}
+    return State(case, evidence, flags)
+
+
+def naive_match_index(case, state, accuracy):
+    """Scan urutan case.endings, syarat dicek satu per satu"""
+    for index, ending in enumerate(case.endings):
+        if not all(state.has_evidence(e) for e in ending.required_evidence):
+            continue
+        if not all(state.get_flag(name) == value for name, value in ending.conditions + ending.flags):
+            continue
+        count = state.get_evidence_count()
+        if count < ending.min_evidence or count > ending.max_evidence:
+            continue
+        if accuracy is not None and ending.min_accuracy > 0 and accuracy < ending.min_accuracy:
+            continue
+        return index
+    return None
+
+
+class MatchIndexTest(unittest.TestCase):
+    
+    def check(self, rng, network, case, rounds):
+        for _ in range(rounds):
+            state = random_state(rng, case)
+            accuracy = rng.choice((None, 0.0, 49.9, 50.0, 80.0, 100.0))
+            self.assertEqual(network.match_index(state, accuracy), naive_match_index(case, state, accuracy),
+                             (state.evidence, state.flags, accuracy))
+    
+    def test_matches_naive_scan(self):
+        rng = random.Random(11)
+        for _ in range(150):
+            case = random_case(rng)
+            self.check(rng, EndingNetwork(case), case, 40)
+    
+    def test_node_table_reset(self):
+        rng = random.Random(12)
+        resets = 0
+        for _ in range(150):
+            case = random_case(rng)
+            network = EndingNetwork(case, max_nodes=3)
+            for _ in range(40):
+                before = network.node_count()
+                self.check(rng, network, case, 1)
+                if network.node_count() < before:
+                    resets += 1
+                self.assertLessEqual(network.node_count(), network.max_nodes)
+        self.assertGreater(resets, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
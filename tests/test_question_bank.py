@@ -0,0 +1,74 @@
+"""
+Pemilihan soal belum dijawab lewat QuestionPool per sesi
+Jalankan: python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.case_model import EMPTY_OUTCOME, Question
+from core.case_registry import default_case_registry
+from core.question_bank import QuestionBank, QuestionPool
+from core.question_manager import QuestionManager
+
+
+def bank(bank_id, count, topic='pengurangan'):
+    questions = {}
+    for number in range(count):
+        question_id = f'{bank_id}_{number}'
+        questions[question_id] = Question(question_id, 'short_answer', "Soal?", (), str(number), '',
+                                          EMPTY_OUTCOME, EMPTY_OUTCOME, topic=topic)
+    return QuestionBank(bank_id, questions)
+
+
+class QuestionPoolTest(unittest.TestCase):
+    
+    def test_skips_answered_once(self):
+        rng = random.Random(3)
+        ids = [f'q{n}' for n in range(50)]
+        answered = set(ids[:45])
+        pool = QuestionPool(ids)
+        picked = {pool.pick(answered, rng) for _ in range(200)}
+        self.assertEqual(picked, set(ids[45:]))
+        self.assertEqual(len(pool), 5)  # Soal yang sudah dijawab dibuang permanen
+        
+        answered.update(ids)
+        self.assertIsNone(pool.pick(answered, rng))
+        self.assertEqual(len(pool), 0)
+
+
+class SelectQuestionTest(unittest.TestCase):
+    
+    def setUp(self):
+        case = default_case_registry.load_case('case_01')
+        self.manager = QuestionManager(case, [bank('a', 300), bank('b', 30), bank('c', 5, topic='lain')])
+    
+    def test_never_repeats_answered(self):
+        rng = random.Random(4)
+        seen = set()
+        total = sum(len(b.candidates(topic='pengurangan')) for b in self.manager.banks)  # Termasuk soal kasus
+        for _ in range(total):
+            question = self.manager.select_question(topic='pengurangan', rng=rng)
+            self.assertNotIn(question.id, seen)
+            seen.add(question.id)
+            self.manager.record_answer(question.id, '0', False)
+        self.assertIsNone(self.manager.select_question(topic='pengurangan', rng=rng))
+        self.assertIsNotNone(self.manager.select_question(topic='pengurangan', unanswered=False, rng=rng))
+    
+    def test_restored_history_resets_pools(self):
+        rng = random.Random(5)
+        for _ in range(5):
+            question = self.manager.select_question(topic='lain', rng=rng)
+            self.manager.record_answer(question.id, '0', True)
+        self.assertIsNone(self.manager.select_question(topic='lain', rng=rng))
+        
+        self.manager.question_history = []
+        self.assertIsNotNone(self.manager.select_question(topic='lain', rng=rng))
+
+
+if __name__ == '__main__':
+    unittest.main()
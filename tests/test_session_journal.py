@@ -0,0 +1,83 @@
+"""
+Replay SessionJournal sampai turn dan tahap alur yang sama dengan sesi aslinya
+Jalankan: python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_engine import SessionEngine
+from core.session_journal import SessionJournal
+
+
+class JournalReplayTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'sesi.dpsj')
+        self.engine = SessionEngine(rng=random.Random(1))
+        self.journal = SessionJournal(self.path)
+        self.journal.record(self.engine, self.engine.start('case_01'))
+    
+    def tearDown(self):
+        self.journal.close()
+    
+    def play(self, *commands):
+        for action, arg in commands:
+            self.journal.record(self.engine, self.engine.handle(action, arg))
+    
+    def replay(self):
+        restored = SessionEngine(rng=random.Random(2))
+        with SessionJournal(self.path) as journal:
+            journal.replay(restored)
+        return restored
+    
+    def test_turn_without_state_events(self):
+        self.play(('continue', None), ('continue', None), ('answer', 0),
+                  ('continue', None), ('answer', 0), ('continue', None))
+        self.assertEqual(self.engine.screen['type'], 'ending')
+        
+        restored = self.replay()
+        self.assertEqual(restored.turn, self.engine.turn)
+        self.assertEqual(restored.screen['type'], 'ending')
+        self.assertEqual(restored.screen['ending'], self.engine.screen['ending'])
+    
+    def test_rejected_command_not_journaled(self):
+        self.play(('continue', None), ('move', 0))
+        self.assertEqual(self.replay().turn, self.engine.turn)
+    
+    def test_checkpoint_progress(self):
+        self.play(('continue', None), ('continue', None), ('answer', 0))
+        self.assertEqual(self.engine.screen['type'], 'checkpoint_result')
+        
+        restored = self.replay()
+        self.assertEqual(restored._checkpoint_correct, self.engine._checkpoint_correct)
+        self.assertEqual(len(restored.question_manager.question_history),
+                         len(self.engine.question_manager.question_history))
+        self.assertEqual(restored.screen['type'], 'checkpoint_question')
+        self.assertNotEqual(restored._checkpoint_template, self.engine._checkpoint_template)
+    
+    def test_checkpoint_question_not_rerolled(self):
+        self.play(('continue', None), ('continue', None))
+        self.assertEqual(self.engine.screen['type'], 'checkpoint_question')
+        
+        restored = self.replay()
+        question, again = self.engine.screen['question'], restored.screen['question']
+        self.assertEqual(restored.screen['type'], 'checkpoint_question')
+        self.assertEqual((again['text'], again['options']), (question['text'], question['options']))
+    
+    def test_snapshot_keeps_flow(self):
+        self.journal.snapshot_every = 2
+        self.play(('continue', None), ('continue', None), ('answer', 0),
+                  ('continue', None), ('answer', 0), ('continue', None))
+        restored = self.replay()
+        self.assertEqual(restored.turn, self.engine.turn)
+        self.assertEqual(restored.screen['type'], 'ending')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Round-trip save SessionEngine di tengah checkpoint dan di layar ending
+Jalankan: python -m unittest discover tests
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.case_registry import CaseRegistry
+from core.case_store import open_case_store
+from core.save_format import (FLOW_CHECKPOINT, FLOW_ENDING, FLOW_PLAYING, SAVE_FORMAT_VERSION,
+                              SaveFormatError, decode_save, read_save_header)
+from core.session_engine import SessionEngine
+
+
+def play(*commands):
+    """Mainkan case_01 dengan RNG tetap, return engine"""
+    engine = SessionEngine(rng=random.Random(1))
+    engine.start('case_01')
+    for action, arg in commands:
+        result = engine.handle(action, arg)
+        assert not [e for e in result['events'] if e['type'] == 'error'], result['events']
+    return engine
+
+
+def reload(engine):
+    """Save lalu load ke engine baru, return (engine baru, hasil load)"""
+    restored = SessionEngine(rng=random.Random(2))
+    result = restored.load(engine.save())
+    return restored, result
+
+
+class CheckpointSaveTest(unittest.TestCase):
+    
+    def test_header_version(self):
+        engine = play(('continue', None))
+        self.assertEqual(read_save_header(engine.save())[0], SAVE_FORMAT_VERSION)
+    
+    def test_playing_stage(self):
+        engine = SessionEngine(rng=random.Random(1))
+        engine.start('case_01')
+        self.assertEqual(decode_save(engine.save()).flow.stage, FLOW_PLAYING)
+    
+    def test_save_at_checkpoint_intro(self):
+        engine = play(('continue', None))
+        self.assertEqual(engine.screen['type'], 'checkpoint_intro')
+        
+        restored, result = reload(engine)
+        self.assertEqual(restored.screen['type'], 'checkpoint_intro')
+        self.assertNotIn('checkpoint_started', [e['type'] for e in result['events']])
+        self.assertTrue(restored._checkpoint_asked)
+        self.assertIs(restored._pending_ending, engine._pending_ending)
+        self.assertEqual(restored._checkpoint_queue, engine._checkpoint_queue)
+        
+        restored.handle('continue')
+        self.assertEqual(restored.screen['type'], 'checkpoint_question')
+    
+    def test_save_at_checkpoint_question(self):
+        engine = play(('continue', None), ('continue', None))
+        self.assertEqual(engine.screen['type'], 'checkpoint_question')
+        
+        restored, _ = reload(engine)
+        self.assertEqual(restored.screen['type'], 'checkpoint_question')
+        self.assertEqual(restored._checkpoint_template, engine._checkpoint_template)
+        self.assertEqual(restored._checkpoint_queue, engine._checkpoint_queue)
+        self.assertEqual(len(restored.question_manager.question_history),
+                         len(engine.question_manager.question_history))
+        
+        # Soal prosedural yang sama ditanyakan lagi, bukan diacak ulang
+        question, again = engine.screen['question'], restored.screen['question']
+        self.assertEqual((again['text'], again['options']), (question['text'], question['options']))
+        self.assertEqual(decode_save(restored.save()).flow, decode_save(engine.save()).flow)
+        for index in range(len(question['options'])):
+            self.assertEqual(restored.question_manager.validate_answer(again['id'], again['options'][index])[0],
+                             engine.question_manager.validate_answer(question['id'], question['options'][index])[0])
+    
+    def test_invalid_checkpoint_row(self):
+        engine = play(('continue', None), ('continue', None))
+        engine._checkpoint_row = (1, 2, 3, (3, 4), 99)  # Indeks template tidak ada
+        with self.assertRaises(SaveFormatError):
+            reload(engine)
+    
+    def test_save_at_checkpoint_result(self):
+        engine = play(('continue', None), ('continue', None), ('answer', 0))
+        self.assertEqual(engine.screen['type'], 'checkpoint_result')
+        history = len(engine.question_manager.question_history)
+        
+        restored, _ = reload(engine)
+        flow = decode_save(engine.save()).flow
+        self.assertEqual(flow.stage, FLOW_CHECKPOINT)
+        self.assertTrue(flow.answered)
+        
+        # Hasil sudah dicatat: lanjut ke soal berikutnya, bukan mengulang soal yang sama
+        self.assertEqual(restored.screen['type'], 'checkpoint_question')
+        self.assertNotEqual(restored._checkpoint_template, engine._checkpoint_template)
+        self.assertEqual(restored._checkpoint_correct, engine._checkpoint_correct)
+        self.assertEqual(len(restored.question_manager.question_history), history)
+    
+    def test_save_at_ending(self):
+        engine = play(('continue', None), ('continue', None), ('answer', 0),
+                      ('continue', None), ('answer', 0), ('continue', None))
+        self.assertEqual(engine.screen['type'], 'ending')
+        self.assertEqual(decode_save(engine.save()).flow.stage, FLOW_ENDING)
+        
+        restored, result = reload(engine)
+        self.assertEqual(restored.screen['type'], 'ending')
+        self.assertEqual(restored.screen['actions'], ['restart', 'quit'])
+        self.assertEqual(restored.screen['ending'], engine.screen['ending'])
+        self.assertEqual(restored.screen['stats'], engine.screen['stats'])
+        self.assertNotIn('ending', [e['type'] for e in result['events']])
+        self.assertEqual(restored.turn, engine.turn)
+        
+        # Save dari layar ending tetap di ending
+        again, _ = reload(restored)
+        self.assertEqual(again.screen['type'], 'ending')
+
+
+
+class InvalidCaseSaveTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cases')
+        shutil.copy(os.path.join(source, 'case_01.json'), self.store_dir)
+        self.case_path = os.path.join(self.store_dir, 'case_01.json')
+    
+    def tearDown(self):
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+    
+    def engine(self):
+        return SessionEngine(CaseRegistry(open_case_store(self.store_dir)), rng=random.Random(1))
+    
+    def test_case_became_invalid(self):
+        engine = self.engine()
+        engine.start('case_01')
+        data = engine.save()
+        
+        with open(self.case_path, encoding='utf-8') as f:
+            case_data = json.load(f)
+        case_data['start_location'] = 'lokasi_yang_tidak_ada'
+        with open(self.case_path, 'w', encoding='utf-8') as f:
+            json.dump(case_data, f)
+        
+        with self.assertRaises(SaveFormatError):
+            self.engine().load(data)
+    
+    def test_case_removed(self):
+        engine = self.engine()
+        engine.start('case_01')
+        data = engine.save()
+        os.remove(self.case_path)
+        
+        with self.assertRaises(SaveFormatError):
+            self.engine().load(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
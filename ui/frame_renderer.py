@@ -0,0 +1,173 @@
+"""
+FrameRenderer - Output terminal dengan double buffer
+Semua output UI selama flow ditampung di memori; GameUI.clear_screen hanya
+menulis escape ANSI ke buffer sebagai penanda awal frame baru. Saat flow
+meminta input, frame + prompt dikirim dalam satu write. Di terminal yang
+mendukung, hanya baris yang berubah dari frame sebelumnya yang ditulis ulang
+"""
+
+import io
+import os
+import re
+import shutil
+import sys
+import unicodedata
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from ui.game_ui import GameUI, output_to
+
+
+# Escape SGR (warna / tebal), satu-satunya escape yang dipakai GameUI di dalam baris
+_SGR = re.compile(r'\033\[[0-9;]*m')
+_RESET = '\033[0m'
+_CLEAR_LINE_END = '\033[K'
+_CLEAR_BELOW = '\033[J'
+
+
+def display_width(text: str) -> int:
+    """Lebar tampilan teks di terminal: tanpa escape SGR, karakter lebar (emoji, CJK) = 2 kolom"""
+    text = _SGR.sub('', text)
+    if text.isascii():
+        return len(text)
+    width = 0
+    for ch in text:
+        if unicodedata.combining(ch) or ch in '\u200d\ufe0f':  # Penggabung emoji, lebar 0
+            continue
+        width += 2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1
+    return width
+
+
+def supports_diff(stream: TextIO) -> bool:
+    """Terminal interaktif yang memahami posisi kursor ANSI"""
+    try:
+        interactive = stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+    return interactive and os.environ.get('TERM', '') != 'dumb'
+
+
+class FrameRenderer:
+    """
+    Renderer frame untuk satu terminal
+    Model layar (baris yang terlihat, termasuk jawaban yang di-echo terminal)
+    disimpan agar frame berikutnya bisa dikirim sebagai selisih. Jika frame
+    tidak muat (akan scroll / wrap) atau model tidak pasti, frame digambar penuh
+    """
+    
+    def __init__(self, stream: Optional[TextIO] = None, diff: Optional[bool] = None):
+        self.stream = stream or sys.__stdout__
+        self.diff = supports_diff(self.stream) if diff is None else diff
+        self._buffer = io.StringIO()
+        # Baris yang terlihat mulai dari baris 1, elemen terakhir = baris kursor; None = tidak diketahui
+        self._screen: Optional[List[str]] = None
+        self._size: Optional[Tuple[int, int]] = None
+        if os.name == 'nt' and self.stream is sys.__stdout__:
+            os.system('')  # Sekali saja: aktifkan pemrosesan escape ANSI di konsol Windows
+    
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """Tampung output UI (ui_print) di context ini ke buffer frame"""
+        with output_to(self._buffer):
+            yield
+    
+    def invalidate(self) -> None:
+        """Ada output di luar renderer (traceback, input langsung): frame berikutnya digambar penuh"""
+        self._screen = None
+    
+    def present(self, prompt: str = '') -> None:
+        """Kirim isi buffer + prompt ke terminal dalam satu write"""
+        text = self._buffer.getvalue() + prompt
+        self._buffer = io.StringIO()
+        if not text:
+            return
+        
+        # Hanya isi setelah clear terakhir yang terlihat
+        _, cleared, frame = text.rpartition(GameUI.CLEAR_SEQUENCE)
+        if cleared:
+            output = self._render_frame(frame.split('\n'))
+        else:
+            output = text
+            self._extend(text)
+        self.stream.write(output)
+        self.stream.flush()
+    
+    def note_input(self, reply: str) -> None:
+        """Jawaban pemain sudah di-echo terminal di baris prompt, lalu kursor turun satu baris"""
+        self._extend(reply + '\n')
+    
+    # ========== Model layar ==========
+    
+    def _terminal_size(self) -> Tuple[int, int]:
+        size = shutil.get_terminal_size()
+        return size.columns, size.lines
+    
+    def _fits(self, lines: List[str], size: Tuple[int, int]) -> bool:
+        """Frame tidak membuat terminal scroll atau wrap (posisi baris tetap valid)"""
+        columns, rows = size
+        return len(lines) < rows and all(display_width(line) < columns for line in lines)
+    
+    def _extend(self, text: str) -> None:
+        if self._screen is None:
+            return
+        parts = text.split('\n')
+        self._screen[-1] += parts[0]
+        self._screen.extend(parts[1:])
+        if self._size is None or not self._fits(self._screen, self._size):
+            self._screen = None
+    
+    def _render_frame(self, lines: List[str]) -> str:
+        size = self._terminal_size() if self.diff else None
+        fits = size is not None and self._fits(lines, size)
+        previous = self._screen if fits and size == self._size else None
+        self._screen = lines if fits else None
+        self._size = size
+        if previous is None:
+            return GameUI.CLEAR_SEQUENCE + '\n'.join(lines)
+        
+        # Baris ditulis ulang dengan state warna yang berlaku di awal baris tersebut,
+        # jadi baris yang warnanya diwarisi dari baris sebelumnya juga dibandingkan
+        old_lines = _styled_lines(previous)
+        new_lines = _styled_lines(lines)
+        parts = []
+        for row, (style, line) in enumerate(new_lines):
+            if row >= len(old_lines) or old_lines[row] != (style, line):
+                parts.append(f"\033[{row + 1};1H{_RESET}{style}{line}{_CLEAR_LINE_END}")
+        if len(previous) > len(lines):
+            parts.append(f"\033[{len(lines) + 1};1H{_CLEAR_BELOW}")
+        
+        # Kursor dan warna kembali ke akhir frame, seperti setelah digambar penuh
+        parts.append(f"\033[{len(lines)};{display_width(lines[-1]) + 1}H{_RESET}{_end_style(new_lines)}")
+        return ''.join(parts)
+
+
+def _styled_lines(lines: List[str]) -> List[Tuple[str, str]]:
+    """(escape SGR yang aktif di awal baris, isi baris) untuk setiap baris"""
+    result = []
+    style = ''
+    for line in lines:
+        result.append((style, line))
+        style = _advance_style(style, line)
+    return result
+
+
+def _advance_style(style: str, line: str) -> str:
+    for code in _SGR.findall(line):
+        style = '' if code in (_RESET, '\033[m') else style + code
+    return style
+
+
+def _end_style(styled: List[Tuple[str, str]]) -> str:
+    style, line = styled[-1]
+    return _advance_style(style, line)
+
+
+_default_renderer: Optional[FrameRenderer] = None
+
+
+def terminal_renderer() -> FrameRenderer:
+    """Renderer bersama untuk stdout proses ini"""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = FrameRenderer()
+    return _default_renderer
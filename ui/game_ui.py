@@ -1,9 +1,40 @@
 """
 GameUI - Interface text-based untuk game
+Semua output ditulis lewat ui_print ke stream output context saat ini
+(default sys.stdout), sehingga setiap koneksi server / frame terminal
+punya tujuan output sendiri tanpa menukar sys.stdout milik proses
 """
 
-import os
-from typing import List, Optional
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, TextIO
+
+
+# Stream output UI per context (task asyncio / thread), None = sys.stdout
+_output_stream: ContextVar[Optional[TextIO]] = ContextVar('ui_output_stream', default=None)
+
+
+def current_output() -> TextIO:
+    """Stream tujuan output UI di context saat ini"""
+    stream = _output_stream.get()
+    return sys.stdout if stream is None else stream
+
+
+@contextmanager
+def output_to(stream: TextIO) -> Iterator[TextIO]:
+    """Arahkan output UI di context ini ke stream (thread/task lain tidak terpengaruh)"""
+    token = _output_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _output_stream.reset(token)
+
+
+def ui_print(*args, **kwargs) -> None:
+    """print() ke stream output UI context saat ini"""
+    kwargs.setdefault('file', current_output())
+    print(*args, **kwargs)
 
 
 class GameUI:
@@ -21,127 +52,136 @@ class GameUI:
         BOLD = '\033[1m'
         UNDERLINE = '\033[4m'
     
+    # Escape ANSI: kursor ke kiri atas, hapus layar dan scrollback
+    CLEAR_SEQUENCE = '\033[H\033[2J\033[3J'
+    
     @staticmethod
     def clear_screen():
-        """Bersihkan layar"""
-        os.system('clear' if os.name == 'posix' else 'cls')
+        """
+        Bersihkan layar dengan escape ANSI (tanpa menjalankan proses clear)
+        Saat output ditampung FrameRenderer / server, ini menandai awal frame baru
+        """
+        ui_print(GameUI.CLEAR_SEQUENCE, end='')
     
     @staticmethod
     def print_header(text: str, width: int = 60):
         """Print header dengan border"""
-        print(f"\n{GameUI.Colors.BOLD}{GameUI.Colors.CYAN}")
-        print("=" * width)
-        print(text.center(width))
-        print("=" * width)
-        print(f"{GameUI.Colors.ENDC}")
+        ui_print(f"\n{GameUI.Colors.BOLD}{GameUI.Colors.CYAN}")
+        ui_print("=" * width)
+        ui_print(text.center(width))
+        ui_print("=" * width)
+        ui_print(f"{GameUI.Colors.ENDC}")
     
     @staticmethod
     def print_subheader(text: str, width: int = 60):
         """Print sub-header"""
-        print(f"\n{GameUI.Colors.BOLD}{GameUI.Colors.BLUE}{text}{GameUI.Colors.ENDC}")
-        print("-" * width)
+        ui_print(f"\n{GameUI.Colors.BOLD}{GameUI.Colors.BLUE}{text}{GameUI.Colors.ENDC}")
+        ui_print("-" * width)
     
     @staticmethod
     def print_narration(text: str):
         """Print narasi/deskripsi"""
-        print(f"\n{GameUI.Colors.CYAN}{text}{GameUI.Colors.ENDC}\n")
+        ui_print(f"\n{GameUI.Colors.CYAN}{text}{GameUI.Colors.ENDC}\n")
     
     @staticmethod
     def print_dialogue(speaker: str, text: str):
         """Print dialog dari NPC"""
-        print(f"\n{GameUI.Colors.YELLOW}{GameUI.Colors.BOLD}{speaker}:{GameUI.Colors.ENDC} {text}\n")
+        ui_print(f"\n{GameUI.Colors.YELLOW}{GameUI.Colors.BOLD}{speaker}:{GameUI.Colors.ENDC} {text}\n")
     
     @staticmethod
     def print_player_action(text: str):
         """Print aksi pemain"""
-        print(f"\n{GameUI.Colors.GREEN}→ {text}{GameUI.Colors.ENDC}\n")
+        ui_print(f"\n{GameUI.Colors.GREEN}→ {text}{GameUI.Colors.ENDC}\n")
     
     @staticmethod
     def print_success(text: str):
         """Print pesan sukses"""
-        print(f"\n{GameUI.Colors.GREEN}✓ {text}{GameUI.Colors.ENDC}\n")
+        ui_print(f"\n{GameUI.Colors.GREEN}✓ {text}{GameUI.Colors.ENDC}\n")
     
     @staticmethod
     def print_error(text: str):
         """Print pesan error"""
-        print(f"\n{GameUI.Colors.RED}✗ {text}{GameUI.Colors.ENDC}\n")
+        ui_print(f"\n{GameUI.Colors.RED}✗ {text}{GameUI.Colors.ENDC}\n")
     
     @staticmethod
     def print_warning(text: str):
         """Print pesan warning"""
-        print(f"\n{GameUI.Colors.YELLOW}⚠ {text}{GameUI.Colors.ENDC}\n")
+        ui_print(f"\n{GameUI.Colors.YELLOW}⚠ {text}{GameUI.Colors.ENDC}\n")
     
     @staticmethod
     def print_question(text: str, question_type: str = ""):
         """Print pertanyaan"""
-        print(f"\n{GameUI.Colors.BOLD}❓ {text}{GameUI.Colors.ENDC}")
+        ui_print(f"\n{GameUI.Colors.BOLD}❓ {text}{GameUI.Colors.ENDC}")
         if question_type:
-            print(f"   (Tipe: {question_type})\n")
+            ui_print(f"   (Tipe: {question_type})\n")
+    
+    @staticmethod
+    def print_choice_list(choices: List[str]):
+        """Print daftar pilihan bernomor"""
+        ui_print(f"\n{GameUI.Colors.BOLD}Pilihan:{GameUI.Colors.ENDC}")
+        for i, choice in enumerate(choices):
+            ui_print(f"  {i + 1}. {choice}")
     
     @staticmethod
-    def print_choices(choices: List[str], show_numbers: bool = True) -> int:
+    def choice_prompt(count: int) -> str:
+        """Prompt input nomor pilihan"""
+        return f"\n{GameUI.Colors.BOLD}Masukkan nomor pilihan (1-{count}): {GameUI.Colors.ENDC}"
+    
+    @staticmethod
+    def parse_choice(choice_input: str, count: int) -> Optional[int]:
         """
-        Print pilihan dan minta input user
-        Return index pilihan (0-based)
+        Ubah input nomor pilihan menjadi index (0-based)
+        Print error dan return None jika tidak valid
         """
-        print(f"\n{GameUI.Colors.BOLD}Pilihan:{GameUI.Colors.ENDC}")
-        for i, choice in enumerate(choices):
-            print(f"  {i + 1}. {choice}")
+        try:
+            choice_num = int(choice_input.strip())
+        except ValueError:
+            GameUI.print_error("Input tidak valid. Masukkan angka.")
+            return None
         
-        while True:
-            try:
-                choice_input = input(f"\n{GameUI.Colors.BOLD}Masukkan nomor pilihan (1-{len(choices)}): {GameUI.Colors.ENDC}").strip()
-                choice_num = int(choice_input)
-                
-                if 1 <= choice_num <= len(choices):
-                    return choice_num - 1
-                else:
-                    GameUI.print_error(f"Nomor harus antara 1-{len(choices)}")
-            except ValueError:
-                GameUI.print_error("Input tidak valid. Masukkan angka.")
-    
-    @staticmethod
-    def print_inventory_summary(evidence_ids: List[str], case_data: dict):
-        """Print ringkasan inventory bukti"""
-        if not evidence_ids:
-            print(f"\n{GameUI.Colors.YELLOW}📦 Inventory kosong{GameUI.Colors.ENDC}\n")
+        if 1 <= choice_num <= count:
+            return choice_num - 1
+        GameUI.print_error(f"Nomor harus antara 1-{count}")
+        return None
+    
+    @staticmethod
+    def print_inventory_summary(evidence: List[dict]):
+        """Print ringkasan inventory bukti (item: name, description)"""
+        if not evidence:
+            ui_print(f"\n{GameUI.Colors.YELLOW}📦 Inventory kosong{GameUI.Colors.ENDC}\n")
             return
         
-        print(f"\n{GameUI.Colors.BOLD}📦 BUKTI YANG DIKUMPULKAN ({len(evidence_ids)} item):{GameUI.Colors.ENDC}")
-        print("-" * 50)
+        ui_print(f"\n{GameUI.Colors.BOLD}📦 BUKTI YANG DIKUMPULKAN ({len(evidence)} item):{GameUI.Colors.ENDC}")
+        ui_print("-" * 50)
         
-        clues = case_data.get('clues', {})
-        for evidence_id in evidence_ids:
-            clue = clues.get(evidence_id, {})
-            name = clue.get('name', evidence_id)
-            description = clue.get('description', '')
-            print(f"  • {name}")
-            print(f"    └─ {description}")
-        print()
+        for item in evidence:
+            ui_print(f"  • {item['name']}")
+            ui_print(f"    └─ {item['description']}")
+        ui_print()
     
     @staticmethod
     def print_location_info(location_name: str, description: str, width: int = 60):
         """Print info lokasi"""
-        print(f"\n{GameUI.Colors.BOLD}{GameUI.Colors.BLUE}📍 {location_name}{GameUI.Colors.ENDC}")
-        print("-" * width)
-        print(f"{description}\n")
+        ui_print(f"\n{GameUI.Colors.BOLD}{GameUI.Colors.BLUE}📍 {location_name}{GameUI.Colors.ENDC}")
+        ui_print("-" * width)
+        ui_print(f"{description}\n")
     
     @staticmethod
-    def print_npc_list(npcs: List[dict]):
+    def print_npc_list(npcs: List):
         """Print list NPC di lokasi"""
         if not npcs:
-            print(f"\n{GameUI.Colors.YELLOW}Tidak ada NPC di lokasi ini.{GameUI.Colors.ENDC}\n")
+            ui_print(f"\n{GameUI.Colors.YELLOW}Tidak ada NPC di lokasi ini.{GameUI.Colors.ENDC}\n")
             return
         
-        print(f"\n{GameUI.Colors.BOLD}🧑 NPC DI LOKASI INI:{GameUI.Colors.ENDC}")
+        ui_print(f"\n{GameUI.Colors.BOLD}🧑 NPC DI LOKASI INI:{GameUI.Colors.ENDC}")
         for i, npc in enumerate(npcs):
-            print(f"  {i + 1}. {npc['name']} ({npc['role']})")
-        print()
+            ui_print(f"  {i + 1}. {npc['name']} ({npc['role']})")
+        ui_print()
     
     @staticmethod
-    def print_location_actions(location_id: str, exits: dict = None):
+    def print_location_actions(location_id: str, exits: tuple = ()):
         """Print aksi yang bisa dilakukan di lokasi"""
-        print(f"\n{GameUI.Colors.BOLD}AKSI:{GameUI.Colors.ENDC}")
+        ui_print(f"\n{GameUI.Colors.BOLD}AKSI:{GameUI.Colors.ENDC}")
         actions = [
             "1. Cari petunjuk di lokasi",
             "2. Bicara dengan NPC",
@@ -150,23 +190,23 @@ class GameUI:
         ]
         
         for action in actions:
-            print(f"  {action}")
+            ui_print(f"  {action}")
         
         if exits:
-            print(f"\n{GameUI.Colors.BOLD}LOKASI YANG BISA DIKUNJUNGI:{GameUI.Colors.ENDC}")
-            for i, (location_id, location_name) in enumerate(exits.items(), start=1):
-                print(f"  {i+4}. {location_name}")
+            ui_print(f"\n{GameUI.Colors.BOLD}LOKASI YANG BISA DIKUNJUNGI:{GameUI.Colors.ENDC}")
+            for i, (location_id, location_name) in enumerate(exits, start=1):
+                ui_print(f"  {i+4}. {location_name}")
         
-        print()
+        ui_print()
     
     @staticmethod
-    def print_ending_screen(ending_data: dict, stats: dict):
+    def print_ending_screen(ending_data, stats: dict):
         """Print screen akhir game dengan ending"""
         GameUI.clear_screen()
         
-        ending_type = ending_data.get('type', 'unknown')
-        ending_title = ending_data.get('title', 'Ending')
-        ending_text = ending_data.get('text', '')
+        ending_type = ending_data['type']
+        ending_title = ending_data['title']
+        ending_text = ending_data['text']
         
         # Print ending dengan emoji yang sesuai
         emojis = {
@@ -178,48 +218,58 @@ class GameUI:
         emoji = emojis.get(ending_type, '❓')
         
         GameUI.print_header(f"{emoji} {ending_title}", width=70)
-        print(f"\n{ending_text}\n")
+        ui_print(f"\n{ending_text}\n")
         
         # Print statistik
         GameUI.print_subheader("📊 STATISTIK PENYELIDIKAN", width=70)
-        print(f"Total Bukti Dikumpulkan: {stats['total_evidence']}")
-        print(f"Pertanyaan Dijawab: {stats['question_stats']['total_questions']}")
-        print(f"Jawaban Benar: {stats['question_stats']['correct_answers']}")
-        print(f"Akurasi: {stats['question_stats']['accuracy']:.1f}%")
-        print(f"Pilihan Kritis: {stats['critical_choices']}")
-        print()
+        ui_print(f"Total Bukti Dikumpulkan: {stats['total_evidence']}")
+        ui_print(f"Pertanyaan Dijawab: {stats['question_stats']['total_questions']}")
+        ui_print(f"Jawaban Benar: {stats['question_stats']['correct_answers']}")
+        ui_print(f"Akurasi: {stats['question_stats']['accuracy']:.1f}%")
+        ui_print(f"Pilihan Kritis: {stats['critical_choices']}")
+        ui_print()
     
     @staticmethod
     def print_main_menu():
         """Print main menu"""
         GameUI.clear_screen()
         GameUI.print_header("🔍 DETEKTIF PENGETAHUAN", width=60)
-        print(f"{GameUI.Colors.BOLD}Selamat datang, Detektif!{GameUI.Colors.ENDC}\n")
-        print("Dalam game ini, Anda berperan sebagai seorang detektif yang")
-        print("harus memecahkan kasus misterius melalui:")
-        print("  • Penyelidikan lokasi")
-        print("  • Wawancara saksi")
-        print("  • Analisis logika")
-        print("  • Menjawab pertanyaan edukatif")
-        print()
-        print(f"{GameUI.Colors.BOLD}MENU:{GameUI.Colors.ENDC}")
-        print("  1. Mulai Game Baru")
-        print("  2. Tentang Game")
-        print("  3. Keluar")
-        print()
-    
-    @staticmethod
-    def get_text_input(prompt: str = "Masukkan input: ") -> str:
-        """Dapatkan input teks dari user"""
-        return input(f"{GameUI.Colors.BOLD}{prompt}{GameUI.Colors.ENDC}").strip()
-    
-    @staticmethod
-    def get_confirmation(prompt: str = "Yakin?") -> bool:
-        """Dapatkan konfirmasi yes/no dari user"""
-        response = GameUI.get_text_input(f"{prompt} (y/n): ").lower()
-        return response in ['y', 'yes', 'ya']
-    
-    @staticmethod
-    def press_enter_to_continue():
-        """Tunggu user tekan Enter"""
-        input(f"\n{GameUI.Colors.BOLD}(Tekan Enter untuk lanjut...){GameUI.Colors.ENDC}")
+        ui_print(f"{GameUI.Colors.BOLD}Selamat datang, Detektif!{GameUI.Colors.ENDC}\n")
+        ui_print("Dalam game ini, Anda berperan sebagai seorang detektif yang")
+        ui_print("harus memecahkan kasus misterius melalui:")
+        ui_print("  • Penyelidikan lokasi")
+        ui_print("  • Wawancara saksi")
+        ui_print("  • Analisis logika")
+        ui_print("  • Menjawab pertanyaan edukatif")
+        ui_print()
+        ui_print(f"{GameUI.Colors.BOLD}MENU:{GameUI.Colors.ENDC}")
+        ui_print("  1. Mulai Game Baru")
+        ui_print("  2. Tentang Game")
+        ui_print("  3. Keluar")
+        ui_print()
+    
+    @staticmethod
+    def print_case_catalog_header(page: int = 1, total_pages: int = 1):
+        """Print judul katalog kasus (daftar bernomor dicetak oleh pilihan)"""
+        GameUI.clear_screen()
+        GameUI.print_header("📚 PILIH KASUS", width=60)
+        if total_pages > 1:
+            ui_print(f"Halaman {page}/{total_pages}")
+    
+    @staticmethod
+    def case_choice_label(info) -> str:
+        """Label pilihan satu kasus (CaseInfo): judul tebal + ringkasan deskripsi"""
+        label = f"{GameUI.Colors.BOLD}{info.title}{GameUI.Colors.ENDC}"
+        if info.description:
+            label += f"\n     {info.description[:70]}{'...' if len(info.description) > 70 else ''}"
+        return label
+    
+    @staticmethod
+    def text_prompt(prompt: str) -> str:
+        """Prompt input teks dengan style"""
+        return f"{GameUI.Colors.BOLD}{prompt}{GameUI.Colors.ENDC}"
+    
+    @staticmethod
+    def continue_prompt() -> str:
+        """Prompt 'Tekan Enter'"""
+        return f"\n{GameUI.Colors.BOLD}(Tekan Enter untuk lanjut...){GameUI.Colors.ENDC}"
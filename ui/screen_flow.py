@@ -0,0 +1,351 @@
+"""
+ScreenFlow - Alur tampilan dan input untuk setiap layar game
+Setiap flow adalah generator: menggambar layar lewat GameUI (print),
+yield teks prompt, menerima jawaban pemain lewat send(), lalu return hasilnya.
+Terminal (GameLoop) dan server TCP menjalankan flow yang sama
+"""
+
+from typing import Any, Dict, Generator, List, Optional
+
+from ui.frame_renderer import FrameRenderer, terminal_renderer
+from ui.game_ui import GameUI, ui_print
+
+
+# Generator flow: yield prompt (str), terima jawaban (str), return hasil
+Flow = Generator[str, str, Any]
+
+ABOUT_TEXT = """
+🔍 DETEKTIF PENGETAHUAN
+
+Game mystery berbasis edukasi dimana Anda berperan sebagai detektif
+yang harus memecahkan kasus misterius.
+
+FITUR:
+  • Investigasi lokasi dan wawancara saksi
+  • Jawab pertanyaan edukatif untuk membuka bukti
+  • Pilihan yang mempengaruhi alur cerita
+  • Multiple endings berdasarkan performa Anda
+  • Sistem inventory bukti yang mendalam
+
+TIPS:
+  • Kumpulkan sebanyak mungkin bukti
+  • Pikirkan logis sebelum membuat keputusan
+  • Setiap pilihan memiliki konsekuensi
+  • Jawaban yang benar membuka informasi baru
+
+Developer: Knowledge Detective Team
+Version: 1.0.0
+        """
+
+
+def run_flow_blocking(flow: Flow, renderer: Optional[FrameRenderer] = None) -> Any:
+    """
+    Jalankan flow dengan input() terminal
+    Output flow ditampung renderer dan dikirim sebagai satu frame per prompt
+    """
+    renderer = renderer or terminal_renderer()
+    try:
+        with renderer.capture():
+            prompt = next(flow)
+        while True:
+            renderer.present(prompt)
+            try:
+                reply = input()
+            except BaseException:
+                renderer.invalidate()  # Ctrl+C / EOF: isi baris kursor tidak diketahui
+                raise
+            renderer.note_input(reply)
+            with renderer.capture():
+                prompt = flow.send(reply)
+    except StopIteration as stop:
+        renderer.present()
+        return stop.value
+
+
+# ========== Primitive input ==========
+
+def press_enter() -> Flow:
+    """Tunggu pemain tekan Enter"""
+    yield GameUI.continue_prompt()
+
+
+def text_input(prompt: str) -> Flow:
+    """Minta input teks"""
+    reply = yield GameUI.text_prompt(prompt)
+    return reply.strip()
+
+
+def choose(choices: List[str]) -> Flow:
+    """Tampilkan pilihan bernomor, return index (0-based)"""
+    GameUI.print_choice_list(choices)
+    while True:
+        reply = yield GameUI.choice_prompt(len(choices))
+        choice_idx = GameUI.parse_choice(reply, len(choices))
+        if choice_idx is not None:
+            return choice_idx
+
+
+def confirm(prompt: str) -> Flow:
+    """Konfirmasi yes/no"""
+    response = yield from text_input(f"{prompt} (y/n): ")
+    return response.lower() in ['y', 'yes', 'ya']
+
+
+# ========== Menu ==========
+
+def main_menu() -> Flow:
+    """Main menu, return '1' (main), '2' (tentang) atau '3' (keluar)"""
+    while True:
+        GameUI.print_main_menu()
+        
+        choice = yield from text_input("Pilih (1-3): ")
+        if choice in ("1", "2", "3"):
+            return choice
+        GameUI.print_error("Pilihan tidak valid!")
+
+
+def about() -> Flow:
+    """Layar tentang game"""
+    GameUI.clear_screen()
+    GameUI.print_header("TENTANG GAME")
+    ui_print(ABOUT_TEXT)
+    yield from press_enter()
+
+
+def choose_case(cases: List, page_size: int = 9) -> Flow:
+    """Katalog kasus (CaseInfo) dengan halaman, return case_id atau None"""
+    if not cases:
+        GameUI.print_error("Tidak ada kasus yang tersedia!")
+        yield from press_enter()
+        return None
+    
+    if len(cases) == 1:
+        return cases[0].id
+    
+    page = 0
+    total_pages = (len(cases) + page_size - 1) // page_size
+    
+    while True:
+        page_cases = cases[page * page_size:(page + 1) * page_size]
+        GameUI.print_case_catalog_header(page + 1, total_pages)
+        
+        options = [GameUI.case_choice_label(info) for info in page_cases]
+        if page + 1 < total_pages:
+            options.append("Halaman berikutnya")
+        if page > 0:
+            options.append("Halaman sebelumnya")
+        options.append("Kembali ke menu")
+        
+        choice_idx = yield from choose(options)
+        
+        if choice_idx < len(page_cases):
+            return page_cases[choice_idx].id
+        
+        selected = options[choice_idx]
+        if selected == "Halaman berikutnya":
+            page += 1
+        elif selected == "Halaman sebelumnya":
+            page -= 1
+        else:
+            return None
+
+
+# ========== Layar SessionEngine ==========
+# Setiap flow menampilkan model layar dari engine lalu return (action, arg)
+
+def intro_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    GameUI.print_header("🔍 DETEKTIF PENGETAHUAN")
+    
+    # Show opening narration
+    ui_print(f"\n{GameUI.Colors.CYAN}Kasus: {screen['title']}{GameUI.Colors.ENDC}\n")
+    ui_print(f"{screen['description']}\n")
+    yield from press_enter()
+    return 'continue', None
+
+
+def location_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    
+    location = screen['location']
+    GameUI.print_location_info(location['name'], location['description'])
+    GameUI.print_inventory_summary(screen['evidence'])
+    GameUI.print_npc_list(screen['npcs'])
+    
+    exits = [(e['id'], e['label']) for e in screen['exits']]
+    GameUI.print_location_actions(location['id'], exits)
+    
+    options = [
+        "Cari petunjuk",
+        "Bicara dengan NPC",
+        "Buka inventory",
+        "Lihat catatan"
+    ]
+    options.extend(label for _, label in exits)
+    
+    choice_idx = yield from choose(options)
+    
+    if choice_idx == 0:
+        GameUI.print_narration("Anda mulai mencari petunjuk di lokasi ini...\n")
+        return 'search', None
+    elif choice_idx == 1:
+        npcs = screen['npcs']
+        if not npcs:
+            return 'talk', None
+        npc_idx = yield from choose([npc['name'] for npc in npcs])
+        return 'talk', npcs[npc_idx]['id']
+    elif choice_idx == 2:
+        return 'inventory', None
+    elif choice_idx == 3:
+        return 'notes', None
+    else:
+        return 'move', exits[choice_idx - 4][0]
+
+
+def message_screen(screen: Dict) -> Flow:
+    printers = {
+        'success': GameUI.print_success,
+        'warning': GameUI.print_warning,
+        'error': GameUI.print_error
+    }
+    for message in screen['messages']:
+        printers.get(message['level'], GameUI.print_narration)(message['text'])
+    yield from press_enter()
+    return 'continue', None
+
+
+def dialogue_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    for line in screen['lines']:
+        GameUI.print_dialogue(line['speaker'], line['text'])
+    
+    if screen['choices']:
+        choice_idx = yield from choose(screen['choices'])
+        return 'choose', choice_idx
+    
+    yield from press_enter()
+    return 'continue', None
+
+
+def question_screen(screen: Dict) -> Flow:
+    question = screen['question']
+    
+    GameUI.clear_screen()
+    if screen['type'] == 'checkpoint_question':
+        GameUI.print_header("🎯 PERTANYAAN CHECKPOINT")
+        ui_print(f"\n{question['text']}\n")
+    else:
+        GameUI.print_dialogue(screen['speaker'], screen['dialogue'])
+        GameUI.print_question(question['text'], question['type'])
+    
+    if question['type'] == 'multiple_choice':
+        choice_idx = yield from choose(question['options'])
+        return 'answer', choice_idx
+    answer = yield from text_input("Jawaban Anda: ")
+    return 'answer', answer
+
+
+def answer_result_screen(screen: Dict) -> Flow:
+    if screen['type'] == 'checkpoint_result':
+        if screen['correct']:
+            GameUI.print_success("\n✓ Jawaban Benar!")
+        else:
+            GameUI.print_error("\n✗ Jawaban Salah!")
+        ui_print(screen['message'])
+    elif screen['correct']:
+        GameUI.print_success(screen['message'])
+    else:
+        GameUI.print_error(screen['message'])
+    
+    yield from press_enter()
+    return 'continue', None
+
+
+def checkpoint_intro_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    GameUI.print_header("🎯 PERTANYAAN FINAL CHECKPOINT")
+    
+    ui_print(f"\n{screen['text']}\n")
+    yield from press_enter()
+    return 'continue', None
+
+
+def inventory_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    GameUI.print_header("📦 INVENTORY BUKTI")
+    
+    if not screen['items']:
+        ui_print("\nInventory kosong.\n")
+    else:
+        for i, item in enumerate(screen['items'], 1):
+            ui_print(f"\n{i}. {item['name']}")
+            ui_print(f"   Kategori: {item['category']}")
+            ui_print(f"   {item['description']}")
+    
+    ui_print()
+    yield from press_enter()
+    return 'continue', None
+
+
+def notes_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    GameUI.print_header("📝 CATATAN PENYELIDIKAN")
+    
+    ui_print(f"\nPilihan Kritis yang Dibuat: {screen['choices_made']}")
+    ui_print(f"Total Bukti: {screen['evidence_count']}")
+    ui_print(f"Flag yang Diset: {screen['flag_count']}")
+    
+    stats = screen['question_stats']
+    ui_print(f"\nStatistik Pertanyaan:")
+    ui_print(f"  Total: {stats['total_questions']}")
+    ui_print(f"  Benar: {stats['correct_answers']}")
+    ui_print(f"  Salah: {stats['wrong_answers']}")
+    ui_print(f"  Akurasi: {stats['accuracy']:.1f}%")
+    
+    ui_print()
+    yield from press_enter()
+    return 'continue', None
+
+
+def ending_screen(screen: Dict) -> Flow:
+    GameUI.clear_screen()
+    GameUI.print_ending_screen(screen['ending'], screen['stats'])
+    
+    # Tanya apakah mau mainkan lagi
+    ui_print()
+    play_again = yield from confirm("Ingin bermain lagi?")
+    if play_again:
+        return 'restart', None
+    
+    ui_print()
+    GameUI.print_success("Terima kasih telah bermain Detektif Pengetahuan!")
+    return 'quit', None
+
+
+# Tipe layar engine -> flow
+SCREEN_FLOWS = {
+    'intro': intro_screen,
+    'location': location_screen,
+    'message': message_screen,
+    'dialogue': dialogue_screen,
+    'question': question_screen,
+    'checkpoint_question': question_screen,
+    'answer_result': answer_result_screen,
+    'checkpoint_result': answer_result_screen,
+    'checkpoint_intro': checkpoint_intro_screen,
+    'inventory': inventory_screen,
+    'notes': notes_screen,
+    'ending': ending_screen
+}
+
+
+def screen_flow(screen: Dict) -> Flow:
+    """Flow untuk model layar dari SessionEngine, return (action, arg)"""
+    return SCREEN_FLOWS[screen['type']](screen)
+
+
+def print_events(events: List[Dict]) -> None:
+    """Tampilkan event error dari engine"""
+    for event in events:
+        if event['type'] == 'error':
+            GameUI.print_error(event['message'])
@@ -0,0 +1,60 @@
+"""
+Validate - Linter semua kasus di satu store untuk pipeline authoring
+Exit code 1 jika ada kasus dengan error (atau warning, dengan --strict)
+
+Contoh: python validate.py data/cases --format jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from core.case_validator import validate_store
+
+
+def format_text(result: dict) -> str:
+    status = "OK" if result['ok'] else "GAGAL"
+    lines = [f"{result['case_id']}: {status} - {result['errors']} error, "
+             f"{result['warnings']} warning ({result['seconds'] * 1000:.1f} ms)"]
+    for issue in result['issues']:
+        lines.append(f"  [{issue['severity']}] {issue['code']} {issue['path']}: {issue['message']}")
+    return "\n".join(lines)
+
+
+def main():
+    """Entry point validasi"""
+    parser = argparse.ArgumentParser(description="Validasi kasus Detektif Pengetahuan")
+    parser.add_argument('store', nargs='?', help="Direktori kasus, pack .zip, atau database .db (default: data/cases)")
+    parser.add_argument('--case', action='append', dest='case_ids', help="Hanya kasus ini (bisa diulang)")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: jumlah CPU)")
+    parser.add_argument('--format', choices=('text', 'json', 'jsonl'), default='text',
+                        help="jsonl = satu baris JSON per kasus begitu selesai")
+    parser.add_argument('--strict', action='store_true', help="Warning juga dianggap gagal")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    results = []
+    for result in validate_store(args.store, args.case_ids, args.workers):
+        results.append(result)
+        if args.format == 'jsonl':
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        elif args.format == 'text':
+            print(format_text(result))
+    elapsed = time.perf_counter() - started
+    
+    failed = [r['case_id'] for r in results if not r['ok'] or (args.strict and r['warnings'])]
+    if args.format == 'json':
+        print(json.dumps({
+            'cases': results,
+            'failed': failed,
+            'seconds': elapsed
+        }, ensure_ascii=False, indent=2))
+    elif args.format == 'text':
+        print(f"\n{len(results)} kasus, {len(failed)} gagal, {elapsed:.2f} detik")
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()